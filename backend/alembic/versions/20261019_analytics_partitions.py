@@ -0,0 +1,121 @@
+"""Partition analytics_events by month, add analytics_daily_counts
+
+Revision ID: 20261019_analytics_partitions
+Revises: 20261019_guest_drafts_jsonb
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20261019_analytics_partitions"
+down_revision: Union[str, Sequence[str], None] = "20261019_guest_drafts_jsonb"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = ("created_at", "event_type", "id", "session_id", "user_id")
+
+COLUMNS = "id, event_type, user_id, session_id, event_data, ip_address, user_agent, referrer, created_at"
+
+
+def upgrade() -> None:
+    # Старая таблица уходит в сторону; последовательность id сохраняется
+    op.execute("ALTER TABLE analytics_events RENAME TO analytics_events_old")
+    op.execute("ALTER INDEX analytics_events_pkey RENAME TO analytics_events_old_pkey")
+    op.execute("ALTER SEQUENCE analytics_events_id_seq OWNED BY NONE")
+    for column in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS ix_analytics_events_{column}")
+
+    op.execute(
+        """
+        CREATE TABLE analytics_events (
+            id INTEGER NOT NULL DEFAULT nextval('analytics_events_id_seq'),
+            event_type VARCHAR(100) NOT NULL,
+            user_id INTEGER REFERENCES users (id),
+            session_id VARCHAR(100),
+            event_data JSON,
+            ip_address VARCHAR(45),
+            user_agent TEXT,
+            referrer VARCHAR(500),
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("ALTER SEQUENCE analytics_events_id_seq OWNED BY analytics_events.id")
+
+    # Месячные секции: от первого события до текущего месяца + 2
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            month_start date := date_trunc('month', COALESCE(
+                (SELECT MIN(created_at) FROM analytics_events_old), now()))::date;
+            last_month date := (date_trunc('month', now()) + interval '2 month')::date;
+        BEGIN
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF analytics_events FOR VALUES FROM (%L) TO (%L)',
+                    'analytics_events_' || to_char(month_start, 'YYYYMM'),
+                    month_start,
+                    (month_start + interval '1 month')::date
+                );
+                month_start := (month_start + interval '1 month')::date;
+            END LOOP;
+        END $$
+        """
+    )
+
+    op.execute(
+        f"INSERT INTO analytics_events ({COLUMNS}) "
+        f"SELECT id, event_type, user_id, session_id, event_data, ip_address, user_agent, referrer, "
+        f"COALESCE(created_at, now()) FROM analytics_events_old"
+    )
+    op.execute("DROP TABLE analytics_events_old")
+    for column in INDEXES:
+        op.create_index(f"ix_analytics_events_{column}", "analytics_events", [column], unique=False)
+
+    op.create_table(
+        "analytics_daily_counts",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("event_type", sa.String(100), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("day", "event_type"),
+    )
+    op.execute(
+        "INSERT INTO analytics_daily_counts (day, event_type, count) "
+        "SELECT created_at::date, event_type, COUNT(*) FROM analytics_events GROUP BY 1, 2"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("analytics_daily_counts")
+
+    op.execute("ALTER TABLE analytics_events RENAME TO analytics_events_partitioned")
+    op.execute("ALTER INDEX analytics_events_pkey RENAME TO analytics_events_partitioned_pkey")
+    op.execute("ALTER SEQUENCE analytics_events_id_seq OWNED BY NONE")
+    for column in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS ix_analytics_events_{column}")
+    op.execute(
+        """
+        CREATE TABLE analytics_events (
+            id INTEGER NOT NULL DEFAULT nextval('analytics_events_id_seq') PRIMARY KEY,
+            event_type VARCHAR(100) NOT NULL,
+            user_id INTEGER REFERENCES users (id),
+            session_id VARCHAR(100),
+            event_data JSON,
+            ip_address VARCHAR(45),
+            user_agent TEXT,
+            referrer VARCHAR(500),
+            created_at TIMESTAMP WITHOUT TIME ZONE
+        )
+        """
+    )
+    op.execute("ALTER SEQUENCE analytics_events_id_seq OWNED BY analytics_events.id")
+    op.execute(f"INSERT INTO analytics_events ({COLUMNS}) SELECT {COLUMNS} FROM analytics_events_partitioned")
+    op.execute("DROP TABLE analytics_events_partitioned")
+    for column in INDEXES:
+        op.create_index(f"ix_analytics_events_{column}", "analytics_events", [column], unique=False)
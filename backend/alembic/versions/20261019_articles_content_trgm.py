@@ -0,0 +1,31 @@
+"""Trigram index on articles.content for the interlinker
+
+Revision ID: 20261019_articles_content_trgm
+Revises: 20261019_internal_links
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "20261019_articles_content_trgm"
+down_revision: Union[str, Sequence[str], None] = "20261019_internal_links"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_articles_content_trgm",
+        "articles",
+        ["content"],
+        postgresql_using="gin",
+        postgresql_ops={"content": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_articles_content_trgm", table_name="articles")
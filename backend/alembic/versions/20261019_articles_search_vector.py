@@ -0,0 +1,40 @@
+"""Full-text search vector for articles
+
+Revision ID: 20261019_articles_search_vector
+Revises: 20261019_articles_content_trgm
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+
+revision: str = "20261019_articles_search_vector"
+down_revision: Union[str, Sequence[str], None] = "20261019_articles_content_trgm"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Совпадает с app.models.ARTICLE_SEARCH_VECTOR_SQL на момент миграции
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(excerpt, '')), 'B') || "
+    "setweight(to_tsvector('russian', regexp_replace(coalesce(content, ''), '<[^>]*>', ' ', 'g')), 'C')"
+)
+
+
+def upgrade() -> None:
+    # Генерируемая колонка: таблица переписывается один раз, дальше PostgreSQL
+    # пересчитывает вектор при каждом INSERT/UPDATE
+    op.add_column(
+        "articles",
+        sa.Column("search_vector", TSVECTOR(), sa.Computed(SEARCH_VECTOR_SQL, persisted=True)),
+    )
+    op.create_index("ix_articles_search_vector", "articles", ["search_vector"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_articles_search_vector", table_name="articles")
+    op.drop_column("articles", "search_vector")
@@ -0,0 +1,41 @@
+"""Email outbox table
+
+Revision ID: 20261019_email_outbox
+Revises: 20260208_google
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20261019_email_outbox"
+down_revision: Union[str, Sequence[str], None] = "20260208_google"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "email_outbox",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("to_email", sa.String(255), nullable=False),
+        sa.Column("subject", sa.String(500), nullable=False),
+        sa.Column("html_content", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index(op.f("ix_email_outbox_id"), "email_outbox", ["id"], unique=False)
+    op.create_index("ix_email_outbox_status_next_attempt", "email_outbox", ["status", "next_attempt_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_email_outbox_status_next_attempt", table_name="email_outbox")
+    op.drop_index(op.f("ix_email_outbox_id"), table_name="email_outbox")
+    op.drop_table("email_outbox")
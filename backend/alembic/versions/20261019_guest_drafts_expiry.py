@@ -0,0 +1,30 @@
+"""Partial index on guest_drafts.expires_at for unclaimed drafts
+
+Revision ID: 20261019_guest_drafts_expiry
+Revises: 20261019_inn_usage_unique
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20261019_guest_drafts_expiry"
+down_revision: Union[str, Sequence[str], None] = "20261019_inn_usage_unique"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_guest_drafts_expires_at_unclaimed",
+        "guest_drafts",
+        ["expires_at"],
+        postgresql_where=sa.text("is_claimed = false"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_guest_drafts_expires_at_unclaimed", table_name="guest_drafts")
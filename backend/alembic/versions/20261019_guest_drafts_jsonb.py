@@ -0,0 +1,27 @@
+"""guest_drafts.document_data as JSONB and version column
+
+Revision ID: 20261019_guest_drafts_jsonb
+Revises: 20261019_guest_drafts_expiry
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20261019_guest_drafts_jsonb"
+down_revision: Union[str, Sequence[str], None] = "20261019_guest_drafts_expiry"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE guest_drafts ALTER COLUMN document_data TYPE JSONB USING document_data::jsonb")
+    op.add_column("guest_drafts", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    op.drop_column("guest_drafts", "version")
+    op.execute("ALTER TABLE guest_drafts ALTER COLUMN document_data TYPE TEXT USING document_data::text")
@@ -0,0 +1,52 @@
+"""Unique (user_id, inn) for inn_usage
+
+Revision ID: 20261019_inn_usage_unique
+Revises: 20261019_email_outbox
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "20261019_inn_usage_unique"
+down_revision: Union[str, Sequence[str], None] = "20261019_email_outbox"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Дубликаты (user_id, inn) от параллельных списаний: суммируем в первую строку
+    op.execute(
+        """
+        UPDATE inn_usage AS keep
+        SET free_generations_count = agg.total,
+            first_used_at = agg.first_used_at,
+            last_used_at = agg.last_used_at
+        FROM (
+            SELECT user_id, inn, MIN(id) AS keep_id,
+                   SUM(COALESCE(free_generations_count, 0)) AS total,
+                   MIN(first_used_at) AS first_used_at,
+                   MAX(last_used_at) AS last_used_at
+            FROM inn_usage
+            GROUP BY user_id, inn
+            HAVING COUNT(*) > 1
+        ) AS agg
+        WHERE keep.id = agg.keep_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM inn_usage AS dup
+        USING inn_usage AS keep
+        WHERE dup.user_id = keep.user_id
+          AND dup.inn = keep.inn
+          AND dup.id > keep.id
+        """
+    )
+    op.create_unique_constraint("uq_inn_usage_user_inn", "inn_usage", ["user_id", "inn"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_inn_usage_user_inn", "inn_usage", type_="unique")
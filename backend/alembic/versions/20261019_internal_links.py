@@ -0,0 +1,37 @@
+"""Internal link graph table
+
+Revision ID: 20261019_internal_links
+Revises: 20261019_analytics_partitions
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20261019_internal_links"
+down_revision: Union[str, Sequence[str], None] = "20261019_analytics_partitions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "internal_links",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("source_type", sa.String(20), nullable=False),
+        sa.Column("source_id", sa.Integer(), nullable=False),
+        sa.Column("target_path", sa.String(500), nullable=False),
+        sa.UniqueConstraint("source_type", "source_id", "target_path", name="uq_internal_links_source_target"),
+    )
+    op.create_index("ix_internal_links_id", "internal_links", ["id"])
+    op.create_index("ix_internal_links_target_path", "internal_links", ["target_path"])
+    # Заполнение: python3 scripts/rebuild_link_graph.py
+
+
+def downgrade() -> None:
+    op.drop_index("ix_internal_links_target_path", table_name="internal_links")
+    op.drop_index("ix_internal_links_id", table_name="internal_links")
+    op.drop_table("internal_links")
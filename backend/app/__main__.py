@@ -0,0 +1,30 @@
+"""
+Запуск приложения: python -m app
+
+    python -m app                      # uvicorn на 0.0.0.0:8000
+    python -m app --profile-startup    # отчёт о времени импорта и памяти при старте
+"""
+
+import argparse
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app", description="Documatica backend")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="импортировать приложение и вывести время импорта по модулям")
+    parser.add_argument("--top", type=int, default=20, help="строк в отчёте --profile-startup")
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        from app.core.startup_profile import format_report, profile_startup
+        print(format_report(profile_startup(), top=args.top))
+        return
+
+    import uvicorn
+    uvicorn.run("app.main:app", host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
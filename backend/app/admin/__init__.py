@@ -5,7 +5,7 @@ Admin - SSR роутеры для административной панели
 from fastapi import APIRouter
 from fastapi.responses import RedirectResponse
 
-from app.admin import auth, dashboard, users, payments, articles, promocodes, pages, categories, shortcodes, news_sidebar, hubs, seo_tools
+from app.admin import auth, dashboard, users, payments, articles, promocodes, pages, categories, shortcodes, news_sidebar, hubs, seo_tools, profiles
 
 router = APIRouter(prefix="/admin")
 
@@ -28,4 +28,5 @@ router.include_router(hubs.router, prefix="/hubs")
 router.include_router(promocodes.router, prefix="/promocodes")
 router.include_router(shortcodes.router, prefix="/shortcodes")
 router.include_router(news_sidebar.router, prefix="/news-sidebar")
-router.include_router(seo_tools.router, prefix="/seo-tools")
\ No newline at end of file
+router.include_router(seo_tools.router, prefix="/seo-tools")
+router.include_router(profiles.router, prefix="/profiles")
\ No newline at end of file
@@ -15,6 +15,7 @@ from app.core.templates import templates
 from app.database import get_db
 from app.models import ArticleCategory, Article, Redirect
 from app.admin.context import require_admin, get_admin_context
+from app.services import article_search, link_graph, sitemap
 
 router = APIRouter()
 
@@ -83,15 +84,19 @@ async def articles_list(
     if auth_check:
         return auth_check
 
-    query = (q or "").strip().lower()
-    qry = db.query(Article).options(joinedload(Article.category)).order_by(Article.updated_at.desc(), Article.id.desc())
+    query = (q or "").strip()
+    qry = db.query(Article).options(joinedload(Article.category))
     if query:
+        # Полнотекстовый поиск по GIN-индексу по словам целиком; подстрока и
+        # начало слова - ILIKE по заголовку и slug (короткие, без текста статьи)
+        pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
         qry = qry.filter(
-            Article.title.ilike(f"%{query}%")
-            | Article.slug.ilike(f"%{query}%")
-            | (Article.excerpt.isnot(None) & Article.excerpt.ilike(f"%{query}%"))
-            | (Article.content.isnot(None) & Article.content.ilike(f"%{query}%"))
-        )
+            article_search.matches(query)
+            | Article.title.ilike(pattern, escape="\\")
+            | Article.slug.ilike(pattern, escape="\\")
+        ).order_by(article_search.rank(query).desc(), Article.id.desc())
+    else:
+        qry = qry.order_by(Article.updated_at.desc(), Article.id.desc())
     total = qry.count()
     per_page = 20
     total_pages = max(1, (total + per_page - 1) // per_page)
@@ -180,7 +185,10 @@ async def article_create_post(
         updated_at=now,
     )
     db.add(new_article)
+    db.flush()
+    link_graph.index_article(db, new_article)
     db.commit()
+    sitemap.invalidate()
     db.refresh(new_article)
     return RedirectResponse(url=f"/admin/articles/{new_article.id}/", status_code=303)
 
@@ -386,7 +394,9 @@ async def article_edit_post(
         ).first()
         if not existing:
             db.add(Redirect(from_url=from_url, to_url=to_url, status_code=301))
+    link_graph.index_article(db, article)
     db.commit()
+    sitemap.invalidate()
     return RedirectResponse(url=f"/admin/articles/{article_id}/?saved=1", status_code=303)
 
 
@@ -403,8 +413,10 @@ async def article_delete(request: Request, article_id: str, db: Session = Depend
         return RedirectResponse(url="/admin/articles/", status_code=303)
     article = db.query(Article).filter(Article.id == aid).first()
     if article:
+        link_graph.remove_source(db, link_graph.SOURCE_ARTICLE, article.id)
         db.delete(article)
         db.commit()
+        sitemap.invalidate()
     return RedirectResponse(url="/admin/articles/", status_code=303)
 
 
@@ -425,4 +437,5 @@ async def article_toggle_publish(request: Request, article_id: str, db: Session
     article.is_published = not article.is_published
     article.updated_at = datetime.utcnow()
     db.commit()
+    sitemap.invalidate()
     return JSONResponse({"success": True})
@@ -11,6 +11,7 @@ from app.core.templates import templates
 from app.database import get_db
 from app.models import ArticleCategory, CategorySection, CategoryBlock
 from app.admin.context import require_admin, get_admin_context
+from app.services import sitemap
 
 router = APIRouter()
 
@@ -142,6 +143,7 @@ async def category_create(
     )
     db.add(cat)
     db.commit()
+    sitemap.invalidate()
     db.refresh(cat)
     return RedirectResponse(url=f"/admin/categories/{cat.id}/edit/", status_code=303)
 
@@ -239,6 +241,7 @@ async def category_update(
     cat.canonical_url = canonical_url.strip() or None
     cat.layout = layout if layout in ("with_sidebar", "no_sidebar") else "no_sidebar"
     db.commit()
+    sitemap.invalidate()
     return RedirectResponse(url=f"/admin/categories/{category_id}/edit/", status_code=303)
 
 
@@ -255,4 +258,5 @@ async def category_delete(request: Request, category_id: int, db: Session = Depe
         return JSONResponse({"success": False, "error": "Сначала удалите дочерние категории"}, status_code=400)
     db.delete(cat)
     db.commit()
+    sitemap.invalidate()
     return JSONResponse({"success": True})
@@ -126,6 +126,7 @@ def get_admin_context(
             {"id": "news_sidebar", "title": "Сайдбар новостей", "url": "/admin/news-sidebar/", "icon": "ri-layout-right-line"},
             {"section": "SEO"},
             {"id": "seo_tools", "title": "SEO-инструменты", "url": "/admin/seo-tools/", "icon": "ri-search-line"},
+            {"id": "profiles", "title": "Профили запросов", "url": "/admin/profiles/", "icon": "ri-timer-line"},
         ],
         **kwargs
     }
@@ -3,7 +3,6 @@ Admin Dashboard - главная страница со статистикой
 """
 
 import json
-from pathlib import Path
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Request, Depends
 from fastapi.responses import HTMLResponse
@@ -14,16 +13,15 @@ from app.database import get_db
 from app.models import User, Payment
 from app.core.templates import templates
 from app.admin.context import require_admin, get_admin_context
+from app.services import document_store
+from app.services.analytics import daily_counts
 
 router = APIRouter()
 
-# Пути к данным (документы хранятся на диске, не в БД)
-DOCUMENTS_DIR = Path(__file__).parent.parent.parent / "documents"
-
 
 def _get_docs_stats_from_disk() -> dict:
     """
-    Подсчёт документов с диска (папки с metadata.json).
+    Подсчёт документов с диска (контейнеры и папки с metadata.json).
     Document в БД не заполняется при сохранении, поэтому считаем по диску.
     """
     total = 0
@@ -37,19 +35,7 @@ def _get_docs_stats_from_disk() -> dict:
     week_start = today_start - timedelta(days=7)
     month_start = today_start - timedelta(days=30)
 
-    if not DOCUMENTS_DIR.exists():
-        return {"total": 0, "today": 0, "week": 0, "month": 0, "by_day": {}}
-
-    for doc_folder in DOCUMENTS_DIR.iterdir():
-        if not doc_folder.is_dir():
-            continue
-        metadata_path = doc_folder / "metadata.json"
-        if not metadata_path.exists():
-            continue
-        try:
-            data = json.loads(metadata_path.read_text(encoding="utf-8"))
-        except (json.JSONDecodeError, OSError):
-            continue
+    for data in document_store.iter_metadata():
         created = data.get("created_at")
         if not created:
             total += 1
@@ -147,6 +133,17 @@ def get_statistics(db: Session) -> dict:
         ).scalar() or 0
         chart_revenue.append(float(rev))
 
+    # === События аналитики из дневных счётчиков (без сканирования analytics_events) ===
+    events = []
+    for event_type, by_day in daily_counts(db, month_start.date()).items():
+        events.append({
+            "event_type": event_type,
+            "today": by_day.get(today_start.date(), 0),
+            "week": sum(count for day, count in by_day.items() if day >= week_start.date()),
+            "month": sum(by_day.values()),
+        })
+    events.sort(key=lambda e: e["month"], reverse=True)
+
     # === Последние подтверждённые платежи (для таблицы на дашборде) ===
     recent_payments = (
         db.query(Payment)
@@ -186,6 +183,7 @@ def get_statistics(db: Session) -> dict:
         "chart_docs": chart_docs,
         "chart_revenue": chart_revenue,
         "recent_payments": recent_payments,
+        "events": events,
     }
 
 
@@ -13,6 +13,7 @@ from app.core.templates import templates
 from app.database import get_db
 from app.models import ContentHub, ContentHubSection, HubSectionArticle, Article
 from app.admin.context import require_admin, get_admin_context
+from app.services import sitemap
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -104,6 +105,7 @@ async def hub_create_post(
     )
     db.add(hub)
     db.commit()
+    sitemap.invalidate()
     db.refresh(hub)
     return RedirectResponse(url=f"/admin/hubs/{hub.id}/", status_code=303)
 
@@ -180,6 +182,7 @@ async def hub_update(
     hub.meta_keywords = meta_keywords or None
     hub.is_published = is_published
     db.commit()
+    sitemap.invalidate()
     return RedirectResponse(url=f"/admin/hubs/{hub_id}/?saved=1", status_code=303)
 
 
@@ -252,6 +255,7 @@ async def section_create_post(
     )
     db.add(section)
     db.commit()
+    sitemap.invalidate()
     db.refresh(section)
     return RedirectResponse(url=f"/admin/hubs/{hub_id}/sections/{section.id}/", status_code=303)
 
@@ -347,6 +351,7 @@ async def section_update(
     section.meta_keywords = meta_keywords or None
     section.position = position
     db.commit()
+    sitemap.invalidate()
     return RedirectResponse(url=f"/admin/hubs/{hub_id}/sections/{section_id}/?saved=1", status_code=303)
 
 
@@ -431,4 +436,5 @@ async def section_delete(
     if section:
         db.delete(section)
         db.commit()
+        sitemap.invalidate()
     return RedirectResponse(url=f"/admin/hubs/{hub_id}/", status_code=303)
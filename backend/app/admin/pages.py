@@ -15,6 +15,7 @@ from app.core.content import load_content
 from app.database import get_db
 from app.models import Page, PageSection, ContentBlock
 from app.admin.context import require_admin, get_admin_context
+from app.services import link_graph, sitemap
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -231,6 +232,7 @@ async def page_create(
     )
     db.add(page)
     db.commit()
+    sitemap.invalidate()
     db.refresh(page)
     return RedirectResponse(url=f"/admin/pages/{page.id}/edit/", status_code=303)
 
@@ -411,6 +413,7 @@ async def page_publish(request: Request, page_id: int, db: Session = Depends(get
     
     page.status = "published"
     db.commit()
+    sitemap.invalidate()
     
     return JSONResponse({"success": True, "status": "published"})
 
@@ -429,6 +432,7 @@ async def page_unpublish(request: Request, page_id: int, db: Session = Depends(g
     
     page.status = "draft"
     db.commit()
+    sitemap.invalidate()
     
     return JSONResponse({"success": True, "status": "draft"})
 
@@ -445,7 +449,9 @@ async def page_delete(request: Request, page_id: int, db: Session = Depends(get_
     if not page:
         return JSONResponse({"success": False, "error": "Page not found"}, status_code=404)
     
+    link_graph.remove_source(db, link_graph.SOURCE_PAGE, page.id)
     db.delete(page)
     db.commit()
+    sitemap.invalidate()
     
     return JSONResponse({"success": True})
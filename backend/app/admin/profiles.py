@@ -0,0 +1,119 @@
+"""
+Admin Profiles - профили отдельных запросов (app/core/profiling.py)
+"""
+
+from fastapi import APIRouter, Request, Form
+from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse
+
+from app.core import profiling
+from app.core.config import settings
+from app.core.templates import templates
+from app.admin.context import require_admin, get_admin_context
+
+router = APIRouter()
+
+
+def _profile_link(path: str, token: str) -> str:
+    """Путь страницы с подписанным флагом профилирования"""
+    path = (path or "").strip() or "/"
+    if not path.startswith("/"):
+        path = "/" + path
+    separator = "&" if "?" in path else "?"
+    return f"{path}{separator}{profiling.QUERY_PARAM}={token}"
+
+
+@router.get("/", response_class=HTMLResponse)
+async def profiles_list(request: Request):
+    """Список сохранённых профилей"""
+    auth_check = require_admin(request)
+    if auth_check:
+        return auth_check
+
+    return templates.TemplateResponse(
+        request=request,
+        name="admin/profiles/index.html",
+        context=get_admin_context(
+            request=request,
+            title="Профили запросов — Админ-панель",
+            active_menu="profiles",
+            profiles=profiling.list_profiles(),
+            enabled=settings.PROFILING_ENABLED,
+            max_profiles=settings.PROFILING_MAX_PROFILES,
+            retention_days=settings.PROFILING_RETENTION_DAYS,
+        ),
+    )
+
+
+@router.post("/link/", response_class=HTMLResponse)
+async def profiles_link(request: Request, path: str = Form("/")):
+    """Выдать ссылку с подписанным флагом профилирования"""
+    auth_check = require_admin(request)
+    if auth_check:
+        return auth_check
+
+    token = profiling.create_token()
+    return templates.TemplateResponse(
+        request=request,
+        name="admin/profiles/index.html",
+        context=get_admin_context(
+            request=request,
+            title="Профили запросов — Админ-панель",
+            active_menu="profiles",
+            profiles=profiling.list_profiles(),
+            enabled=settings.PROFILING_ENABLED,
+            max_profiles=settings.PROFILING_MAX_PROFILES,
+            retention_days=settings.PROFILING_RETENTION_DAYS,
+            token=token,
+            token_ttl_minutes=settings.PROFILING_TOKEN_TTL // 60,
+            profile_link=_profile_link(path, token),
+        ),
+    )
+
+
+@router.get("/{profile_id}/", response_class=HTMLResponse)
+async def profile_detail(request: Request, profile_id: str):
+    """Флеймграф и самые дорогие функции профиля"""
+    auth_check = require_admin(request)
+    if auth_check:
+        return auth_check
+
+    loaded = profiling.load_profile(profile_id)
+    if loaded is None:
+        return RedirectResponse(url="/admin/profiles/?error=not_found", status_code=303)
+    meta, profile = loaded
+    functions, tree = profiling.summarize(profile)
+
+    return templates.TemplateResponse(
+        request=request,
+        name="admin/profiles/detail.html",
+        context=get_admin_context(
+            request=request,
+            title=f"Профиль {meta['path']} — Админ-панель",
+            active_menu="profiles",
+            meta=meta,
+            functions=functions,
+            tree=tree,
+        ),
+    )
+
+
+@router.get("/{profile_id}/speedscope.json")
+async def profile_download(request: Request, profile_id: str):
+    """Профиль в формате speedscope"""
+    auth_check = require_admin(request)
+    if auth_check:
+        return auth_check
+
+    path = profiling.profile_file(profile_id)
+    if path is None:
+        return RedirectResponse(url="/admin/profiles/?error=not_found", status_code=303)
+    return FileResponse(path, media_type="application/json", filename=f"{profile_id}.speedscope.json")
+
+
+@router.post("/{profile_id}/delete/", response_class=RedirectResponse)
+async def profile_delete(request: Request, profile_id: str):
+    auth_check = require_admin(request)
+    if auth_check:
+        return auth_check
+    profiling.delete_profile(profile_id)
+    return RedirectResponse(url="/admin/profiles/?deleted=1", status_code=303)
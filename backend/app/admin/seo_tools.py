@@ -8,10 +8,10 @@ from typing import Optional
 from fastapi import APIRouter, Request, Depends, Form, Query
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
 from app.database import get_db
-from app.models import Article, Page, Redirect
+from app.models import Article, Redirect
+from app.services import link_graph, seo_duplicates
 from app.core.templates import templates
 from app.admin.context import require_admin, get_admin_context
 
@@ -21,6 +21,9 @@ router = APIRouter()
 # Теги, внутри которых НЕ вставляем ссылки (заголовки, ячейки таблиц и т.д.)
 EXCLUDED_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6", "th", "figcaption", "caption", "label", "nav", "header")
 
+# Перелинковщик загружает и сохраняет статьи пачками, commit после каждой
+INTERLINKER_BATCH_SIZE = 200
+
 
 def _is_inside_link(content: str, pos: int) -> bool:
     """
@@ -121,6 +124,22 @@ def _add_internal_links(
     return content, added
 
 
+def _interlinker_candidates(db: Session, phrase: str) -> list[int]:
+    """
+    id статей, в content которых есть фраза (без учёта регистра).
+    ILIKE обслуживается триграммным индексом ix_articles_content_trgm,
+    тела статей при отборе не передаются в Python.
+    """
+    pattern = "%" + phrase.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    rows = (
+        db.query(Article.id)
+        .filter(Article.content.isnot(None), Article.content.ilike(pattern, escape="\\"))
+        .order_by(Article.id)
+        .all()
+    )
+    return [row[0] for row in rows]
+
+
 @router.get("/", response_class=HTMLResponse)
 async def seo_tools_index(request: Request):
     """Главная страница SEO-инструментов"""
@@ -164,10 +183,12 @@ async def interlinker_run(
     phrase: str = Form(""),
     target_url: str = Form(""),
     max_per_article: int = Form(1),
+    dry_run: bool = Form(False),
 ):
     """
     Выполнить перелинковку: найти фразу в content статей,
     вставить ссылку (не более max_per_article на статью).
+    dry_run - только показать, какие статьи изменятся, без сохранения.
     """
     auth_check = require_admin(request)
     if auth_check:
@@ -198,28 +219,30 @@ async def interlinker_run(
                 phrase=phrase,
                 target_url=target_url,
                 max_per_article=max_per_article,
+                dry_run=dry_run,
             ),
         )
 
-    # Статьи с непустым content
-    articles = (
-        db.query(Article)
-        .filter(Article.content.isnot(None), Article.content != "")
-        .all()
-    )
+    candidate_ids = _interlinker_candidates(db, phrase)
 
     results = []
     total_added = 0
 
-    for article in articles:
-        if phrase.lower() not in (article.content or "").lower():
-            continue
-        new_content, added = _add_internal_links(
-            article.content, phrase, target_url, max_per_article
-        )
-        if added > 0:
-            article.content = new_content
-            article.updated_at = datetime.utcnow()
+    for i in range(0, len(candidate_ids), INTERLINKER_BATCH_SIZE):
+        batch_ids = candidate_ids[i:i + INTERLINKER_BATCH_SIZE]
+        articles = db.query(Article).filter(Article.id.in_(batch_ids)).order_by(Article.id).all()
+        changed = False
+        for article in articles:
+            new_content, added = _add_internal_links(
+                article.content, phrase, target_url, max_per_article
+            )
+            if added == 0:
+                continue
+            if not dry_run:
+                article.content = new_content
+                article.updated_at = datetime.utcnow()
+                link_graph.index_article(db, article)
+                changed = True
             results.append(
                 {
                     "id": article.id,
@@ -229,9 +252,10 @@ async def interlinker_run(
                 }
             )
             total_added += added
-
-    if results:
-        db.commit()
+        if changed:
+            db.commit()
+        # Обработанная пачка больше не нужна в сессии
+        db.expunge_all()
 
     return templates.TemplateResponse(
         request=request,
@@ -244,6 +268,8 @@ async def interlinker_run(
             phrase=phrase,
             target_url=target_url,
             max_per_article=max_per_article,
+            dry_run=dry_run,
+            candidates=len(candidate_ids),
             results=results,
             total_added=total_added,
             articles_updated=len(results),
@@ -379,56 +405,12 @@ async def redirects_delete(
 
 
 # === Internal Link Checker ===
-def _extract_internal_links(content: str) -> list[str]:
-    if not content:
-        return []
-    matches = re.findall(r'href\s*=\s*["\']([^"\']+)["\']', content, re.I)
-    result = []
-    for m in matches:
-        m = m.split("?")[0].split("#")[0]
-        if m.startswith("/") and not m.startswith("//") and not m.startswith("/static"):
-            result.append(m.rstrip("/") or "/")
-        elif m.startswith("https://oplatanalogov.ru/"):
-            path = m.replace("https://oplatanalogov.ru", "").split("?")[0].split("#")[0]
-            result.append(path.rstrip("/") or "/")
-    return result
-
-
-def _resolve_internal_path(path: str, db: Session) -> bool:
-    path = path.strip("/") or ""
-    if not path:
-        return True
-    parts = path.split("/")
-    if parts[0] == "news":
-        slug = "/".join(parts[1:]) if len(parts) > 1 else ""
-        if not slug:
-            return True
-        return db.query(Article).filter(Article.slug == slug).first() is not None
-    page = db.query(Page).filter(Page.slug == path, Page.status == "published").first()
-    if page:
-        return True
-    if path in ("upd", "schet", "akt", "news", "about", "contact", "privacy", "agreement"):
-        return True
-    return False
-
-
 @router.get("/link-checker/", response_class=HTMLResponse)
 async def link_checker(request: Request, db: Session = Depends(get_db)):
     auth_check = require_admin(request)
     if auth_check:
         return auth_check
-    broken = []
-    articles = db.query(Article).filter(Article.content.isnot(None)).all()
-    seen_links = set()
-    for a in articles:
-        links = _extract_internal_links(a.content)
-        for link in links:
-            key = (a.id, link)
-            if key in seen_links:
-                continue
-            seen_links.add(key)
-            if not _resolve_internal_path(link, db):
-                broken.append({"article_id": a.id, "article_title": a.title, "article_slug": a.slug, "broken_url": link})
+    broken = link_graph.broken_links(db)
     return templates.TemplateResponse(
         request=request,
         name="admin/seo_tools/link_checker.html",
@@ -437,54 +419,35 @@ async def link_checker(request: Request, db: Session = Depends(get_db)):
             title="Проверка ссылок — SEO",
             active_menu="seo_tools",
             broken=broken,
+            rebuilt=request.query_params.get("rebuilt"),
         ),
     )
 
 
-# === Orphan Pages ===
-def _collect_inbound_links(db: Session) -> set[str]:
-    from sqlalchemy.orm import joinedload
-    out = set()
-    articles = db.query(Article).filter(Article.content.isnot(None)).all()
-    for a in articles:
-        for link in _extract_internal_links(a.content):
-            p = link.strip("/") or ""
-            out.add(p)
-            out.add(f"news/{p}" if not p.startswith("news/") else p)
-    pages = (
-        db.query(Page)
-        .options(joinedload(Page.sections).joinedload("blocks"))
-        .filter(Page.status == "published")
-        .all()
-    )
-    for p in pages:
-        for s in p.sections:
-            for b in getattr(s, "blocks", []) or []:
-                c = b.content or {}
-                txt = c.get("text", "") if isinstance(c, dict) else str(c)
-                for link in _extract_internal_links(txt):
-                    pp = link.strip("/") or ""
-                    out.add(pp)
-    return out
+@router.post("/link-checker/rebuild/", response_class=RedirectResponse)
+async def link_checker_rebuild(request: Request, db: Session = Depends(get_db)):
+    """Перестроить граф ссылок по текущему контенту статей и страниц"""
+    auth_check = require_admin(request)
+    if auth_check:
+        return auth_check
+    link_graph.rebuild(db)
+    return RedirectResponse(url="/admin/seo-tools/link-checker/?rebuilt=1", status_code=303)
 
 
+# === Orphan Pages ===
 @router.get("/orphans/", response_class=HTMLResponse)
 async def orphans(request: Request, db: Session = Depends(get_db)):
     auth_check = require_admin(request)
     if auth_check:
         return auth_check
-    inbound = _collect_inbound_links(db)
-    orphans_articles = []
-    for a in db.query(Article).filter(Article.is_published == True).all():
-        slug_path = f"news/{a.slug}"
-        if slug_path not in inbound and a.slug not in inbound:
-            orphans_articles.append({"type": "article", "title": a.title, "slug": a.slug, "url": f"/news/{a.slug}/"})
-    orphans_pages = []
-    for p in db.query(Page).filter(Page.status == "published").all():
-        if p.slug == "home" or p.slug == "":
-            continue
-        if p.slug not in inbound and f"/{p.slug}" not in inbound:
-            orphans_pages.append({"type": "page", "title": p.title, "slug": p.slug, "url": f"/{p.slug}/"})
+    orphans_articles = [
+        {"type": "article", "title": a.title, "slug": a.slug, "url": f"/news/{a.slug}/"}
+        for a in link_graph.orphan_articles(db)
+    ]
+    orphans_pages = [
+        {"type": "page", "title": p.title, "slug": p.slug, "url": f"/{p.slug}/"}
+        for p in link_graph.orphan_pages(db)
+    ]
     return templates.TemplateResponse(
         request=request,
         name="admin/seo_tools/orphans.html",
@@ -500,28 +463,34 @@ async def orphans(request: Request, db: Session = Depends(get_db)):
 
 # === Duplicate Meta ===
 @router.get("/duplicates/", response_class=HTMLResponse)
-async def duplicates(request: Request, db: Session = Depends(get_db)):
+async def duplicates(
+    request: Request,
+    db: Session = Depends(get_db),
+    field: str = Query("meta_description"),
+    mode: str = Query("exact"),
+):
+    """Дубликаты meta title / meta description / H1 в статьях, страницах и разделах хабов"""
     auth_check = require_admin(request)
     if auth_check:
         return auth_check
-    rows = (
-        db.query(Article.meta_description, func.count(Article.id).label("cnt"))
-        .filter(Article.meta_description.isnot(None), Article.meta_description != "")
-        .group_by(Article.meta_description)
-        .having(func.count(Article.id) > 1)
-        .all()
-    )
-    groups = []
-    for meta_desc, cnt in rows:
-        arts = db.query(Article).filter(Article.meta_description == meta_desc).all()
-        groups.append({"meta_description": meta_desc[:80] + "..." if len(meta_desc) > 80 else meta_desc, "count": cnt, "articles": arts})
+    if field not in seo_duplicates.FIELDS:
+        field = "meta_description"
+    if mode == "near":
+        groups = seo_duplicates.near_duplicates(db, field)
+    else:
+        mode = "exact"
+        groups = seo_duplicates.exact_duplicates(db, field)
     return templates.TemplateResponse(
         request=request,
         name="admin/seo_tools/duplicates.html",
         context=get_admin_context(
             request=request,
-            title="Дубликаты meta description — SEO",
+            title=f"Дубликаты {seo_duplicates.FIELDS[field]} — SEO",
             active_menu="seo_tools",
             groups=groups,
+            field=field,
+            field_label=seo_duplicates.FIELDS[field],
+            fields=seo_duplicates.FIELDS,
+            mode=mode,
         ),
     )
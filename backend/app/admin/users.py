@@ -22,6 +22,7 @@ from app.models import (
     AnalyticsEvent,
     GuestDraft,
 )
+from app.core.auth import invalidate_user
 from app.core.templates import templates
 from app.admin.context import require_admin, get_admin_context
 
@@ -140,6 +141,7 @@ async def user_delete(
 
         db.delete(user)
         db.commit()
+        invalidate_user(user_id)
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Ошибка удаления: {str(e)}")
@@ -2,7 +2,6 @@
 API для ИИ анализа документов через OpenAI
 """
 
-import httpx
 import logging
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
@@ -252,6 +251,7 @@ async def analyze_upd(
     db: Session = Depends(get_db)
 ):
     """Анализ УПД через OpenAI GPT"""
+    import httpx
     import logging
     logging.info(f"AI Analysis request received: {request}")
     
@@ -429,6 +429,7 @@ async def analyze_akt(
     db: Session = Depends(get_db)
 ):
     """Анализ Акта выполненных работ через OpenAI GPT"""
+    import httpx
     api_key = getattr(settings, 'OPENAI_API_KEY', None)
     
     if not api_key:
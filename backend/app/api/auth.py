@@ -10,9 +10,9 @@ from typing import Optional
 from fastapi import APIRouter, HTTPException, Depends, Request, Response, Header, Cookie
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
 import jwt
 
+from app.core.auth import UserSnapshot, current_user_optional
 from app.database import get_db
 from app.models import User
 from app.schemas.auth import (
@@ -20,6 +20,7 @@ from app.schemas.auth import (
     VerifyEmail, ForgotPassword, ResetPassword, MessageResponse
 )
 from app.services.email import send_verification_email, send_password_reset_email, send_welcome_email
+from app.services.passwords import hash_password, verify_password
 from app.services.recaptcha import verify_recaptcha
 
 router = APIRouter()
@@ -29,18 +30,6 @@ SECRET_KEY = os.getenv("SECRET_KEY", "documatica-secret-key-change-in-production
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24 * 7  # 7 дней
 
-# Хеширование паролей
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-
 def create_access_token(user_id: int) -> str:
     expire = datetime.utcnow() + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
     payload = {
@@ -82,7 +71,7 @@ async def register(data: UserRegister, response: Response, db: Session = Depends
             
             # Отправляем письмо повторно
             try:
-                await send_verification_email(existing_user.email, verification_token)
+                send_verification_email(existing_user.email, verification_token)
                 print(f"[REGISTER] Повторно отправлено письмо подтверждения на {data.email}")
             except Exception as e:
                 print(f"[REGISTER] Ошибка отправки письма: {e}")
@@ -104,7 +93,7 @@ async def register(data: UserRegister, response: Response, db: Session = Depends
     # Создаём пользователя
     user = User(
         email=data.email.lower(),
-        password_hash=hash_password(data.password),
+        password_hash=await hash_password(data.password),
         name=data.name,
         verification_token=verification_token,
         verification_token_expires=verification_expires
@@ -157,7 +146,11 @@ async def login(
             detail="Этот аккаунт создан через Яндекс или Google. Используйте соответствующую кнопку входа."
         )
     
-    if not user or not verify_password(data.password, user.password_hash):
+    if not user:
+        raise HTTPException(status_code=401, detail="Неверный email или пароль")
+    
+    password_ok, new_password_hash = await verify_password(data.password, user.password_hash)
+    if not password_ok:
         raise HTTPException(status_code=401, detail="Неверный email или пароль")
     
     # Проверка подтверждения email
@@ -167,6 +160,10 @@ async def login(
             detail="Email не подтверждён. Проверьте почту или запросите новое письмо."
         )
     
+    # Стоимость bcrypt изменилась - сохраняем пересчитанный хеш
+    if new_password_hash:
+        user.password_hash = new_password_hash
+    
     # Обновляем время последнего входа
     user.last_login = datetime.utcnow()
     db.commit()
@@ -343,7 +340,7 @@ async def reset_password(data: ResetPassword, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Пароль должен содержать минимум 6 символов")
     
     # Обновляем пароль
-    user.password_hash = hash_password(data.new_password)
+    user.password_hash = await hash_password(data.new_password)
     user.reset_token = None
     user.reset_token_expires = None
     db.commit()
@@ -422,47 +419,10 @@ async def get_current_user_db(
     return user
 
 
-async def get_current_user_optional(
-    authorization: Optional[str] = Header(None),
-    access_token: Optional[str] = Cookie(None),
-    db: Session = Depends(get_db)
-) -> Optional[User]:
-    """
-    Получить текущего пользователя или None если не авторизован.
-    Используется для эндпоинтов где авторизация опциональна.
-    """
-    
-    token = None
-    
-    # Сначала пробуем Header Authorization
-    if authorization and authorization.startswith("Bearer "):
-        token = authorization.replace("Bearer ", "")
-    # Если нет Header, берём из cookie
-    elif access_token:
-        token = access_token
-    
-    if not token:
-        return None
-    
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = int(payload.get("sub"))
-    except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
-        return None
-    
-    user = db.query(User).filter(User.id == user_id).first()
-    return user
-
-
 @router.get("/check")
-async def check_auth(
-    authorization: Optional[str] = Header(None),
-    access_token: Optional[str] = Cookie(None),
-    db: Session = Depends(get_db)
-):
+async def check_auth(user: Optional[UserSnapshot] = Depends(current_user_optional)):
     """
     Простая проверка авторизации.
     Возвращает {"authenticated": true} если пользователь авторизован, иначе {"authenticated": false}
     """
-    user = await get_current_user_optional(authorization, access_token, db)
     return {"authenticated": user is not None}
\ No newline at end of file
@@ -6,12 +6,10 @@ API для скачивания бланков документов (Excel/Word)
 from pathlib import Path
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Header, Cookie, Depends
+from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.api.auth import get_current_user_optional
+from app.core.auth import UserSnapshot, current_user_optional
 
 router = APIRouter(prefix="/documents/blanks", tags=["blanks"])
 
@@ -22,15 +20,12 @@ BLANKS_DIR = Path(__file__).parent.parent / "static" / "blanks"
 @router.get("/{blank_type}")
 async def download_blank(
     blank_type: str,
-    authorization: Optional[str] = Header(None),
-    access_token: Optional[str] = Cookie(None),
-    db: Session = Depends(get_db),
+    user: Optional[UserSnapshot] = Depends(current_user_optional),
 ):
     """
     Скачивание бланка (Excel/Word).
     Требуется авторизация.
     """
-    user = await get_current_user_optional(authorization, access_token, db)
     if not user:
         raise HTTPException(status_code=401, detail="Требуется авторизация для скачивания бланков")
 
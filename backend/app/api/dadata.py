@@ -7,7 +7,6 @@ from typing import Optional
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from dadata import Dadata
 
 router = APIRouter()
 
@@ -16,6 +15,12 @@ DADATA_TOKEN = os.getenv("DADATA_TOKEN", "41d63b47b1400f33d49570eac86ca3125ab40e
 DADATA_SECRET = os.getenv("DADATA_SECRET", "112e864e62a73531a1661a5096f980c150bfc01f")
 
 
+def _client():
+    """Клиент Dadata; SDK (вместе с httpx) импортируется при первом запросе, а не при старте"""
+    from dadata import Dadata
+    return Dadata(DADATA_TOKEN, DADATA_SECRET)
+
+
 class CompanySearchRequest(BaseModel):
     """Запрос на поиск компании по ИНН"""
     inn: str
@@ -66,7 +71,7 @@ async def _find_company_by_inn(inn: str, kpp: Optional[str] = None, branch_type:
         raise HTTPException(status_code=400, detail="ИНН должен содержать минимум 10 символов")
     
     try:
-        dadata = Dadata(DADATA_TOKEN, DADATA_SECRET)
+        dadata = _client()
         
         # Параметры запроса
         params = {
@@ -159,7 +164,7 @@ async def suggest_company(query: str, count: int = 5):
         return {"suggestions": []}
     
     try:
-        dadata = Dadata(DADATA_TOKEN, DADATA_SECRET)
+        dadata = _client()
         
         result = dadata.suggest("party", query, count=count)
         
@@ -204,7 +209,7 @@ async def find_bank_by_bik(bik: str):
         raise HTTPException(status_code=400, detail="БИК должен содержать 9 цифр")
     
     try:
-        dadata = Dadata(DADATA_TOKEN, DADATA_SECRET)
+        dadata = _client()
         result = dadata.find_by_id("bank", bik)
         
         if not result:
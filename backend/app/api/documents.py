@@ -3,8 +3,8 @@ API endpoints для работы с документами
 """
 
 import base64
+import hashlib
 import io
-import json
 import os
 from pathlib import Path
 from datetime import datetime
@@ -12,35 +12,33 @@ import uuid
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Header, Cookie, Request, Depends, Query
-from fastapi.responses import StreamingResponse, JSONResponse, HTMLResponse
+from fastapi.responses import StreamingResponse, JSONResponse, HTMLResponse, FileResponse, Response
 from jinja2 import Environment, FileSystemLoader
-import jwt
 from sqlalchemy.orm import Session
 
-# Попытка импорта WeasyPrint (может не работать на Windows без GTK)
-try:
-    from weasyprint import HTML as WeasyHTML
-    WEASYPRINT_AVAILABLE = True
-except OSError:
-    WEASYPRINT_AVAILABLE = False
-    print("WeasyPrint не доступен (требуется GTK3). Будет возвращаться HTML для печати.")
-
 from app.schemas.upd import UPDRequest, UPDResponse, UPDPreviewRequest
 from app.database import get_db
 from app.models import User
-from app.services.billing import BillingService
-from app.services.excel_export import ExcelExportService
+from app.core.auth import get_user_id_from_token
+from app.core.http_cache import choose_encoding, etag_matches, make_etag
+from app.core.metrics import track_render
+from app.services.billing import BillingService, LIMIT_MESSAGES
+from app.services.preview_cache import preview_cache
+from app.services import document_store
+from app.services.blob_store import (
+    BLOB_BASE_URL,
+    RASTER_MIME_TYPES,
+    blob_url_fetcher,
+    externalize_data_urls,
+    externalize_html,
+    get_path as get_blob_path,
+    guess_mime_type,
+)
 
 router = APIRouter()
 
-# Настройки JWT (должны совпадать с auth.py)
-SECRET_KEY = os.getenv("SECRET_KEY", "documatica-secret-key-change-in-production")
-ALGORITHM = "HS256"
-
-# Путь к шаблонам и сохранённым документам
+# Путь к шаблонам (документы - в app/services/document_store.py)
 TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
-DOCUMENTS_DIR = Path(__file__).parent.parent.parent / "documents"
-DOCUMENTS_DIR.mkdir(exist_ok=True)
 
 # Настройка Jinja2
 jinja_env = Environment(
@@ -48,26 +46,44 @@ jinja_env = Environment(
     autoescape=True
 )
 
+# weasyprint.HTML после первого импорта; False - WeasyPrint недоступен
+_weasyprint_html = None
 
-def get_user_id_from_token(authorization: Optional[str] = None, cookie_token: Optional[str] = None) -> Optional[int]:
-    """Извлекает user_id из JWT токена (Header или Cookie). Возвращает None если токен отсутствует или невалиден."""
-    token = None
-    
-    # Сначала пробуем Header Authorization
-    if authorization and authorization.startswith("Bearer "):
-        token = authorization.replace("Bearer ", "")
-    # Если нет Header, берём из cookie
-    elif cookie_token:
-        token = cookie_token
-    
-    if not token:
-        return None
-    
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return int(payload.get("sub"))
-    except (jwt.ExpiredSignatureError, jwt.InvalidTokenError, ValueError):
-        return None
+
+def get_weasyprint_html():
+    """
+    Класс weasyprint.HTML или None (может не работать на Windows без GTK).
+    WeasyPrint загружает pango/cairo, поэтому импортируется при первом PDF,
+    а не при старте (RENDERERS_PRELOAD - импорт при старте воркера).
+    """
+    global _weasyprint_html
+    if _weasyprint_html is None:
+        try:
+            from weasyprint import HTML
+            _weasyprint_html = HTML
+        except OSError:
+            _weasyprint_html = False
+            print("WeasyPrint не доступен (требуется GTK3). Будет возвращаться HTML для печати.")
+    return _weasyprint_html or None
+
+
+def preload_renderers() -> None:
+    """Загрузить WeasyPrint и openpyxl/xlwt заранее - для воркеров, которые рендерят PDF и Excel"""
+    get_weasyprint_html()
+    import app.services.excel_export  # noqa: F401
+
+
+def _limit_exceeded_response(billing: BillingService, user: User, reason: str) -> JSONResponse:
+    """Ответ 402 при исчерпанном лимите генераций"""
+    return JSONResponse(
+        status_code=402,  # Payment Required
+        content={
+            "success": False,
+            "error": "limit_exceeded",
+            "message": LIMIT_MESSAGES.get(reason, "Не удалось списать генерацию"),
+            "limits": billing.get_user_limits(user)
+        }
+    )
 
 
 def format_date(date_obj) -> str:
@@ -309,9 +325,11 @@ async def generate_upd(request: UPDRequest, return_base64: bool = False):
         filename = f"UPD_{request.document_number}_{request.document_date.strftime('%Y%m%d')}"
         
         # Если WeasyPrint доступен - генерируем PDF
-        if WEASYPRINT_AVAILABLE:
+        WeasyHTML = get_weasyprint_html()
+        if WeasyHTML is not None:
             pdf_buffer = io.BytesIO()
-            WeasyHTML(string=html_content).write_pdf(pdf_buffer)
+            with track_render("pdf"):
+                WeasyHTML(string=html_content, base_url=BLOB_BASE_URL, url_fetcher=blob_url_fetcher).write_pdf(pdf_buffer)
             pdf_buffer.seek(0)
             
             if return_base64:
@@ -351,71 +369,85 @@ async def generate_upd(request: UPDRequest, return_base64: bool = False):
         )
 
 
+async def _cached_preview_response(kind: str, payload, render, request: Request) -> Response:
+    """
+    Предпросмотр через кэш (app/services/preview_cache.py).
+    ETag - хэш HTML: конструктор может прислать If-None-Match и получить 304,
+    если предпросмотр не изменился.
+    """
+    entry = await preview_cache.get_or_render(preview_cache.make_key(kind, payload), render)
+    headers = {"ETag": make_etag(entry.etag), "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="text/html; charset=utf-8", headers=headers)
+
+
+def _render_upd_preview(request: UPDPreviewRequest) -> str:
+    """Рендер HTML предпросмотра УПД"""
+    template = jinja_env.get_template("upd_template.html")
+
+    # Подготовка данных с безопасными значениями по умолчанию
+    seller_data = request.seller.model_dump() if request.seller else {"name": "", "inn": "", "kpp": "", "address": ""}
+    buyer_data = request.buyer.model_dump() if request.buyer else {"name": "", "inn": "", "kpp": "", "address": ""}
+
+    items_data = []
+    if request.items:
+        for item in request.items:
+            items_data.append({
+                **item.model_dump(),
+                "quantity": float(item.quantity or 0),
+                "price": float(item.price or 0),
+                "amount_without_vat": float(item.amount_without_vat or 0),
+                "vat_amount": float(item.vat_amount or 0),
+                "amount_with_vat": float(item.amount_with_vat or 0),
+            })
+
+    template_data = {
+        "document_number": request.document_number or "1",
+        "document_date": format_date_short(request.document_date) if request.document_date else "",
+        "correction_number": request.correction_number,
+        "correction_date": format_date_short(request.correction_date) if request.correction_date else None,
+        "status": request.status or 1,
+        "seller": seller_data,
+        "buyer": buyer_data,
+        "consignor": request.consignor,
+        "consignee": request.consignee,
+        "items": items_data,
+        "total_amount_without_vat": float(request.total_amount_without_vat or 0),
+        "total_vat_amount": float(request.total_vat_amount or 0),
+        "total_amount_with_vat": float(request.total_amount_with_vat or 0),
+        "currency_code": request.currency_code or "643",
+        "currency_name": request.currency_name or "Российский рубль",
+        "payment_document": request.payment_document,
+        "contract_info": request.contract_info,
+        "transport_info": request.transport_info,
+        "government_contract_id": request.gov_contract_id,
+        "shipping_date": format_date_short(request.shipping_date) if request.shipping_date else None,
+        "other_shipping_info": request.other_shipping_info,
+        "seller_signer": request.seller_signer.model_dump() if request.seller_signer else None,
+        "seller_responsible": request.seller_responsible.model_dump() if request.seller_responsible else None,
+        "economic_entity": request.economic_entity,
+        "seller_stamp_image": request.seller_stamp_image,
+        "seller_org_type": getattr(request, 'seller_org_type', 'ooo'),
+        "accountant_name": request.accountant_name,
+        "accountant_signature": request.accountant_signature,
+        "receiving_date": format_date_short(request.receiving_date) if request.receiving_date else None,
+        "other_receiving_info": request.other_receiving_info,
+        "buyer_signer": request.buyer_signer.model_dump() if request.buyer_signer else None,
+        "buyer_responsible": request.buyer_responsible.model_dump() if request.buyer_responsible else None,
+        "buyer_economic_entity": request.buyer_economic_entity,
+    }
+    return template.render(**template_data)
+
+
 @router.post("/upd/preview")
-async def preview_upd(request: UPDPreviewRequest):
+async def preview_upd(request: UPDPreviewRequest, http_request: Request):
     """
     Предпросмотр УПД - возвращает HTML (для отладки)
     """
     try:
-        template = jinja_env.get_template("upd_template.html")
-        
-        # Подготовка данных с безопасными значениями по умолчанию
-        seller_data = request.seller.model_dump() if request.seller else {"name": "", "inn": "", "kpp": "", "address": ""}
-        buyer_data = request.buyer.model_dump() if request.buyer else {"name": "", "inn": "", "kpp": "", "address": ""}
-        
-        items_data = []
-        if request.items:
-            for item in request.items:
-                items_data.append({
-                    **item.model_dump(),
-                    "quantity": float(item.quantity or 0),
-                    "price": float(item.price or 0),
-                    "amount_without_vat": float(item.amount_without_vat or 0),
-                    "vat_amount": float(item.vat_amount or 0),
-                    "amount_with_vat": float(item.amount_with_vat or 0),
-                })
-        
-        template_data = {
-            "document_number": request.document_number or "1",
-            "document_date": format_date_short(request.document_date) if request.document_date else "",
-            "correction_number": request.correction_number,
-            "correction_date": format_date_short(request.correction_date) if request.correction_date else None,
-            "status": request.status or 1,
-            "seller": seller_data,
-            "buyer": buyer_data,
-            "consignor": request.consignor,
-            "consignee": request.consignee,
-            "items": items_data,
-            "total_amount_without_vat": float(request.total_amount_without_vat or 0),
-            "total_vat_amount": float(request.total_vat_amount or 0),
-            "total_amount_with_vat": float(request.total_amount_with_vat or 0),
-            "currency_code": request.currency_code or "643",
-            "currency_name": request.currency_name or "Российский рубль",
-            "payment_document": request.payment_document,
-            "contract_info": request.contract_info,
-            "transport_info": request.transport_info,
-            "government_contract_id": request.gov_contract_id,
-            "shipping_date": format_date_short(request.shipping_date) if request.shipping_date else None,
-            "other_shipping_info": request.other_shipping_info,
-            "seller_signer": request.seller_signer.model_dump() if request.seller_signer else None,
-            "seller_responsible": request.seller_responsible.model_dump() if request.seller_responsible else None,
-            "economic_entity": request.economic_entity,
-            "seller_stamp_image": request.seller_stamp_image,
-            "seller_org_type": getattr(request, 'seller_org_type', 'ooo'),
-            "accountant_name": request.accountant_name,
-            "accountant_signature": request.accountant_signature,
-            "receiving_date": format_date_short(request.receiving_date) if request.receiving_date else None,
-            "other_receiving_info": request.other_receiving_info,
-            "buyer_signer": request.buyer_signer.model_dump() if request.buyer_signer else None,
-            "buyer_responsible": request.buyer_responsible.model_dump() if request.buyer_responsible else None,
-            "buyer_economic_entity": request.buyer_economic_entity,
-        }
-        
-        html_content = template.render(**template_data)
-        
-        return StreamingResponse(
-            io.BytesIO(html_content.encode('utf-8')),
-            media_type="text/html; charset=utf-8"
+        return await _cached_preview_response(
+            "upd", request.model_dump(mode="json"), lambda: _render_upd_preview(request), http_request
         )
         
     except Exception as e:
@@ -463,14 +495,11 @@ async def save_upd(
         # Проверяем, нужно ли обновить существующий документ (новая логика)
         if settings.FEATURE_NEW_SAVE_LOGIC and document_id:
             # Проверяем существование документа
-            doc_folder = DOCUMENTS_DIR / document_id
-            if doc_folder.exists():
+            if document_store.document_exists(document_id):
                 # Проверяем владельца
-                metadata_path = doc_folder / "metadata.json"
-                if metadata_path.exists():
-                    metadata = json.loads(metadata_path.read_text(encoding='utf-8'))
-                    if metadata.get("user_id") != user_id:
-                        raise HTTPException(status_code=403, detail="Доступ запрещён")
+                metadata = document_store.read_metadata(document_id)
+                if metadata is not None and metadata.get("user_id") != user_id:
+                    raise HTTPException(status_code=403, detail="Доступ запрещён")
                 
                 # Обновляем документ без биллинга (уже был оплачен при создании)
                 doc_id = document_id
@@ -488,34 +517,10 @@ async def save_upd(
                 billing = BillingService(db)
                 seller_inn = request.seller.inn if request.seller else None
                 
-                # Проверяем возможность генерации
-                check = billing.check_can_generate(user, seller_inn)
-                if not check["can_generate"]:
-                    return JSONResponse(
-                        status_code=402,  # Payment Required
-                        content={
-                            "success": False,
-                            "error": "limit_exceeded",
-                            "message": check["message"],
-                            "limits": check["limits"]
-                        }
-                    )
-                
-                # Списываем генерацию
+                # Списываем генерацию (проверка лимита и списание - одна транзакция)
                 success, source = billing.consume_generation(user, seller_inn)
                 if not success:
-                    return JSONResponse(
-                        status_code=402,
-                        content={
-                            "success": False,
-                            "error": source,
-                            "message": "Не удалось списать генерацию"
-                        }
-                    )
-        
-        # Создаём папку для документа
-        doc_folder = DOCUMENTS_DIR / doc_id
-        doc_folder.mkdir(exist_ok=True)
+                    return _limit_exceeded_response(billing, user, source)
         
         # Генерируем HTML
         template = jinja_env.get_template("upd_template.html")
@@ -559,23 +564,17 @@ async def save_upd(
             "responsible_person": None,
         }
         
-        html_content = template.render(**template_data)
-        
-        # Сохраняем HTML
-        html_path = doc_folder / "document.html"
-        html_path.write_text(html_content, encoding='utf-8')
+        # Печати и подписи выносим в blob-хранилище, в HTML остаются ссылки по хэшу
+        html_content = externalize_html(template.render(**template_data))
         
-        # Сохраняем исходные данные формы для редактирования
-        form_data = request.model_dump(mode='json')
-        form_data_path = doc_folder / "form_data.json"
-        form_data_path.write_text(json.dumps(form_data, ensure_ascii=False, indent=2, default=str), encoding='utf-8')
+        # Исходные данные формы для редактирования
+        form_data = externalize_data_urls(request.model_dump(mode='json'))
         
-        # Сохраняем метаданные
-        metadata_path = doc_folder / "metadata.json"
+        # Метаданные
         # Если обновляем существующий - загружаем старые метаданные
         if settings.FEATURE_NEW_SAVE_LOGIC and document_id and document_id == doc_id:
-            if metadata_path.exists():
-                metadata = json.loads(metadata_path.read_text(encoding='utf-8'))
+            metadata = document_store.read_metadata(doc_id)
+            if metadata is not None:
                 metadata["updated_at"] = datetime.now().isoformat()
             else:
                 metadata = {
@@ -601,7 +600,8 @@ async def save_upd(
             "status": request.status
         })
         
-        metadata_path.write_text(json.dumps(metadata, ensure_ascii=False, indent=2), encoding='utf-8')
+        # Сохраняем документ одним файлом-контейнером
+        document_store.save_document(doc_id, metadata=metadata, form_data=form_data, html=html_content)
         
         is_update = settings.FEATURE_NEW_SAVE_LOGIC and document_id and document_id == doc_id
         
@@ -620,6 +620,35 @@ async def save_upd(
         )
 
 
+@router.get("/blobs/{digest}")
+async def get_document_blob(digest: str):
+    """
+    Изображение (печать, подпись) из blob-хранилища по SHA-256.
+    Содержимое неизменно для хэша, поэтому кэшируется браузером навсегда.
+    """
+    blob_path = get_blob_path(digest)
+    if blob_path is None:
+        raise HTTPException(status_code=404, detail="Изображение не найдено")
+    
+    with open(blob_path, "rb") as f:
+        head = f.read(1024)
+    
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": f'"{digest}"',
+        "X-Content-Type-Options": "nosniff",
+    }
+    media_type = guess_mime_type(head)
+    if media_type not in RASTER_MIME_TYPES:
+        # Не растр (SVG из старых сохранений и т.п.) - только скачиванием,
+        # чтобы содержимое не исполнялось в origin сайта
+        media_type = "application/octet-stream"
+        headers["Content-Disposition"] = f'attachment; filename="{digest}"'
+        headers["Content-Security-Policy"] = "sandbox"
+    
+    return FileResponse(blob_path, media_type=media_type, headers=headers)
+
+
 @router.get("/")
 @router.get("/saved")
 async def list_saved_documents(
@@ -641,16 +670,11 @@ async def list_saved_documents(
                 "count": 0
             }
         
-        documents = []
-        
-        for doc_folder in DOCUMENTS_DIR.iterdir():
-            if doc_folder.is_dir():
-                metadata_path = doc_folder / "metadata.json"
-                if metadata_path.exists():
-                    metadata = json.loads(metadata_path.read_text(encoding='utf-8'))
-                    # Фильтруем по user_id
-                    if metadata.get('user_id') == user_id:
-                        documents.append(metadata)
+        # Фильтруем по user_id
+        documents = [
+            metadata for metadata in document_store.iter_metadata()
+            if metadata.get('user_id') == user_id
+        ]
         
         # Сортируем по дате создания (новые первые)
         documents.sort(key=lambda x: x.get('created_at', ''), reverse=True)
@@ -674,16 +698,13 @@ async def get_saved_document(document_id: str):
     Получение сохранённого документа по ID (метаданные)
     """
     try:
-        doc_folder = DOCUMENTS_DIR / document_id
-        
-        if not doc_folder.exists():
+        if not document_store.document_exists(document_id):
             raise HTTPException(status_code=404, detail="Документ не найден")
         
-        metadata_path = doc_folder / "metadata.json"
-        if not metadata_path.exists():
+        metadata = document_store.read_metadata(document_id)
+        if metadata is None:
             raise HTTPException(status_code=404, detail="Метаданные документа не найдены")
         
-        metadata = json.loads(metadata_path.read_text(encoding='utf-8'))
         return metadata
         
     except HTTPException:
@@ -701,16 +722,13 @@ async def get_saved_document_form_data(document_id: str):
     Получение исходных данных формы для редактирования
     """
     try:
-        doc_folder = DOCUMENTS_DIR / document_id
-        
-        if not doc_folder.exists():
+        if not document_store.document_exists(document_id):
             raise HTTPException(status_code=404, detail="Документ не найден")
         
-        form_data_path = doc_folder / "form_data.json"
-        if not form_data_path.exists():
+        form_data = document_store.read_form_data(document_id)
+        if form_data is None:
             raise HTTPException(status_code=404, detail="Данные формы не найдены (документ создан до обновления)")
         
-        form_data = json.loads(form_data_path.read_text(encoding='utf-8'))
         return form_data
         
     except HTTPException:
@@ -738,19 +756,16 @@ async def update_upd(
     
     try:
         # Проверяем существование документа
-        doc_folder = DOCUMENTS_DIR / document_id
-        if not doc_folder.exists():
+        if not document_store.document_exists(document_id):
             raise HTTPException(status_code=404, detail="Документ не найден")
         
         # Получаем user_id из токена
         user_id = get_user_id_from_token(authorization, access_token)
         
         # Проверяем владельца документа
-        metadata_path = doc_folder / "metadata.json"
-        if metadata_path.exists():
-            metadata = json.loads(metadata_path.read_text(encoding='utf-8'))
-            if metadata.get("user_id") != user_id:
-                raise HTTPException(status_code=403, detail="Доступ запрещён")
+        metadata = document_store.read_metadata(document_id)
+        if metadata is not None and metadata.get("user_id") != user_id:
+            raise HTTPException(status_code=403, detail="Доступ запрещён")
         
         # Генерируем HTML
         template = jinja_env.get_template("upd_template.html")
@@ -794,21 +809,13 @@ async def update_upd(
             "responsible_person": None,
         }
         
-        html_content = template.render(**template_data)
-        
-        # Обновляем HTML
-        html_path = doc_folder / "document.html"
-        html_path.write_text(html_content, encoding='utf-8')
+        html_content = externalize_html(template.render(**template_data))
         
         # Обновляем form_data
-        form_data = request.model_dump(mode='json')
-        form_data_path = doc_folder / "form_data.json"
-        form_data_path.write_text(json.dumps(form_data, ensure_ascii=False, indent=2, default=str), encoding='utf-8')
+        form_data = externalize_data_urls(request.model_dump(mode='json'))
         
         # Обновляем метаданные
-        if metadata_path.exists():
-            metadata = json.loads(metadata_path.read_text(encoding='utf-8'))
-        else:
+        if metadata is None:
             metadata = {"id": document_id, "type": "upd"}
         
         metadata.update({
@@ -822,7 +829,7 @@ async def update_upd(
             "status": request.status
         })
         
-        metadata_path.write_text(json.dumps(metadata, ensure_ascii=False, indent=2), encoding='utf-8')
+        document_store.save_document(document_id, metadata=metadata, form_data=form_data, html=html_content)
         
         return {
             "success": True,
@@ -840,24 +847,50 @@ async def update_upd(
         )
 
 
+def _saved_html_response(document_id: str, request: Request, not_found_detail: str) -> Response:
+    """
+    HTML сохранённого документа с сильным ETag по SHA-256 содержимого.
+    If-None-Match -> 304 без чтения HTML; при поддержке клиентом отдаётся
+    предсжатая секция контейнера (br/gzip) без распаковки.
+    """
+    info = document_store.read_html_info(document_id)
+    if info is None:
+        if not document_store.document_exists(document_id):
+            raise HTTPException(status_code=404, detail="Документ не найден")
+        raise HTTPException(status_code=404, detail=not_found_detail)
+
+    encoding = choose_encoding(request.headers.get("accept-encoding"), info["encodings"])
+    headers = {
+        "ETag": make_etag(info["sha256"], encoding),
+        # Браузер хранит копию, но каждый раз сверяет её по ETag
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), info["sha256"]):
+        return Response(status_code=304, headers=headers)
+
+    body = document_store.read_html_encoded(document_id, encoding)
+    if body is None and encoding is not None:
+        # Документ пересохранили между чтением заголовка и секции
+        encoding = None
+        body = document_store.read_html_encoded(document_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail=not_found_detail)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    else:
+        headers["ETag"] = make_etag(hashlib.sha256(body).hexdigest())
+    return Response(content=body, media_type="text/html; charset=utf-8", headers=headers)
+
+
 @router.get("/saved/{document_id}/html")
-async def get_saved_document_html(document_id: str):
+async def get_saved_document_html(document_id: str, request: Request):
     """
     Получение HTML сохранённого документа
     """
     try:
-        doc_folder = DOCUMENTS_DIR / document_id
-        
-        if not doc_folder.exists():
-            raise HTTPException(status_code=404, detail="Документ не найден")
-        
-        html_path = doc_folder / "document.html"
-        if not html_path.exists():
-            raise HTTPException(status_code=404, detail="Файл документа не найден")
-        
-        html_content = html_path.read_text(encoding='utf-8')
-        
-        return HTMLResponse(content=html_content)
+        return _saved_html_response(document_id, request, "Файл документа не найден")
         
     except HTTPException:
         raise
@@ -874,31 +907,29 @@ async def get_saved_document_pdf(document_id: str):
     Скачивание PDF сохранённого документа
     """
     try:
-        doc_folder = DOCUMENTS_DIR / document_id
-        
-        if not doc_folder.exists():
+        document = document_store.read_document(document_id)
+        if document is None:
             raise HTTPException(status_code=404, detail="Документ не найден")
         
-        html_path = doc_folder / "document.html"
-        if not html_path.exists():
+        html_content = document["html"]
+        if html_content is None:
             raise HTTPException(status_code=404, detail="Файл документа не найден")
         
-        html_content = html_path.read_text(encoding='utf-8')
-        
         # Получаем метаданные для имени файла
-        metadata_path = doc_folder / "metadata.json"
+        metadata = document["metadata"]
         filename = f"UPD_{document_id[:8]}"
-        if metadata_path.exists():
-            metadata = json.loads(metadata_path.read_text(encoding='utf-8'))
+        if metadata is not None:
             doc_num = metadata.get('document_number', '')
             doc_date = metadata.get('document_date', '').replace('-', '')
             if doc_num and doc_date:
                 filename = f"UPD_{doc_num}_{doc_date}"
         
         # Если WeasyPrint доступен - генерируем PDF
-        if WEASYPRINT_AVAILABLE:
+        WeasyHTML = get_weasyprint_html()
+        if WeasyHTML is not None:
             pdf_buffer = io.BytesIO()
-            WeasyHTML(string=html_content).write_pdf(pdf_buffer)
+            with track_render("pdf"):
+                WeasyHTML(string=html_content, base_url=BLOB_BASE_URL, url_fetcher=blob_url_fetcher).write_pdf(pdf_buffer)
             pdf_buffer.seek(0)
             
             return StreamingResponse(
@@ -932,14 +963,9 @@ async def delete_saved_document(document_id: str):
     Удаление сохранённого документа
     """
     try:
-        doc_folder = DOCUMENTS_DIR / document_id
-        
-        if not doc_folder.exists():
+        if not document_store.delete_document(document_id):
             raise HTTPException(status_code=404, detail="Документ не найден")
         
-        import shutil
-        shutil.rmtree(doc_folder)
-        
         return {
             "success": True,
             "message": "Документ успешно удалён"
@@ -1003,7 +1029,8 @@ async def export_saved_document_to_excel(
                 detail=f"Неподдерживаемый формат: {format}. Используйте 'xls' или 'xlsx'"
             )
         
-        # Создание сервиса экспорта
+        # Создание сервиса экспорта (openpyxl/xlwt загружаются при первом экспорте)
+        from app.services.excel_export import ExcelExportService
         excel_service = ExcelExportService()
         
         # Экспорт в зависимости от формата
@@ -1108,49 +1135,54 @@ def number_to_words_ru(number: float) -> str:
     return f'{rubles_text} {rubles_form} {kopeks:02d} {kopeks_form}'.strip()
 
 
+def _render_invoice_preview(request: dict) -> str:
+    """Рендер HTML предпросмотра счёта"""
+    template = jinja_env.get_template("invoice_template.html")
+
+    # Подготовка данных для шаблона (поддержка обоих форматов)
+    total_with_vat = float(request.get('total_amount_with_vat', request.get('total_with_vat', 0)))
+    total_without_vat = float(request.get('total_amount_without_vat', request.get('total_without_vat', 0)))
+    total_vat = float(request.get('total_vat_amount', request.get('vat_amount', 0)))
+
+    # Получаем supplier и buyer (поддержка разных названий)
+    supplier = request.get('supplier', {})
+    buyer = request.get('buyer', request.get('client', {}))
+    bank = request.get('bank', {})
+    signers = request.get('signers', {})
+
+    template_data = {
+        "invoice_number": request.get('document_number', request.get('invoice_number', '')),
+        "invoice_date": request.get('document_date', request.get('invoice_date', '')),
+        "contract_info": request.get('contract_info', ''),
+        "payment_due": request.get('payment_due'),
+        "invoice_note": request.get('invoice_note', ''),
+        "supplier": supplier,
+        "bank": bank,
+        "signers": signers,
+        "client": buyer,
+        "items": request.get('items', []),
+        "vat_rate": request.get('vat_rate', 'Без НДС'),
+        "vat_amount": total_vat,
+        "total_without_vat": total_without_vat,
+        "total_with_vat": total_with_vat,
+        "amount_in_words": number_to_words_ru(total_with_vat).capitalize(),
+        "supplier_org_type": request.get('supplier_org_type', 'ooo'),
+        "supplier_stamp_image": request.get('supplier_stamp_image'),
+        "director_signature": request.get('director_signature'),
+        "accountant_signature": request.get('accountant_signature'),
+    }
+    return template.render(**template_data)
+
+
 @router.post("/invoice/preview")
-async def invoice_preview(request: dict):
+async def invoice_preview(request: dict, http_request: Request):
     """
     Предпросмотр счёта на оплату - возвращает HTML
     """
     try:
-        template = jinja_env.get_template("invoice_template.html")
-        
-        # Подготовка данных для шаблона (поддержка обоих форматов)
-        total_with_vat = float(request.get('total_amount_with_vat', request.get('total_with_vat', 0)))
-        total_without_vat = float(request.get('total_amount_without_vat', request.get('total_without_vat', 0)))
-        total_vat = float(request.get('total_vat_amount', request.get('vat_amount', 0)))
-        
-        # Получаем supplier и buyer (поддержка разных названий)
-        supplier = request.get('supplier', {})
-        buyer = request.get('buyer', request.get('client', {}))
-        bank = request.get('bank', {})
-        signers = request.get('signers', {})
-        
-        template_data = {
-            "invoice_number": request.get('document_number', request.get('invoice_number', '')),
-            "invoice_date": request.get('document_date', request.get('invoice_date', '')),
-            "contract_info": request.get('contract_info', ''),
-            "payment_due": request.get('payment_due'),
-            "invoice_note": request.get('invoice_note', ''),
-            "supplier": supplier,
-            "bank": bank,
-            "signers": signers,
-            "client": buyer,
-            "items": request.get('items', []),
-            "vat_rate": request.get('vat_rate', 'Без НДС'),
-            "vat_amount": total_vat,
-            "total_without_vat": total_without_vat,
-            "total_with_vat": total_with_vat,
-            "amount_in_words": number_to_words_ru(total_with_vat).capitalize(),
-            "supplier_org_type": request.get('supplier_org_type', 'ooo'),
-            "supplier_stamp_image": request.get('supplier_stamp_image'),
-            "director_signature": request.get('director_signature'),
-            "accountant_signature": request.get('accountant_signature'),
-        }
-        
-        html_content = template.render(**template_data)
-        return HTMLResponse(content=html_content)
+        return await _cached_preview_response(
+            "invoice", request, lambda: _render_invoice_preview(request), http_request
+        )
         
     except Exception as e:
         raise HTTPException(
@@ -1180,30 +1212,10 @@ async def generate_invoice(
                 billing = BillingService(db)
                 supplier_inn = request.get('supplier', {}).get('inn')
                 
-                # Проверяем возможность генерации
-                check = billing.check_can_generate(user, supplier_inn)
-                if not check["can_generate"]:
-                    return JSONResponse(
-                        status_code=402,  # Payment Required
-                        content={
-                            "success": False,
-                            "error": "limit_exceeded",
-                            "message": check["message"],
-                            "limits": check["limits"]
-                        }
-                    )
-                
-                # Списываем генерацию
+                # Списываем генерацию (проверка лимита и списание - одна транзакция)
                 success, source = billing.consume_generation(user, supplier_inn)
                 if not success:
-                    return JSONResponse(
-                        status_code=402,
-                        content={
-                            "success": False,
-                            "error": source,
-                            "message": "Не удалось списать генерацию"
-                        }
-                    )
+                    return _limit_exceeded_response(billing, user, source)
         
         # Загружаем шаблон
         template = jinja_env.get_template("invoice_template.html")
@@ -1240,30 +1252,17 @@ async def generate_invoice(
             "accountant_signature": request.get('accountant_signature'),
         }
         
-        # Рендерим HTML
-        html_content = template.render(**template_data)
+        # Рендерим HTML (печати и подписи - ссылками на blob-хранилище)
+        html_content = externalize_html(template.render(**template_data))
         
         # Формируем имя файла
         doc_number = request.get('document_number', request.get('invoice_number', '1'))
         doc_date = request.get('document_date', request.get('invoice_date', ''))
         filename = f"Schet_{doc_number}_{doc_date.replace('.', '').replace('-', '')}"
         
-        # Создаём папку для документа
         document_id = str(uuid.uuid4())
-        doc_folder = DOCUMENTS_DIR / document_id
-        doc_folder.mkdir(exist_ok=True)
-        
-        # Сохраняем HTML
-        html_path = doc_folder / "document.html"
-        with open(html_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
-        
-        # Сохраняем данные формы для редактирования
-        form_data_path = doc_folder / "form_data.json"
-        with open(form_data_path, "w", encoding="utf-8") as f:
-            json.dump(request, f, ensure_ascii=False, indent=2)
         
-        # Сохраняем метаданные (как в УПД)
+        # Метаданные (как в УПД)
         metadata = {
             "id": document_id,
             "type": "invoice",
@@ -1276,19 +1275,25 @@ async def generate_invoice(
             "total_amount": total_with_vat,
         }
         
-        metadata_path = doc_folder / "metadata.json"
-        with open(metadata_path, "w", encoding="utf-8") as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
-        
         # Генерируем PDF если доступен WeasyPrint
-        if WEASYPRINT_AVAILABLE:
-            pdf_path = doc_folder / "document.pdf"
-            WeasyHTML(string=html_content).write_pdf(str(pdf_path))
-            
+        pdf_bytes = None
+        WeasyHTML = get_weasyprint_html()
+        if WeasyHTML is not None:
+            with track_render("pdf"):
+                pdf_bytes = WeasyHTML(string=html_content, base_url=BLOB_BASE_URL, url_fetcher=blob_url_fetcher).write_pdf()
+        
+        # Сохраняем документ (HTML, данные формы, метаданные и PDF) одним файлом
+        document_store.save_document(
+            document_id,
+            metadata=metadata,
+            form_data=externalize_data_urls(request),
+            html=html_content,
+            pdf=pdf_bytes,
+        )
+        
+        if pdf_bytes is not None:
             # Возвращаем PDF напрямую
-            pdf_buffer = io.BytesIO()
-            WeasyHTML(string=html_content).write_pdf(pdf_buffer)
-            pdf_buffer.seek(0)
+            pdf_buffer = io.BytesIO(pdf_bytes)
             
             from urllib.parse import quote
             filename_encoded = quote(filename + ".pdf")
@@ -1326,30 +1331,23 @@ async def download_invoice_pdf(document_id: str):
     Скачивание PDF счёта
     """
     try:
-        doc_folder = DOCUMENTS_DIR / document_id
-        
-        if not doc_folder.exists():
+        if not document_store.document_exists(document_id):
             raise HTTPException(status_code=404, detail="Документ не найден")
         
-        # Читаем metadata.json
-        meta_path = doc_folder / "metadata.json"
-        if meta_path.exists():
-            with open(meta_path, "r", encoding="utf-8") as f:
-                meta = json.load(f)
-        else:
-            meta = {}
+        # Читаем метаданные
+        meta = document_store.read_metadata(document_id) or {}
         
         invoice_number = meta.get('document_number', document_id)
         invoice_date = meta.get('document_date', '')
         filename = f"Schet_{invoice_number}_{invoice_date.replace('.', '')}"
         
-        # Проверяем PDF
-        pdf_path = doc_folder / "document.pdf"
-        if pdf_path.exists():
+        # Проверяем сохранённый PDF
+        pdf_bytes = document_store.read_pdf(document_id)
+        if pdf_bytes is not None:
             from urllib.parse import quote
             filename_encoded = quote(filename + ".pdf")
             return StreamingResponse(
-                open(pdf_path, "rb"),
+                io.BytesIO(pdf_bytes),
                 media_type="application/pdf",
                 headers={
                     "Content-Disposition": f"attachment; filename*=UTF-8''{filename_encoded}"
@@ -1357,16 +1355,15 @@ async def download_invoice_pdf(document_id: str):
             )
         
         # Если PDF нет - генерируем из HTML
-        html_path = doc_folder / "document.html"
-        if not html_path.exists():
+        html_content = document_store.read_html(document_id)
+        if html_content is None:
             raise HTTPException(status_code=404, detail="HTML документа не найден")
         
-        with open(html_path, "r", encoding="utf-8") as f:
-            html_content = f.read()
-        
-        if WEASYPRINT_AVAILABLE:
+        WeasyHTML = get_weasyprint_html()
+        if WeasyHTML is not None:
             pdf_buffer = io.BytesIO()
-            WeasyHTML(string=html_content).write_pdf(pdf_buffer)
+            with track_render("pdf"):
+                WeasyHTML(string=html_content, base_url=BLOB_BASE_URL, url_fetcher=blob_url_fetcher).write_pdf(pdf_buffer)
             pdf_buffer.seek(0)
             
             from urllib.parse import quote
@@ -1397,24 +1394,12 @@ async def download_invoice_pdf(document_id: str):
 
 
 @router.get("/invoice/{document_id}/preview")
-async def invoice_preview_saved(document_id: str):
+async def invoice_preview_saved(document_id: str, request: Request):
     """
     Просмотр HTML сохранённого счёта
     """
     try:
-        doc_folder = DOCUMENTS_DIR / document_id
-        
-        if not doc_folder.exists():
-            raise HTTPException(status_code=404, detail="Документ не найден")
-        
-        html_path = doc_folder / "document.html"
-        if not html_path.exists():
-            raise HTTPException(status_code=404, detail="HTML документа не найден")
-        
-        with open(html_path, "r", encoding="utf-8") as f:
-            html_content = f.read()
-        
-        return HTMLResponse(content=html_content)
+        return _saved_html_response(document_id, request, "HTML документа не найден")
         
     except HTTPException:
         raise
@@ -1501,6 +1486,91 @@ def number_to_words_ru(number: float) -> str:
     return ' '.join(result).strip()
 
 
+def _render_akt_preview(data: dict) -> str:
+    """Рендер HTML предпросмотра акта"""
+    template = jinja_env.get_template("akt_template.html")
+
+    # Парсим дату документа
+    doc_date = data.get('document_date', '')
+    doc_date_day = ''
+    doc_date_month = ''
+    doc_date_year = ''
+
+    if doc_date:
+        parts = doc_date.split('.')
+        if len(parts) == 3:
+            doc_date_day = parts[0]
+            months_ru = ['января', 'февраля', 'марта', 'апреля', 'мая', 'июня',
+                         'июля', 'августа', 'сентября', 'октября', 'ноября', 'декабря']
+            month_idx = int(parts[1]) - 1
+            doc_date_month = months_ru[month_idx] if 0 <= month_idx < 12 else parts[1]
+            doc_date_year = parts[2]
+
+    # Подготовка данных
+    items = data.get('items', [])
+    vat_rate = data.get('vat_rate', '20')
+
+    total_without_vat = sum(float(item.get('amount', 0)) for item in items)
+
+    if vat_rate == 'none':
+        total_vat = 0
+        total_amount = total_without_vat
+    else:
+        vat_percent = float(vat_rate)
+        if data.get('vat_type') == 'included':
+            # НДС включен в цену
+            total_amount = total_without_vat
+            total_vat = total_amount * vat_percent / (100 + vat_percent)
+            total_without_vat = total_amount - total_vat
+        else:
+            # НДС сверху
+            total_vat = total_without_vat * vat_percent / 100
+            total_amount = total_without_vat + total_vat
+
+    # Сумма прописью
+    total_amount_words = number_to_words_ru(total_amount)
+    total_vat_words = number_to_words_ru(total_vat)
+
+    template_data = {
+        'document_number': data.get('document_number', ''),
+        'document_date_day': doc_date_day,
+        'document_date_month': doc_date_month,
+        'document_date_year': doc_date_year,
+        'contract_number': data.get('contract_number', ''),
+        'contract_date': data.get('contract_date', ''),
+
+        'executor': {
+            'name': data.get('executor', {}).get('name', ''),
+            'inn': data.get('executor', {}).get('inn', ''),
+            'kpp': data.get('executor', {}).get('kpp', ''),
+            'address': data.get('executor', {}).get('address', ''),
+        },
+
+        'customer': {
+            'name': data.get('customer', {}).get('name', ''),
+            'inn': data.get('customer', {}).get('inn', ''),
+            'kpp': data.get('customer', {}).get('kpp', ''),
+            'address': data.get('customer', {}).get('address', ''),
+        },
+
+        'executor_signatory': data.get('executor_signatory', ''),
+        'customer_signatory': data.get('customer_signatory', ''),
+        'executor_org_type': data.get('executor_org_type', 'ooo'),
+        'executor_stamp_image': data.get('executor_stamp_image'),
+        'executor_signature': data.get('executor_signature'),
+
+        'items': items,
+        'vat_rate': vat_rate,
+        'total_without_vat': total_without_vat,
+        'total_vat': total_vat,
+        'total_amount': total_amount,
+        'total_amount_words': total_amount_words,
+        'total_vat_words': total_vat_words,
+        'notes': data.get('notes', ''),
+    }
+    return template.render(**template_data)
+
+
 @router.post("/akt/preview")
 async def akt_preview(request: Request):
     """
@@ -1508,89 +1578,9 @@ async def akt_preview(request: Request):
     """
     try:
         data = await request.json()
-        template = jinja_env.get_template("akt_template.html")
-        
-        # Парсим дату документа
-        doc_date = data.get('document_date', '')
-        doc_date_day = ''
-        doc_date_month = ''
-        doc_date_year = ''
-        
-        if doc_date:
-            parts = doc_date.split('.')
-            if len(parts) == 3:
-                doc_date_day = parts[0]
-                months_ru = ['января', 'февраля', 'марта', 'апреля', 'мая', 'июня',
-                             'июля', 'августа', 'сентября', 'октября', 'ноября', 'декабря']
-                month_idx = int(parts[1]) - 1
-                doc_date_month = months_ru[month_idx] if 0 <= month_idx < 12 else parts[1]
-                doc_date_year = parts[2]
-        
-        # Подготовка данных
-        items = data.get('items', [])
-        vat_rate = data.get('vat_rate', '20')
-        
-        total_without_vat = sum(float(item.get('amount', 0)) for item in items)
-        
-        if vat_rate == 'none':
-            total_vat = 0
-            total_amount = total_without_vat
-        else:
-            vat_percent = float(vat_rate)
-            if data.get('vat_type') == 'included':
-                # НДС включен в цену
-                total_amount = total_without_vat
-                total_vat = total_amount * vat_percent / (100 + vat_percent)
-                total_without_vat = total_amount - total_vat
-            else:
-                # НДС сверху
-                total_vat = total_without_vat * vat_percent / 100
-                total_amount = total_without_vat + total_vat
-        
-        # Сумма прописью
-        total_amount_words = number_to_words_ru(total_amount)
-        total_vat_words = number_to_words_ru(total_vat)
-        
-        template_data = {
-            'document_number': data.get('document_number', ''),
-            'document_date_day': doc_date_day,
-            'document_date_month': doc_date_month,
-            'document_date_year': doc_date_year,
-            'contract_number': data.get('contract_number', ''),
-            'contract_date': data.get('contract_date', ''),
-            
-            'executor': {
-                'name': data.get('executor', {}).get('name', ''),
-                'inn': data.get('executor', {}).get('inn', ''),
-                'kpp': data.get('executor', {}).get('kpp', ''),
-                'address': data.get('executor', {}).get('address', ''),
-            },
-            
-            'customer': {
-                'name': data.get('customer', {}).get('name', ''),
-                'inn': data.get('customer', {}).get('inn', ''),
-                'kpp': data.get('customer', {}).get('kpp', ''),
-                'address': data.get('customer', {}).get('address', ''),
-            },
-            
-            'executor_signatory': data.get('executor_signatory', ''),
-            'customer_signatory': data.get('customer_signatory', ''),
-            'executor_org_type': data.get('executor_org_type', 'ooo'),
-            'executor_stamp_image': data.get('executor_stamp_image'),
-            'executor_signature': data.get('executor_signature'),
-            
-            'items': items,
-            'vat_rate': vat_rate,
-            'total_without_vat': total_without_vat,
-            'total_vat': total_vat,
-            'total_amount': total_amount,
-            'total_amount_words': total_amount_words,
-            'total_vat_words': total_vat_words,
-            'notes': data.get('notes', ''),
-        }
-        
-        html_content = template.render(**template_data)
-        return HTMLResponse(content=html_content)
+        return await _cached_preview_response(
+            "akt", data, lambda: _render_akt_preview(data), request
+        )
         
     except Exception as e:
         raise HTTPException(
@@ -1722,24 +1712,11 @@ async def akt_save(
             'notes': data.get('notes', ''),
         }
         
-        html_content = template.render(**template_data)
+        html_content = externalize_html(template.render(**template_data))
         
-        # Создаём папку для документа
         document_id = str(uuid.uuid4())
-        doc_folder = DOCUMENTS_DIR / document_id
-        doc_folder.mkdir(parents=True, exist_ok=True)
-        
-        # Сохраняем HTML
-        html_path = doc_folder / "document.html"
-        with open(html_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
         
-        # Сохраняем данные формы
-        data_path = doc_folder / "data.json"
-        with open(data_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
-        # Сохраняем метаданные (формат совместимый с УПД для отображения в списке)
+        # Метаданные (формат совместимый с УПД для отображения в списке)
         metadata = {
             "id": document_id,
             "type": "akt",
@@ -1752,24 +1729,42 @@ async def akt_save(
             "created_at": datetime.now().isoformat(),
         }
         
-        meta_path = doc_folder / "metadata.json"
-        with open(meta_path, "w", encoding="utf-8") as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
-        
-        # Списываем генерацию
-        seller_inn = data.get('executor', {}).get('inn', '')
-        billing.consume_generation(user, seller_inn)
-        
         # Генерируем PDF если возможно
+        pdf_bytes = None
         pdf_url = None
-        if WEASYPRINT_AVAILABLE:
+        WeasyHTML = get_weasyprint_html()
+        if WeasyHTML is not None:
             try:
-                pdf_path = doc_folder / "document.pdf"
-                WeasyHTML(string=html_content).write_pdf(str(pdf_path))
+                with track_render("pdf"):
+                    pdf_bytes = WeasyHTML(string=html_content, base_url=BLOB_BASE_URL, url_fetcher=blob_url_fetcher).write_pdf()
                 pdf_url = f"/api/v1/documents/akt/{document_id}/download"
             except Exception as pdf_error:
                 print(f"[AKT] Ошибка генерации PDF: {pdf_error}")
         
+        # Сохраняем документ (HTML, данные формы, метаданные и PDF) одним файлом
+        document_store.save_document(
+            document_id,
+            metadata=metadata,
+            form_data=externalize_data_urls(data),
+            html=html_content,
+            pdf=pdf_bytes,
+        )
+        
+        # Списываем генерацию; если лимит закончился параллельным запросом - документ не выдаём
+        seller_inn = data.get('executor', {}).get('inn', '')
+        success, source = billing.consume_generation(user, seller_inn)
+        if not success:
+            document_store.delete_document(document_id)
+            return JSONResponse(
+                status_code=402,
+                content={
+                    "success": False,
+                    "message": LIMIT_MESSAGES.get(source, "Не удалось списать генерацию"),
+                    "limit_reached": True,
+                    "limits": billing.get_user_limits(user),
+                }
+            )
+        
         return JSONResponse(content={
             "success": True,
             "message": "Акт выполненных работ успешно сохранён",
@@ -1805,30 +1800,23 @@ async def akt_download(
         raise HTTPException(status_code=401, detail="Требуется авторизация")
     
     try:
-        doc_folder = DOCUMENTS_DIR / document_id
-        
-        if not doc_folder.exists():
+        if not document_store.document_exists(document_id):
             raise HTTPException(status_code=404, detail="Документ не найден")
         
-        # Читаем metadata.json
-        meta_path = doc_folder / "metadata.json"
-        if meta_path.exists():
-            with open(meta_path, "r", encoding="utf-8") as f:
-                meta = json.load(f)
-        else:
-            meta = {}
+        # Читаем метаданные
+        meta = document_store.read_metadata(document_id) or {}
         
         akt_number = meta.get('document_number', document_id)
         akt_date = meta.get('document_date', '')
         filename = f"Akt_{akt_number}_{akt_date.replace('.', '')}"
         
-        # Проверяем PDF
-        pdf_path = doc_folder / "document.pdf"
-        if pdf_path.exists():
+        # Проверяем сохранённый PDF
+        pdf_bytes = document_store.read_pdf(document_id)
+        if pdf_bytes is not None:
             from urllib.parse import quote
             filename_encoded = quote(filename + ".pdf")
             return StreamingResponse(
-                open(pdf_path, "rb"),
+                io.BytesIO(pdf_bytes),
                 media_type="application/pdf",
                 headers={
                     "Content-Disposition": f"attachment; filename*=UTF-8''{filename_encoded}"
@@ -1836,16 +1824,15 @@ async def akt_download(
             )
         
         # Если PDF нет - генерируем из HTML
-        html_path = doc_folder / "document.html"
-        if not html_path.exists():
+        html_content = document_store.read_html(document_id)
+        if html_content is None:
             raise HTTPException(status_code=404, detail="HTML документа не найден")
         
-        with open(html_path, "r", encoding="utf-8") as f:
-            html_content = f.read()
-        
-        if WEASYPRINT_AVAILABLE:
+        WeasyHTML = get_weasyprint_html()
+        if WeasyHTML is not None:
             pdf_buffer = io.BytesIO()
-            WeasyHTML(string=html_content).write_pdf(pdf_buffer)
+            with track_render("pdf"):
+                WeasyHTML(string=html_content, base_url=BLOB_BASE_URL, url_fetcher=blob_url_fetcher).write_pdf(pdf_buffer)
             pdf_buffer.seek(0)
             
             from urllib.parse import quote
@@ -1876,24 +1863,12 @@ async def akt_download(
 
 
 @router.get("/akt/{document_id}/preview")
-async def akt_preview_saved(document_id: str):
+async def akt_preview_saved(document_id: str, request: Request):
     """
     Просмотр HTML сохранённого Акта
     """
     try:
-        doc_folder = DOCUMENTS_DIR / document_id
-        
-        if not doc_folder.exists():
-            raise HTTPException(status_code=404, detail="Документ не найден")
-        
-        html_path = doc_folder / "document.html"
-        if not html_path.exists():
-            raise HTTPException(status_code=404, detail="HTML документа не найден")
-        
-        with open(html_path, "r", encoding="utf-8") as f:
-            html_content = f.read()
-        
-        return HTMLResponse(content=html_content)
+        return _saved_html_response(document_id, request, "HTML документа не найден")
         
     except HTTPException:
         raise
@@ -1919,18 +1894,13 @@ async def akt_get_data(
         raise HTTPException(status_code=401, detail="Требуется авторизация")
     
     try:
-        doc_folder = DOCUMENTS_DIR / document_id
-        
-        if not doc_folder.exists():
+        if not document_store.document_exists(document_id):
             raise HTTPException(status_code=404, detail="Документ не найден")
         
-        data_path = doc_folder / "data.json"
-        if not data_path.exists():
+        data = document_store.read_form_data(document_id)
+        if data is None:
             raise HTTPException(status_code=404, detail="Данные документа не найдены")
         
-        with open(data_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        
         return JSONResponse(content={"success": True, "data": data})
         
     except HTTPException:
@@ -4,17 +4,18 @@ API для черновиков документов гостей
 """
 
 import secrets
-import json
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, HTTPException, Request, Depends
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, defer
 
 from app.database import get_db
-from app.models import GuestDraft, User
-from app.api.auth import get_current_user_optional
+from app.models import GuestDraft
+from app.core.auth import UserSnapshot, current_user_optional
+from app.services.draft_patch import PatchError, apply_patch
 
 router = APIRouter(prefix="/api/v1/drafts", tags=["drafts"])
 
@@ -31,6 +32,7 @@ class DraftResponse(BaseModel):
     document_type: str
     created_at: str
     expires_at: str
+    version: int
     message: str
 
 
@@ -38,6 +40,36 @@ class DraftClaimRequest(BaseModel):
     draft_token: str
 
 
+class DraftPatch(BaseModel):
+    version: int  # Версия черновика, к которой относятся операции
+    operations: List[Dict[str, Any]]  # Операции JSON Patch (RFC 6902)
+
+
+# === Вспомогательные функции ===
+
+def _get_active_draft(db: Session, draft_token: str, with_data: bool = True) -> GuestDraft:
+    """
+    Черновик по токену с проверкой срока действия в SQL:
+    просроченный черновик не загружает document_data.
+    with_data=False - без document_data (для частичного обновления).
+    """
+    query = db.query(GuestDraft)
+    if not with_data:
+        query = query.options(defer(GuestDraft.document_data))
+    draft = query.filter(
+        GuestDraft.draft_token == draft_token,
+        or_(GuestDraft.expires_at.is_(None), GuestDraft.expires_at >= datetime.utcnow())
+    ).first()
+    if draft:
+        return draft
+    
+    # Отличаем просроченный черновик от несуществующего (без чтения данных)
+    exists = db.query(GuestDraft.id).filter(GuestDraft.draft_token == draft_token).first()
+    if exists:
+        raise HTTPException(status_code=410, detail="Срок действия черновика истёк")
+    raise HTTPException(status_code=404, detail="Черновик не найден")
+
+
 # === Endpoints ===
 
 @router.post("", response_model=DraftResponse)
@@ -71,7 +103,7 @@ async def create_draft(
     draft = GuestDraft(
         draft_token=draft_token,
         document_type=data.document_type,
-        document_data=json.dumps(data.document_data, ensure_ascii=False),
+        document_data=data.document_data,
         ip_address=ip_address,
         expires_at=expires_at
     )
@@ -85,6 +117,7 @@ async def create_draft(
         document_type=data.document_type,
         created_at=draft.created_at.isoformat(),
         expires_at=expires_at.isoformat(),
+        version=draft.version,
         message="Черновик сохранён"
     )
 
@@ -95,21 +128,13 @@ async def get_draft(
     db: Session = Depends(get_db)
 ):
     """Получить черновик по токену"""
-    draft = db.query(GuestDraft).filter(
-        GuestDraft.draft_token == draft_token
-    ).first()
-    
-    if not draft:
-        raise HTTPException(status_code=404, detail="Черновик не найден")
-    
-    # Проверяем срок действия
-    if draft.expires_at and draft.expires_at < datetime.utcnow():
-        raise HTTPException(status_code=410, detail="Срок действия черновика истёк")
+    draft = _get_active_draft(db, draft_token)
     
     return {
         "draft_token": draft.draft_token,
         "document_type": draft.document_type,
-        "document_data": json.loads(draft.document_data),
+        "document_data": draft.document_data,
+        "version": draft.version,
         "is_claimed": draft.is_claimed,
         "created_at": draft.created_at.isoformat(),
         "expires_at": draft.expires_at.isoformat() if draft.expires_at else None
@@ -119,7 +144,7 @@ async def get_draft(
 @router.post("/claim")
 async def claim_draft(
     data: DraftClaimRequest,
-    current_user: User = Depends(get_current_user_optional),
+    current_user: Optional[UserSnapshot] = Depends(current_user_optional),
     db: Session = Depends(get_db)
 ):
     """
@@ -153,7 +178,7 @@ async def claim_draft(
         "success": True,
         "message": "Документ создан в личном кабинете",
         "document_id": doc_id,
-        "document_data": json.loads(draft.document_data)
+        "document_data": draft.document_data
     }
 
 
@@ -163,18 +188,11 @@ async def update_draft(
     data: DraftCreate,
     db: Session = Depends(get_db)
 ):
-    """Обновить данные черновика"""
-    draft = db.query(GuestDraft).filter(
-        GuestDraft.draft_token == draft_token
-    ).first()
+    """Обновить данные черновика целиком"""
+    draft = _get_active_draft(db, draft_token, with_data=False)
     
-    if not draft:
-        raise HTTPException(status_code=404, detail="Черновик не найден")
-    
-    if draft.expires_at and draft.expires_at < datetime.utcnow():
-        raise HTTPException(status_code=410, detail="Срок действия черновика истёк")
-    
-    draft.document_data = json.dumps(data.document_data, ensure_ascii=False)
+    draft.document_data = data.document_data
+    draft.version = draft.version + 1
     draft.updated_at = datetime.utcnow()
     
     db.commit()
@@ -182,5 +200,41 @@ async def update_draft(
     return {
         "success": True,
         "message": "Черновик обновлён",
-        "draft_token": draft_token
+        "draft_token": draft_token,
+        "version": draft.version
+    }
+
+
+@router.patch("/{draft_token}")
+async def patch_draft(
+    draft_token: str,
+    data: DraftPatch,
+    db: Session = Depends(get_db)
+):
+    """
+    Частично обновить черновик операциями JSON Patch (RFC 6902).
+    Операции применяются, только если версия черновика равна data.version;
+    иначе 409 с текущей версией - клиент перечитывает черновик.
+    """
+    draft = _get_active_draft(db, draft_token, with_data=False)
+    
+    try:
+        new_version = apply_patch(db, draft.id, data.version, data.operations)
+    except PatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if new_version is None:
+        current_version = db.query(GuestDraft.version).filter(GuestDraft.id == draft.id).scalar()
+        if current_version != data.version:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "Черновик изменён в другой вкладке", "version": current_version}
+            )
+        raise HTTPException(status_code=422, detail="Патч не может быть применён к черновику")
+    
+    return {
+        "success": True,
+        "message": "Черновик обновлён",
+        "draft_token": draft_token,
+        "version": new_version
     }
@@ -5,7 +5,6 @@ OAuth API endpoints (Yandex)
 import logging
 import os
 import secrets
-import httpx
 from datetime import datetime, timedelta
 from urllib.parse import urlencode
 
@@ -413,6 +412,7 @@ async def exchange_code_for_token(code: str) -> dict:
     """
     Exchange authorization code for access token
     """
+    import httpx
     async with httpx.AsyncClient() as client:
         response = await client.post(
             "https://oauth.yandex.ru/token",
@@ -438,6 +438,7 @@ async def get_yandex_user_info(access_token: str) -> dict:
     """
     Get user info from Yandex API
     """
+    import httpx
     async with httpx.AsyncClient() as client:
         response = await client.get(
             "https://login.yandex.ru/info",
@@ -459,6 +460,7 @@ async def get_yandex_user_info(access_token: str) -> dict:
 
 async def exchange_code_for_google_token(code: str) -> dict:
     """Exchange Google authorization code for access token."""
+    import httpx
     if not GOOGLE_CLIENT_ID or not GOOGLE_CLIENT_SECRET:
         logger.warning("[GOOGLE_OAUTH] GOOGLE_CLIENT_ID или GOOGLE_CLIENT_SECRET пусты. Проверьте .env и что переменные передаются в контейнер (docker-compose).")
         raise HTTPException(status_code=500, detail="Google OAuth not configured")
@@ -498,6 +500,7 @@ async def exchange_code_for_google_token(code: str) -> dict:
 
 async def get_google_user_info(access_token: str) -> dict:
     """Get user info from Google API."""
+    import httpx
     async with httpx.AsyncClient() as client:
         response = await client.get(
             "https://www.googleapis.com/oauth2/v2/userinfo",
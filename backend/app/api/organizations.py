@@ -9,9 +9,9 @@ from datetime import datetime
 import uuid
 from typing import List, Optional
 
-import jwt
 from fastapi import APIRouter, HTTPException, Header, Cookie
 
+from app.core.auth import get_user_id_from_token
 from app.schemas.organizations import (
     Organization, OrganizationCreate, OrganizationUpdate,
     Contractor, ContractorCreate, ContractorUpdate
@@ -19,10 +19,6 @@ from app.schemas.organizations import (
 
 router = APIRouter()
 
-# Настройки JWT (должны совпадать с auth.py)
-SECRET_KEY = os.getenv("SECRET_KEY", "documatica-secret-key-change-in-production")
-ALGORITHM = "HS256"
-
 # Путь к файлам данных (для MVP используем JSON файлы)
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
@@ -31,29 +27,6 @@ ORGANIZATIONS_FILE = DATA_DIR / "organizations.json"
 CONTRACTORS_FILE = DATA_DIR / "contractors.json"
 
 
-def get_user_id_from_token(authorization: Optional[str] = None, access_token: Optional[str] = None) -> Optional[int]:
-    """Извлекает user_id из JWT токена (Header или Cookie). Возвращает None если токен отсутствует или невалиден."""
-    token = None
-    
-    # Сначала пробуем Header
-    if authorization and authorization.startswith("Bearer "):
-        token = authorization.split(" ")[1]
-    # Потом Cookie
-    elif access_token:
-        token = access_token
-    
-    if not token:
-        return None
-    
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        # Токен использует "sub" для user_id
-        user_id_str = payload.get("sub") or payload.get("user_id")
-        return int(user_id_str) if user_id_str else None
-    except (jwt.ExpiredSignatureError, jwt.InvalidTokenError, ValueError, TypeError):
-        return None
-
-
 def load_organizations() -> List[dict]:
     """Загрузка организаций из файла"""
     if ORGANIZATIONS_FILE.exists():
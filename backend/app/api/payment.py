@@ -8,7 +8,6 @@ import json
 import uuid
 from datetime import datetime
 from typing import Optional
-import httpx
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
@@ -65,6 +64,7 @@ async def get_state_from_tbank(payment_id: str) -> Optional[str]:
     Запрос статуса платежа в Т-Банке (GetState).
     Возвращает Status (CONFIRMED, PENDING, REJECTED и т.д.) или None при ошибке.
     """
+    import httpx
     terminal_key = getattr(settings, 'TBANK_TERMINAL_KEY', None)
     terminal_password = getattr(settings, 'TBANK_PASSWORD', None)
     if not terminal_key or not terminal_password or is_mock_mode():
@@ -103,6 +103,7 @@ async def create_payment(
     db: Session = Depends(get_db)
 ):
     """Создать платёж в Т-Банке"""
+    import httpx
     
     terminal_key = getattr(settings, 'TBANK_TERMINAL_KEY', None)
     terminal_password = getattr(settings, 'TBANK_PASSWORD', None)
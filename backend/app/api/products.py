@@ -10,18 +10,13 @@ from datetime import datetime
 import uuid
 from typing import List, Optional
 
-import jwt
 from fastapi import APIRouter, HTTPException, Header, Cookie, UploadFile, File
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import openpyxl
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
 
-router = APIRouter()
+from app.core.auth import get_user_id_from_token
 
-# Настройки JWT (должны совпадать с auth.py)
-SECRET_KEY = os.getenv("SECRET_KEY", "documatica-secret-key-change-in-production")
-ALGORITHM = "HS256"
+router = APIRouter()
 
 # Путь к файлам данных
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
@@ -30,25 +25,6 @@ DATA_DIR.mkdir(exist_ok=True)
 PRODUCTS_FILE = DATA_DIR / "products.json"
 
 
-def get_user_id_from_token(authorization: Optional[str] = None, access_token: Optional[str] = None) -> Optional[int]:
-    """Извлекает user_id из JWT токена. Возвращает None если токен отсутствует или невалиден."""
-    token = None
-    if authorization and authorization.startswith("Bearer "):
-        token = authorization.split(" ")[1]
-    elif access_token:
-        token = access_token
-    
-    if not token:
-        return None
-    
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id_str = payload.get("sub") or payload.get("user_id")
-        return int(user_id_str) if user_id_str else None
-    except (jwt.ExpiredSignatureError, jwt.InvalidTokenError, ValueError, TypeError):
-        return None
-
-
 class ProductBase(BaseModel):
     type: str = "product"  # product или service
     name: str
@@ -260,6 +236,10 @@ async def search_products(
 @router.get("/products/template/download")
 async def download_products_template():
     """Скачать шаблон XLS для импорта товаров"""
+    # openpyxl загружается при первом обращении, а не при старте
+    import openpyxl
+    from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+
     wb = openpyxl.Workbook()
     ws = wb.active
     ws.title = "Товары и услуги"
@@ -358,6 +338,8 @@ async def import_products_from_xls(
         raise HTTPException(status_code=400, detail="Файл должен быть в формате .xlsx или .xls")
     
     try:
+        import openpyxl
+
         contents = await file.read()
         wb = openpyxl.load_workbook(io.BytesIO(contents))
         ws = wb.active
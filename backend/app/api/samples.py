@@ -2,15 +2,13 @@
 API для скачивания образцов документов
 """
 
-from fastapi import APIRouter, HTTPException, Header, Cookie, Depends
+from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
 from typing import Optional
 from pathlib import Path
 import logging
 
-from app.database import get_db
-from app.api.auth import get_current_user_optional
+from app.core.auth import UserSnapshot, current_user_optional
 
 logger = logging.getLogger(__name__)
 
@@ -23,16 +21,13 @@ SAMPLES_DIR = Path(__file__).parent.parent / "static" / "samples"
 @router.get("/{sample_type}")
 async def download_sample(
     sample_type: str,
-    authorization: Optional[str] = Header(None),
-    access_token: Optional[str] = Cookie(None),
-    db: Session = Depends(get_db)
+    user: Optional[UserSnapshot] = Depends(current_user_optional),
 ):
     """
     Скачивание образца документа в PDF.
     Требуется авторизация.
     """
     # Проверка авторизации
-    user = await get_current_user_optional(authorization, access_token, db)
     if not user:
         raise HTTPException(
             status_code=401,
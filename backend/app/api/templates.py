@@ -9,15 +9,12 @@ from datetime import datetime
 import uuid
 from typing import List, Optional
 
-import jwt
 from fastapi import APIRouter, HTTPException, Header, Cookie
 from pydantic import BaseModel, Field
 
-router = APIRouter()
+from app.core.auth import get_user_id_from_token
 
-# Настройки JWT
-SECRET_KEY = os.getenv("SECRET_KEY", "documatica-secret-key-change-in-production")
-ALGORITHM = "HS256"
+router = APIRouter()
 
 # Путь к файлам данных
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
@@ -26,25 +23,6 @@ DATA_DIR.mkdir(exist_ok=True)
 TEMPLATES_FILE = DATA_DIR / "document_templates.json"
 
 
-def get_user_id_from_token(authorization: Optional[str] = None, access_token: Optional[str] = None) -> Optional[int]:
-    """Извлекает user_id из JWT токена."""
-    token = None
-    if authorization and authorization.startswith("Bearer "):
-        token = authorization.split(" ")[1]
-    elif access_token:
-        token = access_token
-    
-    if not token:
-        return None
-    
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id_str = payload.get("sub") or payload.get("user_id")
-        return int(user_id_str) if user_id_str else None
-    except (jwt.ExpiredSignatureError, jwt.InvalidTokenError, ValueError, TypeError):
-        return None
-
-
 class TemplateCreate(BaseModel):
     name: str = Field(..., description="Название шаблона")
     doc_type: str = Field("upd", description="Тип документа: upd, schet, akt")
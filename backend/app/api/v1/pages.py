@@ -10,6 +10,7 @@ from sqlalchemy.orm.attributes import flag_modified
 
 from app.database import get_db
 from app.models import Page, PageSection, ContentBlock
+from app.services import link_graph
 
 router = APIRouter()
 
@@ -196,6 +197,7 @@ async def delete_section(
         raise HTTPException(status_code=404, detail="Section not found")
     
     db.delete(section)
+    link_graph.index_page(db, section.page_id)
     db.commit()
     
     return {"success": True}
@@ -241,6 +243,7 @@ async def create_block(
     )
     
     db.add(new_block)
+    link_graph.index_page(db, section.page_id)
     db.commit()
     db.refresh(new_block)
     
@@ -273,6 +276,7 @@ async def update_block(
     for field, value in block_update.dict(exclude_unset=True).items():
         setattr(block, field, value)
     
+    link_graph.index_page(db, block.section.page_id)
     db.commit()
     
     return {"success": True}
@@ -288,7 +292,9 @@ async def delete_block(
     if not block:
         raise HTTPException(status_code=404, detail="Block not found")
     
+    page_id = block.section.page_id
     db.delete(block)
+    link_graph.index_page(db, page_id)
     db.commit()
     
     return {"success": True}
@@ -476,5 +482,6 @@ async def replace_page_structure(
             )
             db.add(new_block)
 
+    link_graph.index_page(db, page_id)
     db.commit()
     return {"success": True}
@@ -0,0 +1,106 @@
+"""
+Статика с хэшем содержимого в имени файла
+
+scripts/build_assets.py копирует каждый JS/CSS из app/static рядом с
+оригиналом под именем с хэшем (css/documatica.css ->
+css/documatica.3f2a9c1b7e04.css) - относительные url() и импорты продолжают
+работать - и пишет манифест static/manifest.json. Для текстовых файлов
+заранее создаются .gz и .br (brotli - если установлен пакет brotli),
+их отдаёт PrecompressedStaticFiles (app/core/static_files.py).
+
+В шаблонах: {{ asset("css/documatica.css") }}. Файлы с хэшем кэшируются
+браузером навсегда. Без манифеста (разработка) URL получает ?v=<хэш
+содержимого>, который пересчитывается при изменении файла.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).parent.parent / "static"
+MANIFEST_PATH = STATIC_DIR / "manifest.json"
+STATIC_URL = "/static/"
+
+HASH_LENGTH = 12
+# Расширения, для которых создаются файлы с хэшем
+FINGERPRINT_SUFFIXES = (".js", ".css")
+# Каталоги, файлы которых загружаются по исходным именам (TinyMCE грузит плагины сам)
+FINGERPRINT_SKIP_DIRS = ("js/tinymce/",)
+# Расширения, для которых заранее создаются .gz/.br
+COMPRESS_SUFFIXES = (".js", ".css", ".svg", ".json", ".map", ".txt", ".html", ".xml", ".ttf", ".eot")
+COMPRESS_MIN_SIZE = 1024
+
+_manifest: Optional[Dict[str, str]] = None
+_fingerprinted: frozenset = frozenset()
+_dev_hashes: Dict[str, Tuple[Tuple[int, int], str]] = {}
+_lock = threading.Lock()
+
+
+def file_hash(path: Path) -> str:
+    """Хэш содержимого файла для имени/версии"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def fingerprinted_name(path: str, digest: str) -> str:
+    """css/app.css + хэш -> css/app.<хэш>.css"""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{digest}{ext}"
+
+
+def load_manifest() -> Dict[str, str]:
+    """Манифест {исходный путь: путь с хэшем}; пустой, если сборка не выполнялась"""
+    global _manifest, _fingerprinted
+    if _manifest is not None:
+        return _manifest
+    with _lock:
+        if _manifest is None:
+            manifest: Dict[str, str] = {}
+            if MANIFEST_PATH.exists():
+                try:
+                    manifest = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Asset manifest {MANIFEST_PATH} ignored: {e}")
+            _fingerprinted = frozenset(STATIC_URL + path for path in manifest.values())
+            _manifest = manifest
+    return _manifest
+
+
+def is_fingerprinted(url_path: str) -> bool:
+    """URL файла с хэшем из манифеста (можно кэшировать навсегда)"""
+    load_manifest()
+    return url_path in _fingerprinted
+
+
+def _dev_url(path: str) -> str:
+    full = STATIC_DIR / path
+    try:
+        st = full.stat()
+    except OSError:
+        return STATIC_URL + path
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _dev_hashes.get(path)
+    if cached is None or cached[0] != key:
+        cached = (key, file_hash(full))
+        _dev_hashes[path] = cached
+    return f"{STATIC_URL}{path}?v={cached[1]}"
+
+
+def asset(path: str) -> str:
+    """URL статического файла: с хэшем из манифеста или с ?v=<хэш> без сборки"""
+    path = path.lstrip("/")
+    if path.startswith("static/"):
+        path = path[len("static/"):]
+    hashed = load_manifest().get(path)
+    if hashed is not None:
+        return STATIC_URL + hashed
+    return _dev_url(path)
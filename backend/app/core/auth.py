@@ -0,0 +1,267 @@
+"""
+Текущий пользователь по JWT (заголовок Authorization или cookie access_token)
+
+Единая точка разбора токена для API и страниц кабинета:
+- в пределах запроса результат лежит в request.state и не вычисляется повторно;
+- между запросами разобранный токен и снимок пользователя (UserSnapshot)
+  хранятся в небольшом LRU с коротким TTL по ключу токена, поэтому страница
+  кабинета и её XHR-запросы не декодируют JWT и не читают users заново.
+
+Обработчики с необязательной авторизацией берут пользователя через
+dependency current_user_optional (request.state). get_user_id_from_token
+(документы, товары, организации, шаблоны) возвращает только user_id из LRU
+токенов и users не читает.
+
+Кэш процессный, а сброс - общий для всех воркеров gunicorn: invalidate_user()
+(BillingService при смене тарифа и лимитов, удаление в админке) удаляет записи
+своего процесса и обновляет файл-метку пользователя в AUTH_CACHE_INVALIDATION_DIR.
+Прежде чем отдать снимок из кэша, воркер сверяет его время с mtime метки (один
+stat) и перечитывает пользователя, если снимок старше. Метка видна процессам
+одного хоста (контейнера); прочие изменения профиля видны после истечения TTL.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import jwt
+from fastapi import Request
+
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models import User
+
+# Настройки JWT (должны совпадать с api/auth.py)
+SECRET_KEY = os.getenv("SECRET_KEY", "documatica-secret-key-change-in-production")
+ALGORITHM = "HS256"
+
+_STATE_ATTR = "auth_user"
+
+
+class UserSnapshot:
+    """
+    Копия колонок User, не привязанная к сессии БД.
+    Для изменения пользователя нужно загрузить модель из БД по id.
+    """
+
+    __slots__ = tuple(column.name for column in User.__table__.columns)
+
+    def __init__(self, user: User):
+        for name in self.__slots__:
+            setattr(self, name, getattr(user, name))
+
+    def __repr__(self):
+        return f"<UserSnapshot {self.email}>"
+
+
+class _TokenEntry:
+    __slots__ = ("user_id", "token_expires", "cached_until", "snapshot", "snapshot_ns")
+
+    def __init__(self, user_id: int, token_expires: Optional[float], cached_until: float):
+        self.user_id = user_id
+        self.token_expires = token_expires
+        self.cached_until = cached_until
+        self.snapshot: Optional[UserSnapshot] = None
+        # time.time_ns() до чтения пользователя из БД - для сверки с меткой сброса
+        self.snapshot_ns = 0
+
+
+class TokenCache:
+    """LRU с TTL: ключ токена -> user_id и снимок пользователя"""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _TokenEntry]" = OrderedDict()
+        self._by_user: Dict[int, set] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[_TokenEntry]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.cached_until <= now or (entry.token_expires is not None and entry.token_expires <= now):
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: _TokenEntry) -> None:
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._by_user.setdefault(entry.user_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._by_user.get(entry.user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[entry.user_id]
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenCache(ttl=settings.AUTH_CACHE_TTL, max_entries=settings.AUTH_CACHE_MAX_ENTRIES)
+
+INVALIDATION_DIR = Path(settings.AUTH_CACHE_INVALIDATION_DIR or Path(tempfile.gettempdir()) / "documatica-auth")
+
+_last_marker_prune = 0.0
+
+
+def _marker_path(user_id: int) -> Path:
+    return INVALIDATION_DIR / str(user_id)
+
+
+def _prune_markers(now: float) -> None:
+    """Метки старше TTL не нужны: снимков старше TTL в кэше нет"""
+    global _last_marker_prune
+    if now - _last_marker_prune < token_cache.ttl:
+        return
+    _last_marker_prune = now
+    try:
+        with os.scandir(INVALIDATION_DIR) as entries:
+            for marker in entries:
+                try:
+                    if marker.stat().st_mtime < now - token_cache.ttl:
+                        os.unlink(marker.path)
+                except OSError:
+                    pass
+    except OSError:
+        pass
+
+
+def _invalidated_since(user_id: int, since_ns: int) -> bool:
+    """Пользователя сбрасывали (в любом воркере) после since_ns"""
+    try:
+        return os.stat(_marker_path(user_id)).st_mtime_ns >= since_ns
+    except OSError:
+        return False
+
+
+def invalidate_user(user_id: int) -> None:
+    """Сброс кэша пользователя во всех воркерах (после смены тарифа, лимитов, профиля)"""
+    token_cache.invalidate_user(user_id)
+    now_ns = time.time_ns()
+    path = _marker_path(user_id)
+    try:
+        INVALIDATION_DIR.mkdir(parents=True, exist_ok=True)
+        path.touch()
+        os.utime(path, ns=(now_ns, now_ns))
+    except OSError:
+        pass
+    _prune_markers(now_ns / 1e9)
+
+
+def extract_token(authorization: Optional[str] = None, access_token: Optional[str] = None) -> Optional[str]:
+    """Токен из заголовка Authorization: Bearer или из cookie"""
+    if authorization and authorization.startswith("Bearer "):
+        return authorization[len("Bearer "):].strip() or None
+    return access_token or None
+
+
+def _token_key(token: str) -> str:
+    """Ключ кэша - SHA-256 токена: сам токен в памяти не храним"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _resolve_entry(token: Optional[str]) -> Optional[_TokenEntry]:
+    if not token:
+        return None
+    key = _token_key(token)
+    entry = token_cache.get(key)
+    if entry is not None:
+        return entry
+
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # Токен использует "sub" для user_id
+        user_id = int(payload.get("sub") or payload.get("user_id"))
+    except (jwt.PyJWTError, ValueError, TypeError):
+        return None
+
+    exp = payload.get("exp")
+    entry = _TokenEntry(
+        user_id=user_id,
+        token_expires=float(exp) if isinstance(exp, (int, float)) else None,
+        cached_until=time.time() + token_cache.ttl,
+    )
+    token_cache.put(key, entry)
+    return entry
+
+
+def get_user_id_from_token(authorization: Optional[str] = None, access_token: Optional[str] = None) -> Optional[int]:
+    """user_id из JWT токена (Header или Cookie). None - токен отсутствует или невалиден."""
+    entry = _resolve_entry(extract_token(authorization, access_token))
+    return entry.user_id if entry else None
+
+
+def get_user_from_token(token: Optional[str], db=None) -> Optional[UserSnapshot]:
+    """
+    Снимок пользователя по токену или None.
+    db - сессия вызывающего кода; без неё открывается короткая сессия.
+    """
+    entry = _resolve_entry(token)
+    if entry is None:
+        return None
+    if entry.snapshot is not None and not _invalidated_since(entry.user_id, entry.snapshot_ns):
+        return entry.snapshot
+
+    own_session = db is None
+    if own_session:
+        db = SessionLocal()
+    try:
+        snapshot_ns = time.time_ns()
+        user = db.query(User).filter(User.id == entry.user_id).first()
+        if user is None:
+            entry.snapshot = None
+            return None
+        entry.snapshot = UserSnapshot(user)
+        entry.snapshot_ns = snapshot_ns
+        return entry.snapshot
+    finally:
+        if own_session:
+            db.close()
+
+
+def resolve_user(request: Request) -> Optional[UserSnapshot]:
+    """Текущий пользователь запроса; токен разбирается один раз за запрос"""
+    if hasattr(request.state, _STATE_ATTR):
+        return getattr(request.state, _STATE_ATTR)
+    token = extract_token(request.headers.get("authorization"), request.cookies.get("access_token"))
+    user = get_user_from_token(token)
+    setattr(request.state, _STATE_ATTR, user)
+    return user
+
+
+def current_user_optional(request: Request) -> Optional[UserSnapshot]:
+    """Dependency: текущий пользователь или None"""
+    return resolve_user(request)
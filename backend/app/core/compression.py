@@ -0,0 +1,186 @@
+"""
+Сжатие ответов на лету (gzip, brotli)
+
+HTML-страницы и JSON API сжимаются при отдаче, если клиент это принимает,
+тело не меньше COMPRESSION_MIN_SIZE и тип содержимого текстовый. Уже
+сжатые ответы не трогаются: с Content-Encoding (предсжатые превью и
+секции документов, спрайт иконок, sitemap, статика с .br/.gz) и бинарные
+форматы (PDF, XLSX, изображения) - по типу содержимого.
+
+Ответ одним куском сжимается целиком (Content-Length пересчитывается),
+потоковый (StreamingResponse) - по частям, без буферизации всего тела:
+накапливается только начало до COMPRESSION_MIN_SIZE, чтобы решить, сжимать ли.
+Сильный ETag сжатого ответа становится слабым (W/): байты другие, но
+StaticFiles и etag_matches сравнивают If-None-Match по самому тегу и
+отвечают 304. Cache-Control: no-transform отключает сжатие.
+"""
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.http_cache import choose_encoding
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Типы содержимого, которые имеет смысл сжимать; остальное (PDF, XLSX,
+# изображения, архивы) уже сжато или сжимается плохо
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/xhtml+xml",
+    "application/rss+xml",
+    "application/problem+json",
+    "image/svg+xml",
+)
+
+# Порядок - приоритет сервера
+ENCODINGS = ("br", "gzip") if BROTLI_AVAILABLE else ("gzip",)
+
+
+class _Compressor:
+    """Потоковый компрессор с общим интерфейсом для gzip и brotli"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        """Сжать часть и вытолкнуть накопленное (клиент получает данные сразу)"""
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.lower().startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """ASGI-middleware сжатия ответов; настройки - COMPRESSION_* в config.py"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = settings.COMPRESSION_MIN_SIZE,
+        gzip_level: int = settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = settings.COMPRESSION_BROTLI_QUALITY,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # HEAD: тела нет, а Content-Length должен остаться как у GET
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding"), ENCODINGS)
+        if encoding is None or "range" in request_headers:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+        self.buffer = bytearray()
+
+    def _should_compress(self, headers: MutableHeaders) -> bool:
+        if self.start_message["status"] in (204, 206, 304) or "content-encoding" in headers:
+            return False
+        if "no-transform" in headers.get("cache-control", "").lower():
+            return False
+        return is_compressible(headers.get("content-type"))
+
+    def _apply_headers(self, headers: MutableHeaders) -> None:
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+    async def _send_uncompressed(self, headers: MutableHeaders) -> None:
+        """Ответ меньше minimum_size целиком в буфере - отдаётся без сжатия"""
+        self.passthrough = True
+        # Больший ответ того же URL будет сжат - кэши должны учитывать Accept-Encoding
+        headers.add_vary_header("Accept-Encoding")
+        headers["Content-Length"] = str(len(self.buffer))
+        await self._send(self.start_message)
+        await self._send({"type": "http.response.body", "body": bytes(self.buffer)})
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Заголовки отправляются вместе с первой частью тела
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            should_compress = self._should_compress(headers)
+            if not should_compress:
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            # BaseHTTPMiddleware пересылает даже маленький ответ частями с
+            # more_body=True, поэтому размер проверяется по накопленному началу тела
+            self.buffer += body
+            if len(self.buffer) < self.middleware.minimum_size:
+                if not more_body:
+                    await self._send_uncompressed(headers)
+                return
+
+            body = bytes(self.buffer)
+            self.buffer = bytearray()
+            self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            self._apply_headers(headers)
+            if not more_body:
+                body = self.compressor.finish(body)
+                headers["Content-Length"] = str(len(body))
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            del headers["Content-Length"]
+            await self._send(self.start_message)
+
+        if more_body:
+            chunk = self.compressor.compress(body)
+            if chunk:
+                await self._send({"type": "http.response.body", "body": chunk, "more_body": True})
+        else:
+            await self._send({"type": "http.response.body", "body": self.compressor.finish(body)})
@@ -17,6 +17,17 @@ class Settings:
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))  # 24 часа
     
+    # Кэш разобранных токенов и пользователей (app/core/auth.py)
+    AUTH_CACHE_TTL: int = int(os.getenv("AUTH_CACHE_TTL", "30"))  # секунд
+    AUTH_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "2048"))
+    AUTH_CACHE_INVALIDATION_DIR: str = os.getenv("AUTH_CACHE_INVALIDATION_DIR", "")  # по умолчанию <tmp>/documatica-auth
+    
+    # Хеширование паролей (app/services/passwords.py)
+    PASSWORD_BCRYPT_ROUNDS: int = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "16"))
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "5"))
+    
     # Email
     SMTP_HOST: str = os.getenv("SMTP_HOST", "smtp.yandex.ru")
     SMTP_PORT: int = int(os.getenv("SMTP_PORT", "587"))
@@ -24,6 +35,60 @@ class Settings:
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
     SMTP_FROM_EMAIL: str = os.getenv("SMTP_FROM_EMAIL", "noreply@documatica.ru")
     
+    # Очередь писем (app/services/email_outbox.py)
+    EMAIL_OUTBOX_WORKER: bool = os.getenv("EMAIL_OUTBOX_WORKER", "true").lower() == "true"
+    EMAIL_OUTBOX_BATCH_SIZE: int = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "20"))
+    EMAIL_OUTBOX_POLL_INTERVAL: float = float(os.getenv("EMAIL_OUTBOX_POLL_INTERVAL", "2"))
+    
+    # Удаление просроченных черновиков гостей (app/services/draft_reaper.py)
+    DRAFT_REAPER_ENABLED: bool = os.getenv("DRAFT_REAPER_ENABLED", "true").lower() == "true"
+    DRAFT_REAPER_INTERVAL: float = float(os.getenv("DRAFT_REAPER_INTERVAL", "3600"))  # секунд
+    DRAFT_REAPER_BATCH_SIZE: int = int(os.getenv("DRAFT_REAPER_BATCH_SIZE", "500"))
+    
+    # События аналитики (app/services/analytics.py)
+    ANALYTICS_ENABLED: bool = os.getenv("ANALYTICS_ENABLED", "true").lower() == "true"
+    ANALYTICS_BUFFER_SIZE: int = int(os.getenv("ANALYTICS_BUFFER_SIZE", "10000"))  # событий в буфере процесса
+    ANALYTICS_BATCH_SIZE: int = int(os.getenv("ANALYTICS_BATCH_SIZE", "500"))
+    ANALYTICS_FLUSH_INTERVAL_MS: int = int(os.getenv("ANALYTICS_FLUSH_INTERVAL_MS", "1000"))
+    
+    # Sitemap из БД (app/services/sitemap.py): как часто перепроверять изменения контента
+    SITEMAP_CHECK_INTERVAL: int = int(os.getenv("SITEMAP_CHECK_INTERVAL", "300"))  # секунд
+    
+    # YAML-контент (app/core/content.py): проверка изменений файлов и снимок для быстрого старта
+    CONTENT_CHECK_INTERVAL: float = float(os.getenv("CONTENT_CHECK_INTERVAL", "2"))  # секунд
+    CONTENT_SNAPSHOT_ENABLED: bool = os.getenv("CONTENT_SNAPSHOT_ENABLED", "true").lower() == "true"
+    CONTENT_SNAPSHOT_PATH: str = os.getenv("CONTENT_SNAPSHOT_PATH", "")  # по умолчанию data/content_snapshot.pickle
+    
+    # Сжатие HTML/JSON на лету (app/core/compression.py)
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # байт
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+    
+    # WeasyPrint, openpyxl и xlwt загружаются при первом PDF/Excel; true - при старте воркера
+    RENDERERS_PRELOAD: bool = os.getenv("RENDERERS_PRELOAD", "false").lower() == "true"
+    
+    # Продакшен-сервер (gunicorn.conf.py): воркеры и их перезапуск
+    SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", "0"))  # 0 - по числу CPU
+    SERVER_MAX_REQUESTS: int = int(os.getenv("SERVER_MAX_REQUESTS", "2000"))  # 0 - без ограничения
+    SERVER_MAX_REQUESTS_JITTER: int = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", "200"))
+    SERVER_MAX_RSS_MB: int = int(os.getenv("SERVER_MAX_RSS_MB", "1024"))  # 0 - без ограничения
+    SERVER_TIMEOUT: int = int(os.getenv("SERVER_TIMEOUT", "120"))  # секунд без ответа воркера
+    SERVER_GRACEFUL_TIMEOUT: int = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "60"))  # секунд на дорендеринг при остановке
+    
+    # Метрики Prometheus (app/core/metrics.py, GET /metrics)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")  # Authorization: Bearer <токен>; пустой - /metrics отдаёт 404
+    METRICS_DOCUMENT_STORE_TTL: float = float(os.getenv("METRICS_DOCUMENT_STORE_TTL", "300"))  # секунд
+
+    # Профилирование запроса по подписанному флагу (app/core/profiling.py, /admin/profiles/)
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", "5"))  # интервал сэмплирования
+    PROFILING_MAX_SECONDS: float = float(os.getenv("PROFILING_MAX_SECONDS", "120"))  # дольше - сэмплы не пишутся
+    PROFILING_TOKEN_TTL: int = int(os.getenv("PROFILING_TOKEN_TTL", "900"))  # секунд жизни ссылки
+    PROFILING_MAX_PROFILES: int = int(os.getenv("PROFILING_MAX_PROFILES", "50"))
+    PROFILING_RETENTION_DAYS: int = int(os.getenv("PROFILING_RETENTION_DAYS", "7"))
+    
     # DaData
     DADATA_API_KEY: str = os.getenv("DADATA_API_KEY", "")
     DADATA_SECRET_KEY: str = os.getenv("DADATA_SECRET_KEY", "")
@@ -43,6 +108,11 @@ class Settings:
     # Debug режим
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
     
+    # Кэш предпросмотра документов (/upd/preview, /invoice/preview, /akt/preview)
+    PREVIEW_CACHE_TTL: int = int(os.getenv("PREVIEW_CACHE_TTL", "60"))  # секунд
+    PREVIEW_CACHE_MAX_ENTRIES: int = int(os.getenv("PREVIEW_CACHE_MAX_ENTRIES", "256"))
+    PREVIEW_CACHE_MAX_MB: int = int(os.getenv("PREVIEW_CACHE_MAX_MB", "32"))
+    
     # Feature Flags
     # Новая логика сохранения документов: один UUID, обновление вместо создания новых версий
     FEATURE_NEW_SAVE_LOGIC: bool = os.getenv("FEATURE_NEW_SAVE_LOGIC", "false").lower() == "true"
@@ -1,51 +1,209 @@
 """
 Content Loader - загрузка YAML-контента для страниц
+
+Все файлы content/**/*.yaml (*.yml) хранятся в памяти процесса
+(ContentStore) и отдаются из словаря без обращения к диску.
+
+Изменения файлов отслеживаются по mtime и размеру: не чаще раза в
+CONTENT_CHECK_INTERVAL секунд дерево контента обходится одним os.walk
+со stat, и заново разбираются только изменившиеся файлы. reload_content()
+выполняет проверку немедленно (после сохранения в админке).
+
+Разобранный контент сохраняется в снимок (pickle) - при старте процесса
+YAML разбирается только для файлов, изменившихся с момента записи снимка.
+Снимок записывается при первом разборе и обновляется при любом изменении
+контента; в docker-compose каталог data смонтирован с хоста, так что снимок
+переживает перезапуск и пересоздание контейнера. Собрать его заранее -
+scripts/build_content_snapshot.py.
 """
 
+import logging
+import os
+import pickle
+import threading
+import time
 import yaml
 from pathlib import Path
-from typing import Dict, Any, Optional
-from functools import lru_cache
+from typing import Dict, Any, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import cache_lookup
+
+logger = logging.getLogger(__name__)
 
 # Путь к контенту
 CONTENT_DIR = Path(__file__).parent.parent.parent / "content"
 
+DEFAULT_SNAPSHOT_PATH = Path(__file__).parent.parent.parent / "data" / "content_snapshot.pickle"
+
+SNAPSHOT_VERSION = 1
+
 
 class ContentNotFoundError(Exception):
     """Контент не найден"""
     pass
 
 
-@lru_cache(maxsize=256)
+class _Entry(NamedTuple):
+    filename: str            # путь относительно CONTENT_DIR с расширением
+    stat_key: Tuple[int, int]  # (mtime_ns, size)
+    data: Any
+    error: Optional[str]     # текст ошибки разбора YAML
+
+
+class ContentStore:
+    """YAML-контент в памяти процесса с перечиткой изменённых файлов"""
+
+    def __init__(self, root: Path, snapshot_path: Optional[Path], check_interval: float):
+        self.root = root
+        self.snapshot_path = snapshot_path
+        self.check_interval = check_interval
+        self._files: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+        self._snapshot_checked = False
+        self.scans = 0
+        self.parsed = 0
+        self.reloads = 0
+        self.snapshot_entries = 0
+
+    def _scan(self) -> Dict[str, Tuple[str, Tuple[int, int]]]:
+        """{путь без расширения: (имя файла, (mtime_ns, size))}; .yaml важнее .yml"""
+        result: Dict[str, Tuple[str, Tuple[int, int]]] = {}
+        for dirpath, _dirnames, filenames in os.walk(self.root):
+            for name in filenames:
+                stem, ext = os.path.splitext(name)
+                if ext not in (".yaml", ".yml"):
+                    continue
+                full = os.path.join(dirpath, name)
+                filename = os.path.relpath(full, self.root).replace(os.sep, "/")
+                path = filename[:-len(ext)]
+                if ext == ".yml" and path in result:
+                    continue
+                try:
+                    st = os.stat(full)
+                except OSError:
+                    continue
+                result[path] = (filename, (st.st_mtime_ns, st.st_size))
+        return result
+
+    def _parse(self, filename: str, stat_key: Tuple[int, int]) -> _Entry:
+        try:
+            with open(self.root / filename, "r", encoding="utf-8") as f:
+                return _Entry(filename, stat_key, yaml.safe_load(f) or {}, None)
+        except yaml.YAMLError as e:
+            return _Entry(filename, stat_key, None, str(e))
+
+    def _load_snapshot(self) -> None:
+        if self.snapshot_path is None or not self.snapshot_path.exists():
+            return
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                snapshot = pickle.load(f)
+            if snapshot.get("version") == SNAPSHOT_VERSION:
+                self._files = {path: _Entry(*entry) for path, entry in snapshot["files"].items()}
+                self.snapshot_entries = len(self._files)
+        except Exception as e:
+            logger.warning(f"Content snapshot {self.snapshot_path} ignored: {e}")
+
+    def save_snapshot(self) -> None:
+        if self.snapshot_path is None:
+            return
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "files": {path: tuple(entry) for path, entry in self._files.items()},
+        }
+        tmp_path = self.snapshot_path.with_name(f"{self.snapshot_path.name}.{os.getpid()}.tmp")
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            # Файловая система только для чтения - работаем без снимка
+            logger.warning(f"Content snapshot not saved: {e}")
+
+    def refresh(self, force: bool = False) -> int:
+        """Перечитать изменённые файлы. Возвращает число разобранных файлов."""
+        if not force and self._checked_at is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return 0
+        with self._lock:
+            if not force and self._checked_at is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return 0
+            if not self._snapshot_checked:
+                self._load_snapshot()
+                self._snapshot_checked = True
+
+            files: Dict[str, _Entry] = {}
+            changed = 0
+            for path, (filename, stat_key) in self._scan().items():
+                entry = self._files.get(path)
+                if entry is None or entry.stat_key != stat_key or entry.filename != filename:
+                    if entry is not None:
+                        self.reloads += 1
+                    entry = self._parse(filename, stat_key)
+                    changed += 1
+                files[path] = entry
+            removed = len(set(self._files) - set(files))
+
+            self._files = files
+            self.scans += 1
+            self.parsed += changed
+            if changed or removed:
+                self.save_snapshot()
+            self._checked_at = time.monotonic()
+            return changed
+
+    def get(self, path: str) -> Optional[_Entry]:
+        self.refresh()
+        entry = self._files.get(path)
+        cache_lookup("content", entry is not None)
+        return entry
+
+    def paths(self) -> list:
+        self.refresh()
+        return sorted(self._files)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "files": len(self._files),
+            "scans": self.scans,
+            "parsed": self.parsed,
+            "reloads": self.reloads,
+            "snapshot_entries": self.snapshot_entries,
+        }
+
+
+content_store = ContentStore(
+    root=CONTENT_DIR,
+    snapshot_path=(
+        Path(settings.CONTENT_SNAPSHOT_PATH or DEFAULT_SNAPSHOT_PATH)
+        if settings.CONTENT_SNAPSHOT_ENABLED else None
+    ),
+    check_interval=settings.CONTENT_CHECK_INTERVAL,
+)
+
+
 def load_content(path: str) -> Dict[str, Any]:
     """
     Загрузка YAML-контента по пути
-    
+
     Args:
         path: Путь к файлу без расширения (например, "upd/ooo")
-        
+
     Returns:
         Словарь с контентом
-        
+
     Raises:
-        ContentNotFoundError: Если файл не найден
+        ContentNotFoundError: Если файл не удалось разобрать
     """
-    file_path = CONTENT_DIR / f"{path}.yaml"
-    
-    if not file_path.exists():
-        # Пробуем .yml
-        file_path = CONTENT_DIR / f"{path}.yml"
-        
-    if not file_path.exists():
+    entry = content_store.get(path)
+    if entry is None:
         # Возвращаем пустой контент с дефолтными значениями
         return get_default_content(path)
-    
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = yaml.safe_load(f) or {}
-            return content
-    except yaml.YAMLError as e:
-        raise ContentNotFoundError(f"Error parsing {file_path}: {e}")
+    if entry.error is not None:
+        raise ContentNotFoundError(f"Error parsing {CONTENT_DIR / entry.filename}: {entry.error}")
+    return entry.data
 
 
 def get_default_content(path: str) -> Dict[str, Any]:
@@ -54,7 +212,7 @@ def get_default_content(path: str) -> Dict[str, Any]:
     Полезно при разработке - страница рендерится даже без YAML
     """
     parts = path.split("/")
-    
+
     return {
         "meta": {
             "title": f"{parts[-1].upper()} — Documatica",
@@ -76,38 +234,20 @@ def get_default_content(path: str) -> Dict[str, Any]:
 
 
 def reload_content():
-    """Очистка кэша контента (для hot-reload в dev)"""
-    load_content.cache_clear()
+    """Немедленно перечитать изменённые файлы (после сохранения в админке)"""
+    content_store.refresh(force=True)
 
 
 def get_all_content_paths() -> list:
     """Получить список всех YAML-файлов контента"""
-    paths = []
-    for file_path in CONTENT_DIR.rglob("*.yaml"):
-        relative = file_path.relative_to(CONTENT_DIR)
-        path = str(relative.with_suffix(""))
-        paths.append(path)
-    for file_path in CONTENT_DIR.rglob("*.yml"):
-        relative = file_path.relative_to(CONTENT_DIR)
-        path = str(relative.with_suffix(""))
-        if path not in paths:
-            paths.append(path)
-    return sorted(paths)
-
-
-@lru_cache(maxsize=1)
+    return content_store.paths()
+
+
 def load_navigation() -> Dict[str, Any]:
     """
     Загрузка конфигурации навигации для меню
-    Кэшируется на весь срок работы приложения
     """
-    file_path = CONTENT_DIR / "navigation.yaml"
-    
-    if not file_path.exists():
-        return {"sections": [], "icons": {}}
-    
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f) or {"sections": [], "icons": {}}
-    except yaml.YAMLError:
+    entry = content_store.get("navigation")
+    if entry is None or entry.error is not None:
         return {"sections": [], "icons": {}}
+    return entry.data or {"sections": [], "icons": {}}
@@ -1,11 +1,19 @@
 """
 Single source of truth for Heroicons outline (v12 icon library).
 Icons are stored in static/data/heroicons-outline.json.
-Use get_icon_paths_html() for Jinja templates; frontend picker fetches the same JSON.
+The sprite and scripts/report_heroicons_html.py use get_icon_paths_html(); frontend picker fetches the same JSON.
+
+Templates render icons with the heroicon() Jinja global: <svg><use href="sprite#hi-id">.
+The sprite (one <symbol> per icon) is built from the same JSON on first use, its URL
+carries a content hash (SPRITE_URL_PREFIX + fingerprint + ".svg") and is cached as immutable.
 """
+import gzip
+import hashlib
 import json
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, NamedTuple, Optional
+
+from markupsafe import Markup, escape
 
 # Path to the single JSON file (relative to app package)
 _STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
@@ -34,7 +42,7 @@ def _icon_to_html(icon: Dict[str, Any]) -> str:
 def get_icon_paths_html() -> Dict[str, str]:
     """
     Returns a dict: icon_id -> full HTML string for <path>(s).
-    Used by Jinja in features.html and document_types.html.
+    Used to build the sprite; templates use heroicon() instead.
     Cached after first load.
     """
     global _icon_paths_html_cache
@@ -51,3 +59,98 @@ def get_icon_paths_html() -> Dict[str, str]:
 def get_icons_list() -> List[Dict[str, Any]]:
     """Return raw list of icon objects (for API or inline JSON)."""
     return _load_icons_raw()
+
+
+# Legacy block icon names (Heroicons v1) -> ids in heroicons-outline.json
+ALIASES = {
+    "alert-triangle": "exclamation-triangle",
+    "exclamation": "exclamation-triangle",
+    "code": "code-bracket",
+    "download": "arrow-down-tray",
+    "upload": "arrow-up-tray",
+    "history": "arrow-path",
+    "refresh": "arrow-path",
+    "search": "magnifying-glass",
+    "shield": "shield-check",
+    "zap": "bolt",
+    "mail": "envelope",
+    "external-link": "arrow-top-right-on-square",
+    "file": "document",
+    "document-add": "document-plus",
+    "receipt": "receipt-percent",
+    "package": "cube",
+    "archive": "archive-box",
+    "dollar-sign": "currency-dollar",
+    "trend-up": "arrow-trending-up",
+    "send": "paper-airplane",
+    "information": "information-circle",
+    "duplicate": "document-duplicate",
+    "menu": "bars-3",
+    "folder-add": "folder-plus",
+    "paperclip": "paper-clip",
+    "question": "question-mark-circle",
+    "user-add": "user-plus",
+    "filter": "funnel",
+    "chip": "cpu-chip",
+    "terminal": "command-line",
+    "device-mobile": "device-phone-mobile",
+    "desktop": "computer-desktop",
+    "color-swatch": "swatch",
+}
+
+SPRITE_URL_PREFIX = "/icons/heroicons."
+SYMBOL_PREFIX = "hi-"
+
+
+class Sprite(NamedTuple):
+    svg: bytes
+    gzipped: bytes
+    fingerprint: str
+    ids: frozenset
+
+    @property
+    def url(self) -> str:
+        return f"{SPRITE_URL_PREFIX}{self.fingerprint}.svg"
+
+
+_sprite_cache: Optional[Sprite] = None
+
+
+def get_sprite() -> Sprite:
+    """SVG sprite with one <symbol> per icon. Built once per process."""
+    global _sprite_cache
+    if _sprite_cache is not None:
+        return _sprite_cache
+    paths = get_icon_paths_html()
+    symbols = "".join(
+        f'<symbol id="{SYMBOL_PREFIX}{icon_id}" viewBox="0 0 24 24">{html}</symbol>'
+        for icon_id, html in sorted(paths.items())
+    )
+    svg = f'<svg xmlns="http://www.w3.org/2000/svg">{symbols}</svg>'.encode("utf-8")
+    _sprite_cache = Sprite(
+        svg=svg,
+        gzipped=gzip.compress(svg, 9),
+        fingerprint=hashlib.sha256(svg).hexdigest()[:12],
+        ids=frozenset(paths),
+    )
+    return _sprite_cache
+
+
+def resolve_icon(name: Optional[str], fallback: str = "check-circle") -> str:
+    """Icon id in the sprite for a block icon name (aliases, then fallback)."""
+    sprite = get_sprite()
+    for candidate in (name, ALIASES.get(name or ""), fallback, ALIASES.get(fallback)):
+        if candidate and candidate in sprite.ids:
+            return candidate
+    return "check-circle"
+
+
+def heroicon(name: Optional[str], css_class: str = "", fallback: str = "check-circle", stroke_width: float = 1.5) -> Markup:
+    """Jinja global: <svg> referencing the icon symbol in the sprite."""
+    sprite = get_sprite()
+    icon_id = resolve_icon(name, fallback)
+    class_attr = f' class="{escape(css_class)}"' if css_class else ""
+    return Markup(
+        f'<svg{class_attr} viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="{stroke_width}" '
+        f'aria-hidden="true"><use href="{sprite.url}#{SYMBOL_PREFIX}{icon_id}"></use></svg>'
+    )
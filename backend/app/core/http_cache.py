@@ -0,0 +1,64 @@
+"""
+HTTP-кэширование: ETag, If-None-Match и выбор Content-Encoding
+"""
+
+from typing import Iterable, Optional
+
+
+def make_etag(digest: str, encoding: Optional[str] = None) -> str:
+    """
+    Сильный ETag из хэша содержимого.
+    Для сжатого представления добавляется суффикс кодировки: по RFC 9110
+    разные представления ресурса должны иметь разные сильные ETag.
+    """
+    return f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+
+
+def _etag_digest(tag: str) -> str:
+    """Хэш из ETag без W/, кавычек и суффикса кодировки"""
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    return tag.strip('"').split("-", 1)[0]
+
+
+def etag_matches(if_none_match: Optional[str], digest: str) -> bool:
+    """
+    Совпадает ли If-None-Match с содержимым.
+    Сравнение слабое (RFC 9110, 13.1.2): подходит ETag любого представления
+    того же содержимого.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(_etag_digest(tag) == digest for tag in if_none_match.split(","))
+
+
+def choose_encoding(accept_encoding: Optional[str], available: Iterable[str]) -> Optional[str]:
+    """
+    Выбор Content-Encoding из доступных по заголовку Accept-Encoding.
+    Порядок available - приоритет сервера. None - отдавать без сжатия.
+    """
+    if not accept_encoding:
+        return None
+
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+
+    best = None
+    best_q = 0.0
+    for encoding in available:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
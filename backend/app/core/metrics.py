@@ -0,0 +1,181 @@
+"""
+Метрики Prometheus (GET /metrics, только с Authorization: Bearer METRICS_TOKEN)
+
+- латентность запросов по шаблону маршрута (MetricsMiddleware);
+- длительность рендера PDF/XLS/XLSX и число рендеров в работе (track_render);
+- соединения пула SQLAlchemy: выданные и сверх pool_size (instrument_engine);
+- попадания и промахи кэшей: YAML-контент, редиректы, шорткоды (cache_lookup);
+- размер хранилища документов (считается при запросе /metrics не чаще
+  раза в METRICS_DOCUMENT_STORE_TTL секунд).
+
+Под gunicorn (несколько воркеров) метрики пишутся в файлы каталога
+PROMETHEUS_MULTIPROC_DIR и суммируются по всем воркерам при выдаче
+(gunicorn.conf.py задаёт каталог и чистит его).
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Время ответа по шаблону маршрута",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+RENDER_DURATION = Histogram(
+    "document_render_seconds",
+    "Время рендера документа (pdf, xls, xlsx)",
+    ["kind"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60),
+)
+RENDERS_IN_PROGRESS = Gauge(
+    "document_renders_in_progress",
+    "Рендеры документов, выполняющиеся сейчас (очередь рендера)",
+    ["kind"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Соединения пула SQLAlchemy, выданные сессиям",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Соединения пула SQLAlchemy сверх pool_size",
+    multiprocess_mode="livesum",
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Обращения к кэшам по результату",
+    ["cache", "result"],
+)
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    """Учесть обращение к кэшу"""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+@contextmanager
+def track_render(kind: str):
+    """Замер рендера документа; работает и как декоратор"""
+    in_progress = RENDERS_IN_PROGRESS.labels(kind)
+    in_progress.inc()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        RENDER_DURATION.labels(kind).observe(time.perf_counter() - started)
+        in_progress.dec()
+
+
+def instrument_engine(engine) -> None:
+    """Счётчики пула по событиям checkout/checkin (без опроса пула)"""
+    pool = engine.pool
+
+    def update_overflow() -> None:
+        overflow = getattr(pool, "overflow", None)
+        if overflow is not None:
+            DB_POOL_OVERFLOW.set(max(overflow(), 0))
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKED_OUT.inc()
+        update_overflow()
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+        update_overflow()
+
+
+class DocumentStoreCollector:
+    """Число и объём сохранённых документов; обход каталога кэшируется на TTL"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._value: Optional[Tuple[int, int]] = None
+        self._measured_at = 0.0
+
+    def _measure(self) -> Tuple[int, int]:
+        from app.services import document_store
+
+        with self._lock:
+            if self._value is None or time.monotonic() - self._measured_at >= self.ttl:
+                self._value = document_store.store_size()
+                self._measured_at = time.monotonic()
+            return self._value
+
+    def collect(self):
+        documents, size = self._measure()
+        yield GaugeMetricFamily("document_store_documents", "Сохранённые документы", value=documents)
+        yield GaugeMetricFamily("document_store_bytes", "Объём хранилища документов, байт", value=size)
+
+
+_document_store_collector = DocumentStoreCollector(settings.METRICS_DOCUMENT_STORE_TTL)
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """Текст метрик в формате Prometheus и его Content-Type"""
+    if MULTIPROCESS:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        from prometheus_client import REGISTRY as registry
+    output = generate_latest(registry)
+    extra = CollectorRegistry()
+    extra.register(_document_store_collector)
+    return output + generate_latest(extra), CONTENT_TYPE_LATEST
+
+
+def _route_label(scope: Scope) -> str:
+    """Шаблон маршрута (/news/{slug}/), а не путь - без взрыва числа серий"""
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    if scope["path"].startswith("/static/"):
+        return "/static"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: гистограмма времени ответа по маршруту"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_DURATION.labels(scope["method"], _route_label(scope), f"{status // 100}xx").observe(
+                time.perf_counter() - started
+            )
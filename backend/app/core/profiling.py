@@ -0,0 +1,351 @@
+"""
+Профилирование отдельного запроса по подписанному флагу (для админов)
+
+Запрос с ?_profile=<токен> или заголовком X-Profile-Token: <токен>
+выполняется под сэмплирующим профайлером: отдельный поток раз в
+PROFILING_INTERVAL_MS снимает стек потока event loop. Результат
+сохраняется в data/profiles в формате speedscope (открывается на
+speedscope.app) и просматривается в админке (/admin/profiles/);
+id профиля возвращается в заголовке X-Profile-Id.
+
+Токен выдаёт админка: "<срок действия>.<HMAC от SECRET_KEY>".
+Хранится не больше PROFILING_MAX_PROFILES профилей и не дольше
+PROFILING_RETENTION_DAYS дней.
+
+Снимается поток event loop: обработчики async def (страницы, рендер
+документов) видны целиком. Запрос узнаётся по объекту scope в локальных
+переменных кадров ASGI-слоёв, а не по кадру middleware: BaseHTTPMiddleware
+выполняет call_next в отдельной задаче anyio, и в её стеке кадра
+middleware нет. Время, пока запрос ждёт - I/O, синхронные зависимости и
+обработчики def в пуле потоков, - попадает в один кадр WAITING_FRAME.
+
+При PROFILING_ENABLED=false middleware не подключается вовсе.
+"""
+
+import hashlib
+import hmac
+import json
+import re
+import secrets
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+PROFILES_DIR = Path(__file__).parent.parent.parent / "data" / "profiles"
+
+QUERY_PARAM = "_profile"
+HEADER_NAME = b"x-profile-token"
+
+# Кадр для сэмплов, когда стек event loop не внутри профилируемого запроса
+WAITING_FRAME = "[ожидание: I/O, пул потоков, другие запросы]"
+
+_PROFILE_ID_RE = re.compile(r"^\d{8}-\d{6}-[0-9a-f]{6}$")
+
+
+def _signature(expires: int) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), f"profile:{expires}".encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def create_token(ttl: Optional[int] = None) -> str:
+    """Подписанный токен профилирования, действует ttl секунд"""
+    expires = int(time.time()) + (ttl or settings.PROFILING_TOKEN_TTL)
+    return f"{expires}.{_signature(expires)}"
+
+
+def verify_token(token: str) -> bool:
+    try:
+        expires_str, signature = token.split(".", 1)
+        expires = int(expires_str)
+    except ValueError:
+        return False
+    return expires >= time.time() and hmac.compare_digest(signature, _signature(expires))
+
+
+def is_valid_profile_id(profile_id: str) -> bool:
+    return bool(_PROFILE_ID_RE.match(profile_id))
+
+
+def _token_from_scope(scope: Scope) -> Optional[str]:
+    """Токен из query или заголовка; без флага - None после одной проверки"""
+    query = scope.get("query_string", b"")
+    if b"_profile=" in query:
+        for key, value in parse_qsl(query.decode("latin-1")):
+            if key == QUERY_PARAM:
+                return value
+    for name, value in scope["headers"]:
+        if name == HEADER_NAME:
+            return value.decode("latin-1")
+    return None
+
+
+class Sampler:
+    """Поток, снимающий стек одного потока с заданным интервалом"""
+
+    def __init__(self, thread_id: int, scope: Scope, interval: float, max_seconds: float):
+        self.thread_id = thread_id
+        # scope именно этого запроса: код ASGI-слоёв у всех запросов общий
+        self.scope = scope
+        self._has_scope: Dict = {}
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.frames: List[Dict] = []
+        self._frame_index: Dict[Tuple, int] = {}
+        self.samples: List[List[int]] = []
+        self.weights: List[float] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self.started = 0.0
+        self.elapsed = 0.0
+
+    def _frame_id(self, key: Tuple) -> int:
+        index = self._frame_index.get(key)
+        if index is None:
+            index = self._frame_index[key] = len(self.frames)
+            name, file, line = key
+            self.frames.append({"name": name, "file": file, "line": line} if file else {"name": name})
+        return index
+
+    def _is_request_frame(self, frame) -> bool:
+        """Кадр ASGI-слоя этого запроса: локальная переменная scope - наш scope"""
+        code = frame.f_code
+        has_scope = self._has_scope.get(code)
+        if has_scope is None:
+            has_scope = self._has_scope[code] = "scope" in code.co_varnames + code.co_cellvars + code.co_freevars
+        return has_scope and frame.f_locals.get("scope") is self.scope
+
+    def _stack(self, frame) -> Optional[List[int]]:
+        """
+        Стек от самого внешнего кадра запроса вниз; вне запроса - WAITING_FRAME,
+        в stop() - None
+        """
+        frames = []
+        request_depth = None
+        while frame is not None:
+            if frame.f_code is _STOP_CODE:
+                return None
+            frames.append(frame)
+            if self._is_request_frame(frame):
+                request_depth = len(frames)
+            frame = frame.f_back
+        if request_depth is None:
+            return [self._frame_id((WAITING_FRAME, None, None))]
+        return [
+            self._frame_id((f.f_code.co_qualname, f.f_code.co_filename, f.f_code.co_firstlineno))
+            for f in reversed(frames[:request_depth - 1])
+        ]
+
+    def _run(self) -> None:
+        last = self.started
+        deadline = self.started + self.max_seconds
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            stack = self._stack(frame) if frame is not None else None
+            if stack is not None:
+                self.samples.append(stack)
+                self.weights.append(now - last)
+            last = now
+            if now >= deadline:
+                break
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    def speedscope(self, name: str) -> Dict:
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "documatica",
+            "shared": {"frames": self.frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(self.weights),
+                "samples": self.samples,
+                "weights": self.weights,
+            }],
+        }
+
+
+_STOP_CODE = Sampler.stop.__code__
+
+
+def _profile_paths(profile_id: str) -> Tuple[Path, Path]:
+    return PROFILES_DIR / f"{profile_id}.speedscope.json", PROFILES_DIR / f"{profile_id}.meta.json"
+
+
+def save_profile(profile_id: str, meta: Dict, sampler: Sampler) -> None:
+    PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+    profile_path, meta_path = _profile_paths(profile_id)
+    name = f"{meta['method']} {meta['path']}"
+    profile_path.write_text(json.dumps(sampler.speedscope(name), ensure_ascii=False), encoding="utf-8")
+    meta_path.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    prune_profiles()
+
+
+def list_profiles() -> List[Dict]:
+    """Метаданные сохранённых профилей, новые первыми"""
+    if not PROFILES_DIR.exists():
+        return []
+    profiles = []
+    for meta_path in sorted(PROFILES_DIR.glob("*.meta.json"), reverse=True):
+        try:
+            profiles.append(json.loads(meta_path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def load_profile(profile_id: str) -> Optional[Tuple[Dict, Dict]]:
+    """(метаданные, speedscope JSON) или None"""
+    if not is_valid_profile_id(profile_id):
+        return None
+    profile_path, meta_path = _profile_paths(profile_id)
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        profile = json.loads(profile_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return meta, profile
+
+
+def profile_file(profile_id: str) -> Optional[Path]:
+    if not is_valid_profile_id(profile_id):
+        return None
+    path = _profile_paths(profile_id)[0]
+    return path if path.exists() else None
+
+
+def delete_profile(profile_id: str) -> None:
+    if not is_valid_profile_id(profile_id):
+        return
+    for path in _profile_paths(profile_id):
+        path.unlink(missing_ok=True)
+
+
+def prune_profiles() -> None:
+    """Удалить профили старше PROFILING_RETENTION_DAYS и сверх PROFILING_MAX_PROFILES"""
+    if not PROFILES_DIR.exists():
+        return
+    cutoff = time.time() - settings.PROFILING_RETENTION_DAYS * 86400
+    ids = sorted((p.name[:-len(".meta.json")] for p in PROFILES_DIR.glob("*.meta.json")), reverse=True)
+    for index, profile_id in enumerate(ids):
+        meta_path = _profile_paths(profile_id)[1]
+        try:
+            expired = meta_path.stat().st_mtime < cutoff
+        except OSError:
+            continue
+        if index >= settings.PROFILING_MAX_PROFILES or expired:
+            delete_profile(profile_id)
+
+
+def summarize(profile: Dict, top: int = 30) -> Tuple[List[Dict], Dict]:
+    """
+    Топ функций по собственному и общему времени и дерево для флеймграфа.
+
+    Дерево: {"name", "value", "children"} - время по стекам, от корня вниз.
+    """
+    frames = profile["shared"]["frames"]
+    data = profile["profiles"][0]
+    self_time: Dict[int, float] = {}
+    total_time: Dict[int, float] = {}
+    root = {"name": "запрос", "value": 0.0, "children": {}}
+
+    for stack, weight in zip(data["samples"], data["weights"]):
+        root["value"] += weight
+        if stack:
+            self_time[stack[-1]] = self_time.get(stack[-1], 0.0) + weight
+        for index in set(stack):
+            total_time[index] = total_time.get(index, 0.0) + weight
+        node = root
+        for index in stack:
+            child = node["children"].get(index)
+            if child is None:
+                child = node["children"][index] = {"name": frames[index]["name"], "value": 0.0, "children": {}}
+            child["value"] += weight
+            node = child
+
+    functions = [
+        {
+            "name": frame["name"],
+            "location": f"{frame['file']}:{frame['line']}" if frame.get("file") else "",
+            "self": self_time.get(index, 0.0),
+            "total": total_time.get(index, 0.0),
+        }
+        for index, frame in enumerate(frames)
+    ]
+    functions.sort(key=lambda f: f["self"], reverse=True)
+
+    def finalize(node: Dict) -> Dict:
+        children = sorted(node["children"].values(), key=lambda c: c["value"], reverse=True)
+        return {"name": node["name"], "value": node["value"], "children": [finalize(c) for c in children]}
+
+    return functions[:top], finalize(root)
+
+
+class ProfilingMiddleware:
+    """ASGI-middleware: профилирование запроса с подписанным флагом"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _token_from_scope(scope)
+        if token is None or not verify_token(token):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}"
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        sampler = Sampler(
+            threading.get_ident(),
+            scope,
+            settings.PROFILING_INTERVAL_MS / 1000,
+            settings.PROFILING_MAX_SECONDS,
+        )
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            query = urlencode(
+                [(k, v) for k, v in parse_qsl(scope.get("query_string", b"").decode("latin-1")) if k != QUERY_PARAM]
+            )
+            meta = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"] + (f"?{query}" if query else ""),
+                "status": status,
+                "duration_ms": round(sampler.elapsed * 1000, 1),
+                "samples": len(sampler.samples),
+                "interval_ms": settings.PROFILING_INTERVAL_MS,
+                "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            await run_in_threadpool(save_profile, profile_id, meta, sampler)
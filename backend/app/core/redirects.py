@@ -8,6 +8,8 @@ from fastapi import Request
 from fastapi.responses import RedirectResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from app.core.metrics import cache_lookup
+
 # Карта редиректов: старый путь -> новый URL
 REDIRECTS = {
     "/kak-izmenilsya-raschet-naloga-usn-v-2023-godu/": "/news/kak-izmenilsya-raschet-naloga-usn-v-2023-godu/",
@@ -128,14 +130,18 @@ class RedirectMiddleware(BaseHTTPMiddleware):
         
         # Проверяем точное совпадение
         if path in REDIRECTS:
+            cache_lookup("redirects", True)
             new_url = REDIRECTS[path]
             return RedirectResponse(url=new_url, status_code=301)
         
         # Проверяем вариант без trailing slash
         if path in REDIRECTS_NO_SLASH:
+            cache_lookup("redirects", True)
             new_url = REDIRECTS_NO_SLASH[path]
             return RedirectResponse(url=new_url, status_code=301)
 
+        # Промах карты в памяти - запрос в БД
+        cache_lookup("redirects", False)
         db_redirect = _get_db_redirect(path)
         if db_redirect:
             to_url, status_code = db_redirect
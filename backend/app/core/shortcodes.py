@@ -6,6 +6,7 @@
 import re
 from typing import Optional
 
+from app.core.metrics import cache_lookup
 from app.core.templates import templates
 
 
@@ -41,7 +42,6 @@ def build_section_view(shortcode) -> object:
 def render_shortcode_to_html(shortcode, request, db) -> str:
     """Рендерит шорткод в HTML. Если задан page_section_id — секция из БД, иначе legacy JSON."""
     from sqlalchemy.orm import joinedload
-    from app.core.heroicons import get_icon_paths_html
     from app.models import PageSection
 
     section = None
@@ -61,7 +61,6 @@ def render_shortcode_to_html(shortcode, request, db) -> str:
     html = template.render(
         request=request,
         section=section,
-        heroicon_paths=get_icon_paths_html(),
     )
     # Обёртка по системе классов: изоляция от стилей контента статьи
     return f'<div class="shortcode-block">{html}</div>'
@@ -90,6 +89,7 @@ def process_shortcodes(html: str, request, db) -> str:
             Shortcode.name == name,
             Shortcode.is_active.is_(True),
         ).first()
+        cache_lookup("shortcodes", shortcode is not None)
         if not shortcode:
             return match.group(0)
         try:
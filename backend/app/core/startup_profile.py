@@ -0,0 +1,104 @@
+"""
+Профиль холодного старта: время импорта модулей и память процесса
+
+Приложение импортируется в отдельном процессе с python -X importtime,
+отчёт собирается из его stderr: общее время импорта, RSS после импорта,
+самые дорогие пакеты (собственное время модулей пакета) и модули app.*
+(вместе с тем, что они импортируют), а также какие тяжёлые зависимости
+загрузились при старте, хотя должны загружаться при первом использовании.
+
+    python -m app --profile-startup
+"""
+
+import json
+import re
+import subprocess
+import sys
+from collections import Counter
+from typing import Dict, List
+
+# Зависимости, которые загружаются лениво (WeasyPrint, Excel, Dadata, HTTP-клиент)
+LAZY_MODULES = ("weasyprint", "openpyxl", "xlwt", "dadata", "httpx")
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+_CHILD_CODE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - started
+rss_kb = 0
+try:
+    with open("/proc/self/status") as f:
+        rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+except (OSError, StopIteration):
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "elapsed": elapsed,
+    "rss_kb": rss_kb,
+    "lazy_loaded": [m for m in {lazy!r} if m in sys.modules],
+}}))
+"""
+
+
+def profile_startup(target: str = "app.main") -> Dict:
+    """Импортировать target в дочернем процессе и собрать профиль"""
+    code = _CHILD_CODE.format(target=target, lazy=LAZY_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+
+    modules: List[Dict] = []
+    for line in result.stderr.splitlines():
+        m = _IMPORTTIME_RE.match(line)
+        if m:
+            modules.append({
+                "name": m.group(4),
+                "self_us": int(m.group(1)),
+                "cumulative_us": int(m.group(2)),
+                "depth": len(m.group(3)) // 2,
+            })
+
+    packages: Counter = Counter()
+    for module in modules:
+        packages[module["name"].split(".")[0]] += module["self_us"]
+
+    summary = json.loads(result.stdout.strip().splitlines()[-1])
+    summary.update({
+        "target": target,
+        "modules": modules,
+        "packages": packages,
+    })
+    return summary
+
+
+def format_report(profile: Dict, top: int = 20) -> str:
+    lines = [
+        f"Импорт {profile['target']}: {profile['elapsed'] * 1000:.0f} мс, "
+        f"RSS {profile['rss_kb'] / 1024:.1f} МБ, модулей: {len(profile['modules'])}",
+        "",
+        f"Пакеты (собственное время модулей), топ {top}:",
+    ]
+    for name, us in profile["packages"].most_common(top):
+        lines.append(f"  {us / 1000:>8.1f} мс  {name}")
+
+    app_modules = sorted(
+        (m for m in profile["modules"] if m["name"].startswith("app.")),
+        key=lambda m: m["cumulative_us"], reverse=True,
+    )
+    lines += ["", f"Модули app.* (с вложенными импортами), топ {top}:"]
+    for module in app_modules[:top]:
+        lines.append(
+            f"  {module['cumulative_us'] / 1000:>8.1f} мс  {module['name']} "
+            f"(собственное {module['self_us'] / 1000:.1f} мс)"
+        )
+
+    lines.append("")
+    if profile["lazy_loaded"]:
+        lines.append("Загружены при старте, хотя должны грузиться лениво: " + ", ".join(profile["lazy_loaded"]))
+    else:
+        lines.append("Ленивые зависимости при старте не загружены: " + ", ".join(LAZY_MODULES))
+    return "\n".join(lines)
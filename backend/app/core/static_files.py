@@ -0,0 +1,66 @@
+"""
+StaticFiles с отдачей заранее сжатых файлов
+
+Если рядом с файлом лежит app.css.br или app.css.gz (scripts/build_assets.py),
+а клиент принимает эту кодировку, отдаётся сжатый файл с Content-Encoding -
+без сжатия на каждом запросе. Копия старше исходника не используется.
+"""
+
+import os
+from mimetypes import guess_type
+from typing import List, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.core.http_cache import choose_encoding
+
+# Content-Encoding -> суффикс файла; порядок - приоритет сервера
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles, выбирающий .br/.gz-копию по Accept-Encoding"""
+
+    def _variants(self, full_path: str, stat_result: os.stat_result) -> List[Tuple[str, str, os.stat_result]]:
+        variants = []
+        for encoding, suffix in PRECOMPRESSED:
+            try:
+                variant_stat = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            if variant_stat.st_mtime >= stat_result.st_mtime:
+                variants.append((encoding, full_path + suffix, variant_stat))
+        return variants
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        variants = self._variants(str(full_path), stat_result)
+        if not variants:
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding"), [v[0] for v in variants])
+        if encoding is None:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+            response.headers["Vary"] = "Accept-Encoding"
+            return response
+
+        _, variant_path, variant_stat = next(v for v in variants if v[0] == encoding)
+        response = FileResponse(
+            variant_path,
+            status_code=status_code,
+            stat_result=variant_stat,
+            media_type=guess_type(str(full_path))[0] or "text/plain",
+            headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
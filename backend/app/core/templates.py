@@ -7,6 +7,8 @@ from fastapi.templating import Jinja2Templates
 from datetime import datetime
 
 from app.core.content import load_navigation
+from app.core.heroicons import heroicon
+from app.core.assets import asset
 
 # Путь к шаблонам
 TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
@@ -26,6 +28,12 @@ def get_navigation():
 
 templates.env.globals["get_navigation"] = get_navigation
 
+# Иконки Heroicons: {{ heroicon("document-text", "icon-28") }} -> <svg><use href="спрайт#..."></svg>
+templates.env.globals["heroicon"] = heroicon
+
+# Статика с хэшем в имени: {{ asset("css/documatica.css") }} (app/core/assets.py)
+templates.env.globals["asset"] = asset
+
 
 # Кастомные фильтры
 def format_number(value):
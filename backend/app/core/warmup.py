@@ -0,0 +1,56 @@
+"""
+Прогрев приложения перед fork (gunicorn.conf.py, preload_app)
+
+Всё, что иначе загружает первый запрос в каждом воркере - YAML-контент,
+спрайт иконок, манифест статики, скомпилированные Jinja-шаблоны, - один
+раз загружается в мастер-процессе и достаётся воркерам через fork
+(copy-on-write). Соединения с БД здесь не открываются.
+"""
+
+import logging
+import time
+from typing import Dict
+
+from jinja2 import TemplateError
+
+from app.core.assets import load_manifest
+from app.core.config import settings
+from app.core.content import content_store
+from app.core.heroicons import get_sprite
+from app.core.templates import templates
+
+logger = logging.getLogger(__name__)
+
+# Шаблоны документов рендерятся отдельным окружением Jinja (app/api/documents.py)
+DOCUMENT_TEMPLATES = ("upd_template.html", "invoice_template.html", "akt_template.html")
+
+
+def warm_up() -> Dict[str, float]:
+    """Загрузить общие данные в память процесса. Возвращает счётчики для лога."""
+    from app.api import documents
+
+    started = time.perf_counter()
+    content_store.refresh(force=True)
+    get_sprite()
+    load_manifest()
+
+    compiled = failed = 0
+    for name in templates.env.list_templates(filter_func=lambda name: name.endswith(".html")):
+        try:
+            templates.env.get_template(name)
+            compiled += 1
+        except TemplateError as e:
+            failed += 1
+            logger.warning(f"Template {name} not compiled: {e}")
+    for name in DOCUMENT_TEMPLATES:
+        documents.jinja_env.get_template(name)
+
+    if settings.RENDERERS_PRELOAD:
+        documents.preload_renderers()
+
+    return {
+        "templates": compiled,
+        "template_errors": failed,
+        "content_files": content_store.stats()["files"],
+        "seconds": round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,50 @@
+"""
+Воркер gunicorn для продакшен-запуска (gunicorn.conf.py)
+
+UvicornWorker, который перезапускается, когда память процесса превысила
+SERVER_MAX_RSS_MB: WeasyPrint и openpyxl со временем раздувают воркер.
+Проверка выполняется при каждом heartbeat воркера (раз в SERVER_TIMEOUT
+секунд). Воркер посылает себе SIGTERM: uvicorn перестаёт принимать
+соединения и дожидается текущих запросов, gunicorn запускает замену.
+Перезапуск после SERVER_MAX_REQUESTS запросов делает сам uvicorn
+(limit_max_requests).
+"""
+
+import os
+import signal
+
+from uvicorn.workers import UvicornWorker
+
+from app.core.config import settings
+
+
+def current_rss_kb() -> int:
+    """Текущий RSS процесса в КБ (0, если /proc недоступен)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+class RecyclingUvicornWorker(UvicornWorker):
+    """UvicornWorker с перезапуском по потреблению памяти"""
+
+    max_rss_kb = settings.SERVER_MAX_RSS_MB * 1024
+    recycling = False
+
+    async def callback_notify(self) -> None:
+        await super().callback_notify()
+        if not self.max_rss_kb or self.recycling:
+            return
+        rss_kb = current_rss_kb()
+        if rss_kb > self.max_rss_kb:
+            self.recycling = True
+            self.log.info(
+                "Worker %s RSS %d MB exceeds %d MB, restarting after in-flight requests",
+                self.pid, rss_kb // 1024, self.max_rss_kb // 1024,
+            )
+            os.kill(os.getpid(), signal.SIGTERM)
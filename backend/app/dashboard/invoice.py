@@ -2,21 +2,17 @@
 Dashboard - генератор Счёта на оплату
 """
 
-import json
 from datetime import date
-from pathlib import Path
 from fastapi import APIRouter, Request, Path as PathParam
 from fastapi.responses import HTMLResponse
 from typing import Optional
 
 from app.core.templates import templates
 from app.dashboard.context import get_dashboard_context, require_auth
+from app.services import document_store
 
 router = APIRouter()
 
-# Путь к сохранённым документам
-DOCUMENTS_DIR = Path(__file__).parent.parent.parent / "documents"
-
 
 @router.get("/create/", response_class=HTMLResponse)
 async def invoice_create(request: Request, preset: Optional[str] = None):
@@ -60,26 +56,12 @@ async def invoice_edit(request: Request, document_id: str = PathParam(...)):
     if auth_check:
         return auth_check
     
-    # Загружаем данные документа
-    document = None
-    form_data = None
-    doc_folder = DOCUMENTS_DIR / document_id
-    
-    # Пробуем metadata.json (новый формат), затем meta.json (старый)
-    meta_path = doc_folder / "metadata.json"
-    if not meta_path.exists():
-        meta_path = doc_folder / "meta.json"
-    
-    form_data_path = doc_folder / "form_data.json"
+    # Загружаем данные документа (metadata.json или старый meta.json - см. document_store)
+    stored = document_store.read_document(document_id) or {}
+    document = stored.get("metadata")
+    form_data = stored.get("form_data")
     
-    if meta_path.exists():
-        with open(meta_path, "r", encoding="utf-8") as f:
-            document = json.load(f)
-    
-    if form_data_path.exists():
-        with open(form_data_path, "r", encoding="utf-8") as f:
-            form_data = json.load(f)
-    elif document:
+    if form_data is None and document:
         form_data = document.get("form_data", {})
     
     return templates.TemplateResponse(
@@ -105,23 +87,14 @@ async def invoice_view(request: Request, document_id: str = PathParam(...)):
     if auth_check:
         return auth_check
     
-    # Загружаем данные документа
-    document = None
-    doc_folder = DOCUMENTS_DIR / document_id
-    
-    # Пробуем metadata.json (новый формат), затем meta.json (старый)
-    meta_path = doc_folder / "metadata.json"
-    if not meta_path.exists():
-        meta_path = doc_folder / "meta.json"
-    
-    if meta_path.exists():
-        with open(meta_path, "r", encoding="utf-8") as f:
-            document = json.load(f)
-            # Преобразуем в объект-like для шаблона
-            class DocDict(dict):
-                def __getattr__(self, item):
-                    return self.get(item)
-            document = DocDict(document)
+    # Загружаем метаданные документа
+    document = document_store.read_metadata(document_id)
+    if document is not None:
+        # Преобразуем в объект-like для шаблона
+        class DocDict(dict):
+            def __getattr__(self, item):
+                return self.get(item)
+        document = DocDict(document)
     
     return templates.TemplateResponse(
         request=request,
@@ -6,6 +6,7 @@ import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import Settings
+from app.core.metrics import instrument_engine
 
 settings = Settings()
 
@@ -15,6 +16,8 @@ DATABASE_URL = settings.DATABASE_URL
 # Убираем asyncpg для синхронного доступа
 sync_url = DATABASE_URL.replace("+asyncpg", "")
 engine = create_engine(sync_url)
+# Счётчики пула для /metrics (app/core/metrics.py)
+instrument_engine(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
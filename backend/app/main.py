@@ -3,14 +3,17 @@ Documatica Backend - FastAPI Application
 Сервис генерации бухгалтерских документов (УПД)
 """
 
+import gzip
+import hmac
 import logging
 from pathlib import Path
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, Response
 from fastapi.templating import Jinja2Templates
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from sqlalchemy.orm import Session
 
 # Настройка логирования
 logging.basicConfig(
@@ -25,7 +28,20 @@ from app.api.v1 import router as api_v1_router
 from app.pages import router as pages_router
 from app.dashboard import router as dashboard_router
 from app.admin import router as admin_router
-from app.database import init_db
+from app.database import init_db, get_db
+from app.core.config import settings
+from app.core.content import content_store
+from app.services.email_outbox import email_outbox_worker
+from app.services.draft_reaper import draft_reaper
+from app.services.analytics import analytics_buffer
+from app.services.sitemap import sitemap_cache
+from app.core.http_cache import choose_encoding, etag_matches, make_etag
+from app.core.heroicons import get_sprite
+from app.core.assets import asset, is_fingerprinted
+from app.core.static_files import PrecompressedStaticFiles
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import MetricsMiddleware, render_latest
+from app.core.profiling import ProfilingMiddleware
 from app.core.redirects import RedirectMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 
@@ -33,6 +49,7 @@ from starlette.middleware.base import BaseHTTPMiddleware
 STATIC_DIR = Path(__file__).parent / "static"
 TEMPLATES_DIR = Path(__file__).parent / "templates"
 error_templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+error_templates.env.globals["asset"] = asset
 
 app = FastAPI(
     title="Documatica API",
@@ -61,14 +78,16 @@ class CacheControlMiddleware(BaseHTTPMiddleware):
         response = await call_next(request)
         path = request.url.path
         
-        # Статические файлы с версией - кэшируем надолго
-        if path.startswith("/static/") and ("?v=" in str(request.url) or "?ver=" in str(request.url)):
+        # Статические файлы с хэшем в имени или с версией - кэшируем надолго
+        if path.startswith("/static/") and (
+            is_fingerprinted(path) or "?v=" in str(request.url) or "?ver=" in str(request.url)
+        ):
             response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
         # Статические файлы без версии - короткий кэш
         elif path.startswith("/static/"):
             response.headers["Cache-Control"] = "public, max-age=3600"
-        # HTML страницы - не кэшировать
-        elif not path.startswith("/api/"):
+        # HTML страницы - не кэшировать (спрайт иконок задаёт кэш сам)
+        elif not path.startswith(("/api/", "/icons/")):
             response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
             response.headers["Pragma"] = "no-cache"
             response.headers["Expires"] = "0"
@@ -77,11 +96,26 @@ class CacheControlMiddleware(BaseHTTPMiddleware):
 
 app.add_middleware(CacheControlMiddleware)
 
+
+# Сжатие HTML/JSON - снаружи остальных middleware: сжимается окончательный
+# ответ с уже выставленными Cache-Control и ETag (app/core/compression.py)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Латентность по маршрутам для /metrics - самым внешним, чтобы учитывать всё
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Профиль запроса с подписанным ?_profile= / X-Profile-Token (app/core/profiling.py);
+# выключенным не добавляется в цепочку
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 # Статические файлы
 UPLOADS_DIR = Path(__file__).parent.parent / "data" / "uploads"
 UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
 app.mount("/static/uploads", StaticFiles(directory=str(UPLOADS_DIR)), name="uploads")
-app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
+app.mount("/static", PrecompressedStaticFiles(directory=str(STATIC_DIR)), name="static")
 
 
 # ===== Обработчик ошибок 404 =====
@@ -113,12 +147,67 @@ async def robots():
     return HTMLResponse(content="User-agent: *\nDisallow:", media_type="text/plain")
 
 @app.get("/sitemap.xml")
-async def sitemap():
-    """Раздача sitemap.xml из корня контейнера /app"""
-    sitemap_path = PROJECT_ROOT / "sitemap.xml"
-    if sitemap_path.exists():
-        return FileResponse(sitemap_path, media_type="application/xml")
-    return HTMLResponse(content="<?xml version='1.0' encoding='UTF-8'?><urlset></urlset>", media_type="application/xml")
+def sitemap(db: Session = Depends(get_db)):
+    """Индекс sitemap, собранный из БД (app/services/sitemap.py)"""
+    return Response(content=sitemap_cache.index(db), media_type="application/xml")
+
+
+@app.get("/sitemap-{name}-{number}.xml")
+def sitemap_chunk(name: str, number: int, request: Request, db: Session = Depends(get_db)):
+    """Часть sitemap: сжатая заранее, распаковывается только для клиентов без gzip"""
+    gzipped = sitemap_cache.chunk_gzipped(db, name, number)
+    if gzipped is None:
+        raise StarletteHTTPException(status_code=404)
+    if choose_encoding(request.headers.get("accept-encoding"), ["gzip"]) == "gzip":
+        return Response(
+            content=gzipped,
+            media_type="application/xml",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+        )
+    return Response(content=gzip.decompress(gzipped), media_type="application/xml", headers={"Vary": "Accept-Encoding"})
+
+
+@app.get("/sitemap-{name}-{number}.xml.gz")
+def sitemap_chunk_gz(name: str, number: int, db: Session = Depends(get_db)):
+    """Часть sitemap файлом .xml.gz"""
+    gzipped = sitemap_cache.chunk_gzipped(db, name, number)
+    if gzipped is None:
+        raise StarletteHTTPException(status_code=404)
+    return Response(content=gzipped, media_type="application/gzip")
+
+
+# ===== Спрайт иконок (app/core/heroicons.py) =====
+@app.get("/icons/heroicons.{fingerprint}.svg")
+def heroicons_sprite(fingerprint: str, request: Request):
+    """
+    SVG-спрайт Heroicons. URL с актуальным хэшем кэшируется навсегда;
+    по устаревшему хэшу (HTML из кэша после деплоя) отдаётся текущий спрайт
+    с коротким кэшем.
+    """
+    sprite = get_sprite()
+    cache_control = (
+        "public, max-age=31536000, immutable" if fingerprint == sprite.fingerprint else "public, max-age=300"
+    )
+    headers = {"Cache-Control": cache_control, "ETag": make_etag(sprite.fingerprint), "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), sprite.fingerprint):
+        return Response(status_code=304, headers=headers)
+    if choose_encoding(request.headers.get("accept-encoding"), ["gzip"]) == "gzip":
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=sprite.gzipped, media_type="image/svg+xml", headers=headers)
+    return Response(content=sprite.svg, media_type="image/svg+xml", headers=headers)
+
+
+# Метрики Prometheus (app/core/metrics.py)
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    # Без METRICS_TOKEN эндпоинт закрыт: сайт целиком публикуется через traefik
+    if not settings.METRICS_ENABLED or not settings.METRICS_TOKEN:
+        raise StarletteHTTPException(status_code=404)
+    expected = f"Bearer {settings.METRICS_TOKEN}".encode("utf-8")
+    if not hmac.compare_digest(request.headers.get("authorization", "").encode("utf-8"), expected):
+        raise StarletteHTTPException(status_code=401)
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
 
 
 # ===== API роутеры =====
@@ -238,6 +327,23 @@ app.include_router(pages_router, tags=["pages"])
 @app.on_event("startup")
 async def startup_event():
     init_db()
+    content_store.refresh(force=True)
+    get_sprite()
+    if settings.RENDERERS_PRELOAD:
+        documents.preload_renderers()
+    if settings.EMAIL_OUTBOX_WORKER:
+        email_outbox_worker.start()
+    if settings.DRAFT_REAPER_ENABLED:
+        draft_reaper.start()
+    if settings.ANALYTICS_ENABLED:
+        analytics_buffer.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    email_outbox_worker.stop()
+    draft_reaper.stop()
+    analytics_buffer.stop()
 
 
 # Health check endpoint
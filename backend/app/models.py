@@ -3,10 +3,10 @@
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Float, ForeignKey, Numeric, JSON, UniqueConstraint
+from sqlalchemy import Column, Computed, Integer, BigInteger, String, Boolean, Date, DateTime, Text, Float, ForeignKey, Numeric, JSON, UniqueConstraint, Index, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 
 Base = declarative_base()
 
@@ -63,6 +63,7 @@ class User(Base):
 class INNUsage(Base):
     """Отслеживание использования ИНН для защиты от мультиаккаунтности"""
     __tablename__ = "inn_usage"
+    __table_args__ = (UniqueConstraint("user_id", "inn", name="uq_inn_usage_user_inn"),)
     
     id = Column(Integer, primary_key=True, index=True)
     inn = Column(String(12), index=True, nullable=False)  # ИНН (10 или 12 цифр)
@@ -178,6 +179,10 @@ class PromocodeUsage(Base):
 class GuestDraft(Base):
     """Черновики документов гостей (неавторизованных пользователей)"""
     __tablename__ = "guest_drafts"
+    # Частичный индекс для удаления просроченных непривязанных черновиков (draft_reaper)
+    __table_args__ = (
+        Index("ix_guest_drafts_expires_at_unclaimed", "expires_at", postgresql_where=text("is_claimed = false")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     draft_token = Column(String(64), unique=True, index=True, nullable=False)  # Уникальный токен для доступа
@@ -185,8 +190,9 @@ class GuestDraft(Base):
     # Тип документа
     document_type = Column(String(50), nullable=False)  # upd, akt, invoice
     
-    # Данные документа (JSON)
-    document_data = Column(Text, nullable=False)
+    # Данные документа (JSONB: автосохранение обновляет отдельные поля, см. services/draft_patch.py)
+    document_data = Column(JSONB, nullable=False)
+    version = Column(Integer, nullable=False, default=1)  # Растёт при каждом обновлении (оптимистическая блокировка)
     
     # Связь с пользователем (после регистрации)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -362,9 +368,27 @@ class ArticleCategory(Base):
         return f"<ArticleCategory {self.full_slug}>"
 
 
+ARTICLE_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(excerpt, '')), 'B') || "
+    "setweight(to_tsvector('russian', regexp_replace(coalesce(content, ''), '<[^>]*>', ' ', 'g')), 'C')"
+)
+
+
 class Article(Base):
     """Статья блога/новостей. Хранится в БД."""
     __tablename__ = "articles"
+    __table_args__ = (
+        # Поиск подстроки (ILIKE) в теле статьи - перелинковщик SEO-инструментов
+        Index(
+            "ix_articles_content_trgm",
+            "content",
+            postgresql_using="gin",
+            postgresql_ops={"content": "gin_trgm_ops"},
+        ),
+        # Полнотекстовый поиск (app/services/article_search.py)
+        Index("ix_articles_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     category_id = Column(Integer, ForeignKey("article_categories.id"), nullable=True, index=True)
@@ -385,6 +409,9 @@ class Article(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Вычисляется PostgreSQL: title (вес A), excerpt (B), текст content без тегов (C)
+    search_vector = deferred(Column(TSVECTOR, Computed(ARTICLE_SEARCH_VECTOR_SQL, persisted=True)))
+
     category = relationship("ArticleCategory", back_populates="articles")
     hub_section_links = relationship(
         "HubSectionArticle",
@@ -535,10 +562,12 @@ class CategoryBlock(Base):
 
 
 class AnalyticsEvent(Base):
-    """События для аналитики"""
+    """События для аналитики (секционирована по месяцам, запись - app/services/analytics.py)"""
     __tablename__ = "analytics_events"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
     
-    id = Column(Integer, primary_key=True, index=True)
+    # Ключ секционирования входит в первичный ключ
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     
     # Тип события
     event_type = Column(String(100), nullable=False, index=True)  # page_view, document_created, payment, etc.
@@ -556,7 +585,7 @@ class AnalyticsEvent(Base):
     referrer = Column(String(500), nullable=True)
     
     # Метаданные
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow, index=True)
     
     # Связи
     user = relationship("User")
@@ -565,6 +594,18 @@ class AnalyticsEvent(Base):
         return f"<AnalyticsEvent {self.event_type} user_id={self.user_id}>"
 
 
+class AnalyticsDailyCount(Base):
+    """Дневные счётчики событий по типу (для дашборда админки)"""
+    __tablename__ = "analytics_daily_counts"
+    
+    day = Column(Date, primary_key=True)
+    event_type = Column(String(100), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<AnalyticsDailyCount {self.day} {self.event_type}={self.count}>"
+
+
 class Document(Base):
     """Метаданные созданных документов (для аналитики)"""
     __tablename__ = "documents"
@@ -670,3 +711,48 @@ class Redirect(Base):
     
     def __repr__(self):
         return f"<Redirect {self.from_url} → {self.to_url} ({self.status_code})>"
+
+
+class InternalLink(Base):
+    """Граф внутренних ссылок: кто (статья/страница) ссылается на какой путь (для SEO-инструментов)"""
+    __tablename__ = "internal_links"
+    __table_args__ = (
+        UniqueConstraint("source_type", "source_id", "target_path", name="uq_internal_links_source_target"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    source_type = Column(String(20), nullable=False)  # article, page
+    source_id = Column(Integer, nullable=False)  # Article.id или Page.id
+    target_path = Column(String(500), nullable=False, index=True)  # путь без крайних "/": "news/slug", "upd/ooo", "" - главная
+    
+    def __repr__(self):
+        return f"<InternalLink {self.source_type}:{self.source_id} -> /{self.target_path}>"
+
+
+class EmailOutbox(Base):
+    """Очередь исходящих писем: обработчики только ставят письмо, отправляет фоновый воркер"""
+    __tablename__ = "email_outbox"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Письмо
+    to_email = Column(String(255), nullable=False)
+    subject = Column(String(500), nullable=False)
+    html_content = Column(Text, nullable=False)
+    
+    # Доставка
+    status = Column(String(20), nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # для sending - конец аренды
+    last_error = Column(Text, nullable=True)
+    
+    # Метаданные
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+    
+    def __repr__(self):
+        return f"<EmailOutbox {self.id} to={self.to_email} status={self.status}>"
@@ -8,7 +8,6 @@ from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session, joinedload
 
 from app.core.templates import templates
-from app.core.heroicons import get_icon_paths_html
 from app.database import get_db
 from app.models import Page
 
@@ -63,7 +62,6 @@ async def about_page(request: Request, db: Session = Depends(get_db)):
                 "title": page.meta_title or page.title,
                 "description": page.meta_description or "",
                 "is_home_page": False,
-                "heroicon_paths": get_icon_paths_html(),
             },
         )
     return templates.TemplateResponse(
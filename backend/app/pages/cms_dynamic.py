@@ -9,7 +9,6 @@ from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session, joinedload
 
 from app.core.templates import templates
-from app.core.heroicons import get_icon_paths_html
 from app.database import get_db
 from app.models import Page
 
@@ -90,7 +89,6 @@ async def cms_page_by_path(
             "title": page.meta_title or page.title,
             "description": page.meta_description or "",
             "is_home_page": False,
-            "heroicon_paths": get_icon_paths_html(),
             "canonical_url": canonical_url,
             "og_title": page.meta_title or page.title,
             "og_description": page.meta_description or "",
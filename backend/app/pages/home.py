@@ -17,7 +17,6 @@ load_dotenv()
 from fastapi import HTTPException
 
 from app.core.templates import templates
-from app.core.heroicons import get_icon_paths_html
 from app.database import get_db
 from app.models import Page, Article
 from app.pages.cms_dynamic import _build_sections_for_template
@@ -91,7 +90,6 @@ async def home(request: Request, db: Session = Depends(get_db)):
                 "title": page.meta_title or page.title,
                 "description": page.meta_description or "",
                 "is_home_page": True,
-                "heroicon_paths": get_icon_paths_html(),
             },
         )
     content = _default_home_content()
@@ -101,7 +99,6 @@ async def home(request: Request, db: Session = Depends(get_db)):
         context={
             "content": content,
             "latest_articles": latest_articles,
-            "heroicon_paths": get_icon_paths_html(),
         },
     )
 
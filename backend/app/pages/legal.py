@@ -7,7 +7,6 @@ from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session, joinedload
 
 from app.core.templates import templates
-from app.core.heroicons import get_icon_paths_html
 from app.database import get_db
 from app.models import Page
 from app.pages.cms_dynamic import _build_sections_for_template
@@ -41,7 +40,6 @@ async def privacy_page(request: Request, db: Session = Depends(get_db)):
             "title": page.meta_title or page.title,
             "description": page.meta_description or "",
             "is_home_page": False,
-            "heroicon_paths": get_icon_paths_html(),
         },
     )
 
@@ -72,6 +70,5 @@ async def agreement_page(request: Request, db: Session = Depends(get_db)):
             "title": page.meta_title or page.title,
             "description": page.meta_description or "",
             "is_home_page": False,
-            "heroicon_paths": get_icon_paths_html(),
         },
     )
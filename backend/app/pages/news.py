@@ -10,9 +10,9 @@ from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.orm import Session, joinedload
 
 from app.core.templates import templates
-from app.core.heroicons import get_icon_paths_html
 from app.database import get_db
 from app.models import Page, Article, ArticleCategory, CategorySection, NewsSidebarItem, Shortcode
+from app.services import article_search
 from app.pages.cms_dynamic import _build_sections_for_template
 
 router = APIRouter()
@@ -166,7 +166,6 @@ async def news_category_page(
         "current_category": cat,
         "title": cat.meta_title or cat.name,
         "description": cat.meta_description or "",
-        "heroicon_paths": get_icon_paths_html(),
         "is_home_page": False,
     }
     return templates.TemplateResponse(
@@ -211,7 +210,6 @@ async def news_index(request: Request, db: Session = Depends(get_db), category:
             "title": cms_page.meta_title or cms_page.title,
             "description": cms_page.meta_description or "",
             "is_home_page": False,
-            "heroicon_paths": get_icon_paths_html(),
             "articles": articles_page,
             "categories": categories,
             "current_category": current_category,
@@ -253,6 +251,35 @@ async def news_index(request: Request, db: Session = Depends(get_db), category:
     )
 
 
+@router.get("/search", response_class=HTMLResponse, include_in_schema=False)
+@router.get("/search/", response_class=HTMLResponse)
+async def news_search(request: Request, q: str = "", page: int = 1, db: Session = Depends(get_db)):
+    """Полнотекстовый поиск по опубликованным статьям."""
+    query = q.strip()[:200]
+    page = max(1, page)
+    per_page = 12
+    hits, total = article_search.search_articles(db, query, limit=per_page, offset=(page - 1) * per_page)
+    total_pages = max(1, (total + per_page - 1) // per_page)
+    return templates.TemplateResponse(
+        request=request,
+        name="public/news/search.html",
+        context={
+            "title": f"Поиск: {query}" if query else "Поиск по статьям",
+            "description": "Поиск по статьям о налогах, бухгалтерии и документообороте для ИП и ООО",
+            "query": query,
+            "hits": hits,
+            "total": total,
+            "page": page,
+            "total_pages": total_pages,
+            "breadcrumbs": [
+                {"title": "Главная", "url": "/"},
+                {"title": "Статьи", "url": "/news/"},
+                {"title": "Поиск", "url": None},
+            ],
+        },
+    )
+
+
 @router.get("/{slug}", response_class=RedirectResponse, include_in_schema=False)
 async def news_article_redirect_trailing_slash(request: Request, slug: str):
     """Редирект /news/slug → /news/slug/ (301) для единообразия URL."""
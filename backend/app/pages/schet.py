@@ -7,7 +7,6 @@ from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.orm import Session, joinedload
 
 from app.core.templates import templates
-from app.core.heroicons import get_icon_paths_html
 from app.database import get_db
 from app.models import Page
 from app.pages.cms_dynamic import _build_sections_for_template
@@ -62,7 +61,6 @@ async def schet_hub(request: Request, db: Session = Depends(get_db)):
             "title": page.meta_title or page.title,
             "description": page.meta_description or "",
             "is_home_page": False,
-            "heroicon_paths": get_icon_paths_html(),
         },
     )
 
@@ -94,7 +92,6 @@ async def schet_subpage(request: Request, path: str, db: Session = Depends(get_d
                 "title": page.meta_title or page.title,
                 "description": page.meta_description or "",
                 "is_home_page": False,
-                "heroicon_paths": get_icon_paths_html(),
                 "breadcrumbs": [
                     {"title": "Главная", "url": "/"},
                     {"title": "Счет на оплату", "url": "/schet/"},
@@ -0,0 +1,209 @@
+"""
+Запись событий аналитики (analytics_events)
+
+Обработчики запросов не пишут события в БД сами: track() кладёт событие
+в кольцевой буфер процесса и сразу возвращается. Фоновый поток сбрасывает
+буфер пачками - многострочным INSERT - каждые ANALYTICS_BATCH_SIZE событий
+или ANALYTICS_FLUSH_INTERVAL_MS миллисекунд, в той же транзакции
+увеличивая дневные счётчики analytics_daily_counts (для дашборда админки).
+
+При переполнении буфера (БД не успевает или недоступна) новые события
+отбрасываются и учитываются в stats()["dropped"] - запросы пользователей
+из-за аналитики не ждут никогда.
+
+analytics_events секционирована по месяцам (created_at); секции на текущий
+и следующие месяцы создаёт ensure_partitions() при старте воркера и
+при смене месяца.
+"""
+
+import logging
+import threading
+from collections import deque
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models import AnalyticsDailyCount, AnalyticsEvent
+
+logger = logging.getLogger(__name__)
+
+PARTITION_MONTHS_AHEAD = 2
+
+
+def _month_start(day: date, shift: int = 0) -> date:
+    month_index = day.year * 12 + day.month - 1 + shift
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def ensure_partitions(db, months_ahead: int = PARTITION_MONTHS_AHEAD) -> None:
+    """Создать месячные секции analytics_events на текущий и следующие месяцы"""
+    today = datetime.utcnow().date()
+    for shift in range(months_ahead + 1):
+        start = _month_start(today, shift)
+        end = _month_start(today, shift + 1)
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS analytics_events_{start:%Y%m} "
+            f"PARTITION OF analytics_events "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+    db.commit()
+
+
+class AnalyticsBuffer:
+    """Кольцевой буфер событий процесса с фоновым сбросом в БД"""
+
+    def __init__(self, capacity: int, batch_size: int, flush_interval: float):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._events: deque = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._partitions_month: Optional[date] = None
+        self.accepted = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.failed = 0
+
+    def track(
+        self,
+        event_type: str,
+        user_id: Optional[int] = None,
+        session_id: Optional[str] = None,
+        event_data: Optional[Dict[str, Any]] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        referrer: Optional[str] = None,
+    ) -> bool:
+        """Поставить событие в буфер. False - буфер полон, событие отброшено."""
+        event = {
+            "event_type": event_type,
+            "user_id": user_id,
+            "session_id": session_id,
+            "event_data": event_data,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "referrer": referrer[:500] if referrer else None,
+            "created_at": datetime.utcnow(),
+        }
+        with self._lock:
+            if len(self._events) >= self.capacity:
+                self.dropped += 1
+                return False
+            self._events.append(event)
+            self.accepted += 1
+            pending = len(self._events)
+        if pending >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            count = min(self.batch_size, len(self._events))
+            return [self._events.popleft() for _ in range(count)]
+
+    def flush(self) -> int:
+        """Записать одну пачку событий. Возвращает число записанных."""
+        batch = self._take_batch()
+        if not batch:
+            return 0
+
+        daily: Dict[tuple, int] = {}
+        for event in batch:
+            key = (event["created_at"].date(), event["event_type"])
+            daily[key] = daily.get(key, 0) + 1
+
+        db = SessionLocal()
+        try:
+            month = _month_start(datetime.utcnow().date())
+            if self._partitions_month != month:
+                ensure_partitions(db)
+                self._partitions_month = month
+
+            db.execute(insert(AnalyticsEvent), batch)
+            rollup = pg_insert(AnalyticsDailyCount).values([
+                {"day": day, "event_type": event_type, "count": count}
+                for (day, event_type), count in daily.items()
+            ])
+            db.execute(rollup.on_conflict_do_update(
+                index_elements=[AnalyticsDailyCount.day, AnalyticsDailyCount.event_type],
+                set_={"count": AnalyticsDailyCount.count + rollup.excluded.count},
+            ))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            with self._lock:
+                self.failed += len(batch)
+            logger.error(f"Analytics flush failed, {len(batch)} events lost: {e}")
+            return 0
+        finally:
+            db.close()
+
+        with self._lock:
+            self.flushed += len(batch)
+        return len(batch)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="analytics-flush", daemon=True)
+        self._thread.start()
+        logger.info("Analytics flusher started")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Остановка: оставшиеся события записываются"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            while self.flush() >= self.batch_size:
+                pass  # в буфере есть ещё пачка
+        while self.flush():
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "pending": len(self._events),
+                "accepted": self.accepted,
+                "dropped": self.dropped,
+                "flushed": self.flushed,
+                "failed": self.failed,
+            }
+
+
+analytics_buffer = AnalyticsBuffer(
+    capacity=settings.ANALYTICS_BUFFER_SIZE,
+    batch_size=settings.ANALYTICS_BATCH_SIZE,
+    flush_interval=settings.ANALYTICS_FLUSH_INTERVAL_MS / 1000,
+)
+
+
+def track(event_type: str, **fields) -> bool:
+    """Записать событие аналитики (без ожидания БД)"""
+    if not settings.ANALYTICS_ENABLED:
+        return False
+    return analytics_buffer.track(event_type, **fields)
+
+
+def daily_counts(db, since: date) -> Dict[str, Dict[date, int]]:
+    """Дневные счётчики событий с даты since: {event_type: {day: count}}"""
+    rows = db.query(AnalyticsDailyCount).filter(AnalyticsDailyCount.day >= since).all()
+    result: Dict[str, Dict[date, int]] = {}
+    for row in rows:
+        result.setdefault(row.event_type, {})[row.day] = row.count
+    return result
@@ -0,0 +1,96 @@
+"""
+Полнотекстовый поиск по статьям (PostgreSQL, конфигурация russian)
+
+Индекс - генерируемая колонка articles.search_vector (title с весом A,
+excerpt - B, текст content без HTML-тегов - C) с GIN-индексом. Запрос
+пользователя разбирается websearch_to_tsquery: слова, "фразы в кавычках",
+-исключения, or.
+
+Результаты упорядочены по ts_rank_cd. Фрагменты с подсветкой (ts_headline)
+строятся только для строк текущей страницы: ts_headline разбирает текст
+статьи заново и дорог на всей выборке.
+"""
+
+import html
+from typing import List, NamedTuple, Tuple
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.orm import Session
+
+from app.models import Article
+
+CONFIG = "russian"
+
+# Маркеры подсветки: ts_headline вставляет их вокруг совпадений, в HTML они
+# заменяются на <mark> после экранирования текста
+_START, _STOP = "[[mark]]", "[[/mark]]"
+HEADLINE_OPTIONS = f'StartSel="{_START}", StopSel="{_STOP}", MaxWords=35, MinWords=15, MaxFragments=2, FragmentDelimiter=" … "'
+
+
+class SearchHit(NamedTuple):
+    article: Article
+    rank: float
+    snippet: str  # HTML: экранированный текст с <mark>
+
+
+def ts_query(query: str):
+    return func.websearch_to_tsquery(literal_column(f"'{CONFIG}'"), query)
+
+
+def matches(query: str):
+    """Условие для фильтра: статья соответствует запросу"""
+    return Article.search_vector.op("@@")(ts_query(query))
+
+
+def rank(query: str):
+    return func.ts_rank_cd(Article.search_vector, ts_query(query))
+
+
+def _plain_text():
+    return func.regexp_replace(func.coalesce(Article.content, ""), "<[^>]*>", " ", "g")
+
+
+def _snippet_html(headline: str) -> str:
+    text = html.escape(html.unescape(headline or ""))
+    return text.replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+def search_articles(
+    db: Session,
+    query: str,
+    limit: int = 20,
+    offset: int = 0,
+    published_only: bool = True,
+) -> Tuple[List[SearchHit], int]:
+    """Страница результатов поиска и общее число найденных статей"""
+    query = (query or "").strip()
+    if not query:
+        return [], 0
+
+    condition = [matches(query)]
+    if published_only:
+        condition.append(Article.is_published.is_(True))
+
+    total = db.query(func.count(Article.id)).filter(*condition).scalar() or 0
+    if total == 0 or offset >= total:
+        return [], total
+
+    page = (
+        select(Article.id, rank(query).label("rank"))
+        .where(*condition)
+        .order_by(literal_column("rank").desc(), Article.id.desc())
+        .limit(limit)
+        .offset(offset)
+        .subquery()
+    )
+    headline_source = func.concat_ws(" ", Article.excerpt, _plain_text())
+    rows = db.execute(
+        select(
+            Article,
+            page.c.rank,
+            func.ts_headline(literal_column(f"'{CONFIG}'"), headline_source, ts_query(query), HEADLINE_OPTIONS),
+        )
+        .join(page, page.c.id == Article.id)
+        .order_by(page.c.rank.desc(), Article.id.desc())
+    ).all()
+    return [SearchHit(article, float(score), _snippet_html(headline)) for article, score, headline in rows], total
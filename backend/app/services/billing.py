@@ -4,8 +4,11 @@
 
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
+from app.core.auth import invalidate_user
 from app.models import User, INNUsage, GlobalINNLimit, Payment
 
 # Константы тарифов
@@ -15,6 +18,15 @@ SUBSCRIPTION_DOCS_LIMIT = 50  # Документов в месяц по подп
 SUBSCRIPTION_PRICE = 300  # Рублей в месяц
 DOCUMENT_PRICE = 15  # Рублей за документ
 
+# Сообщения по источнику списания / причине отказа
+LIMIT_MESSAGES = {
+    "subscription": "Документ будет создан по подписке",
+    "purchased": "Документ будет создан из купленного пакета",
+    "free": "Документ будет создан бесплатно",
+    "inn_limit_exceeded": "Превышен лимит бесплатных генераций для этого ИНН. Оформите подписку или купите документы.",
+    "no_limit": "Исчерпаны бесплатные генерации. Оформите подписку или купите документы."
+}
+
 
 class BillingService:
     """Сервис проверки лимитов и списания документов"""
@@ -22,6 +34,11 @@ class BillingService:
     def __init__(self, db: Session):
         self.db = db
     
+    def _commit_user(self, user: User):
+        """Фиксация изменений тарифа/лимитов и сброс кэша пользователя"""
+        self.db.commit()
+        invalidate_user(user.id)
+    
     def get_user_limits(self, user: User) -> dict:
         """Получить информацию о лимитах пользователя"""
         
@@ -90,89 +107,118 @@ class BillingService:
         """Проверить возможность генерации и вернуть детальную информацию"""
         can_generate, reason = self._can_generate(user, seller_inn)
         
-        messages = {
-            "subscription": "Документ будет создан по подписке",
-            "purchased": "Документ будет создан из купленного пакета",
-            "free": "Документ будет создан бесплатно",
-            "inn_limit_exceeded": "Превышен лимит бесплатных генераций для этого ИНН. Оформите подписку или купите документы.",
-            "no_limit": "Исчерпаны бесплатные генерации. Оформите подписку или купите документы."
-        }
-        
         return {
             "can_generate": can_generate,
             "reason": reason,
-            "message": messages.get(reason, "Неизвестная ошибка"),
+            "message": LIMIT_MESSAGES.get(reason, "Неизвестная ошибка"),
             "limits": self.get_user_limits(user)
         }
     
-    def consume_generation(self, user: User, seller_inn: str) -> Tuple[bool, str]:
+    def consume_generation(self, user: User, seller_inn: Optional[str]) -> Tuple[bool, str]:
         """
-        Списать генерацию документа.
-        Возвращает (success, source) - источник списания
+        Списать генерацию документа одной транзакцией.
+        Возвращает (success, source) - источник списания или причину отказа
+        ("inn_limit_exceeded", "no_limit").
+        
+        Каждое списание - условный UPDATE ... WHERE <остаток есть> RETURNING:
+        строка пользователя блокируется до конца транзакции, а условие
+        перепроверяется после ожидания блокировки, поэтому параллельные
+        запросы не могут списать больше лимита. Счётчики ИНН обновляются upsert'ом.
         """
         now = datetime.utcnow()
-        
-        # 1. Сначала пробуем подписку
-        if user.subscription_plan == "subscription":
-            if user.subscription_expires and user.subscription_expires > now:
-                if (user.subscription_docs_used or 0) < SUBSCRIPTION_DOCS_LIMIT:
-                    user.subscription_docs_used = (user.subscription_docs_used or 0) + 1
-                    self.db.commit()
-                    return True, "subscription"
-        
-        # 2. Затем купленные документы
-        if (user.purchased_docs_remaining or 0) > 0:
-            user.purchased_docs_remaining -= 1
-            self.db.commit()
-            return True, "purchased"
-        
-        # 3. Бесплатные генерации
-        if (user.free_generations_used or 0) < FREE_GENERATIONS_LIMIT:
-            # Проверяем глобальный лимит ИНН
-            inn_usage = self.get_global_inn_usage(seller_inn)
-            if inn_usage >= FREE_INN_LIMIT:
-                return False, "inn_limit_exceeded"
+        try:
+            # 1. Сначала пробуем подписку
+            docs_used = func.coalesce(User.subscription_docs_used, 0)
+            if self._update_user(
+                user,
+                (User.subscription_plan == "subscription")
+                & (User.subscription_expires > now)
+                & (docs_used < SUBSCRIPTION_DOCS_LIMIT),
+                {User.subscription_docs_used: docs_used + 1},
+            ):
+                self._commit_user(user)
+                return True, "subscription"
+            
+            # 2. Затем купленные документы
+            if self._update_user(
+                user,
+                User.purchased_docs_remaining > 0,
+                {User.purchased_docs_remaining: User.purchased_docs_remaining - 1},
+            ):
+                self._commit_user(user)
+                return True, "purchased"
+            
+            # 3. Бесплатные генерации
+            free_used = func.coalesce(User.free_generations_used, 0)
+            if not self._update_user(
+                user,
+                free_used < FREE_GENERATIONS_LIMIT,
+                {User.free_generations_used: free_used + 1},
+            ):
+                self.db.rollback()
+                return False, "no_limit"
             
-            # Списываем бесплатную генерацию
-            user.free_generations_used = (user.free_generations_used or 0) + 1
-            self._increment_inn_usage(user.id, seller_inn)
-            self.db.commit()
+            # Глобальный лимит ИНН: счётчик растёт, только если лимит не исчерпан
+            if seller_inn:
+                if not self._increment_inn_usage(user.id, seller_inn, now):
+                    self.db.rollback()
+                    return False, "inn_limit_exceeded"
+            
+            self._commit_user(user)
             return True, "free"
-        
-        return False, "no_limit"
+        except Exception:
+            self.db.rollback()
+            raise
+    
+    def _update_user(self, user: User, condition, values: dict) -> bool:
+        """Условный UPDATE строки пользователя. True - строка обновлена."""
+        row = self.db.execute(
+            update(User)
+            .where(User.id == user.id, condition)
+            .values(values)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        return row is not None
     
     def get_global_inn_usage(self, inn: str) -> int:
         """Получить количество бесплатных генераций по ИНН (глобально)"""
         record = self.db.query(GlobalINNLimit).filter(GlobalINNLimit.inn == inn).first()
         return record.free_generations_used if record else 0
     
-    def _increment_inn_usage(self, user_id: int, inn: str):
-        """Увеличить счётчик использования ИНН"""
-        # Глобальный счётчик
-        global_record = self.db.query(GlobalINNLimit).filter(GlobalINNLimit.inn == inn).first()
-        if global_record:
-            global_record.free_generations_used += 1
-            global_record.last_used_at = datetime.utcnow()
-        else:
-            global_record = GlobalINNLimit(inn=inn, free_generations_used=1)
-            self.db.add(global_record)
-        
-        # Связь пользователь-ИНН
-        user_inn = self.db.query(INNUsage).filter(
-            INNUsage.user_id == user_id,
-            INNUsage.inn == inn
-        ).first()
-        
-        if user_inn:
-            user_inn.free_generations_count += 1
-            user_inn.last_used_at = datetime.utcnow()
-        else:
-            user_inn = INNUsage(
-                user_id=user_id,
-                inn=inn,
-                free_generations_count=1
-            )
-            self.db.add(user_inn)
+    def _increment_inn_usage(self, user_id: int, inn: str, now: datetime) -> bool:
+        """
+        Увеличить счётчики использования ИНН (upsert).
+        False - глобальный лимит ИНН исчерпан, счётчики не изменены.
+        """
+        # Глобальный счётчик: вставка или инкремент, если лимит не достигнут
+        stmt = pg_insert(GlobalINNLimit).values(
+            inn=inn, free_generations_used=1, first_used_at=now, last_used_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[GlobalINNLimit.inn],
+            set_={
+                "free_generations_used": GlobalINNLimit.free_generations_used + 1,
+                "last_used_at": now,
+            },
+            where=GlobalINNLimit.free_generations_used < FREE_INN_LIMIT,
+        ).returning(GlobalINNLimit.id)
+        if self.db.execute(stmt).first() is None:
+            return False
+        
+        # Связь пользователь-ИНН (уникальна по user_id + inn)
+        stmt = pg_insert(INNUsage).values(
+            user_id=user_id, inn=inn, free_generations_count=1, first_used_at=now, last_used_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[INNUsage.user_id, INNUsage.inn],
+            set_={
+                "free_generations_count": INNUsage.free_generations_count + 1,
+                "last_used_at": now,
+            },
+        )
+        self.db.execute(stmt)
+        return True
     
     def activate_subscription(self, user: User, months: int = 1):
         """Активировать подписку"""
@@ -186,16 +232,16 @@ class BillingService:
             user.subscription_docs_used = 0  # Сбрасываем счётчик
         
         user.subscription_plan = "subscription"
-        self.db.commit()
+        self._commit_user(user)
     
     def add_purchased_documents(self, user: User, count: int):
         """Добавить купленные документы"""
         user.purchased_docs_remaining = (user.purchased_docs_remaining or 0) + count
         if user.subscription_plan == "free":
             user.subscription_plan = "pay_per_doc"
-        self.db.commit()
+        self._commit_user(user)
     
     def reset_monthly_subscription_usage(self, user: User):
         """Сбросить месячный счётчик подписки (вызывается cron'ом или при обновлении подписки)"""
         user.subscription_docs_used = 0
-        self.db.commit()
+        self._commit_user(user)
@@ -0,0 +1,171 @@
+"""
+Контентно-адресуемое хранилище изображений документов (печати, подписи, логотипы)
+
+Изображения приходят с фронтенда как base64 data URL и раньше встраивались
+в каждый document.html и form_data.json. Теперь они сохраняются один раз
+под ключом SHA-256 и подставляются в документы ссылкой по хэшу.
+"""
+
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Путь к хранилищу (backend/data/blobs/<ab>/<sha256>)
+BLOBS_DIR = Path(__file__).parent.parent.parent / "data" / "blobs"
+BLOBS_DIR.mkdir(parents=True, exist_ok=True)
+
+# Публичный URL, по которому браузер получает изображение (см. api/documents.py)
+BLOB_URL_PREFIX = "/api/v1/documents/blobs/"
+
+# Базовый URL для WeasyPrint: относительные ссылки на blob резолвятся в абсолютные,
+# а blob_url_fetcher отдаёт их с диска без похода в сеть
+BLOB_BASE_URL = "http://documatica.local/"
+
+MAX_BLOB_SIZE = 5 * 1024 * 1024  # 5 MB, как в api/upload.py
+
+_DATA_URL_RE = re.compile(r"^data:(image/[a-zA-Z0-9.+-]+);base64,(.*)$", re.DOTALL)
+# data URL внутри атрибутов src="..." / src='...' в готовом HTML
+_HTML_DATA_URL_RE = re.compile(r"""data:image/[a-zA-Z0-9.+-]+;base64,[A-Za-z0-9+/=\s]+""")
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _blob_path(digest: str) -> Path:
+    """Путь к файлу blob (двухсимвольный префикс, чтобы не раздувать каталог)"""
+    return BLOBS_DIR / digest[:2] / digest
+
+
+def guess_mime_type(data: bytes) -> str:
+    """Определение MIME-типа изображения по сигнатуре"""
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    head = data[:256].lstrip().lower()
+    if head.startswith(b"<svg") or (head.startswith(b"<?xml") and b"<svg" in data[:1024].lower()):
+        return "image/svg+xml"
+    return "application/octet-stream"
+
+
+# Растровые форматы: отдаются браузеру inline. SVG может содержать скрипты -
+# в хранилище не принимается (остаётся встроенным data URL в <img>)
+RASTER_MIME_TYPES = frozenset(("image/png", "image/jpeg", "image/gif", "image/webp"))
+
+
+def put_bytes(data: bytes) -> str:
+    """
+    Сохранение байтов в хранилище.
+
+    Returns:
+        SHA-256 (hex) содержимого. Повторное сохранение того же содержимого не пишет на диск.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    path = _blob_path(digest)
+    if path.exists():
+        return digest
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Атомарная запись: параллельные сохранения одного blob не оставят обрезанный файл
+    tmp_path = path.with_name(f".{digest}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return digest
+
+
+def get_bytes(digest: str) -> Optional[bytes]:
+    """Чтение blob по хэшу. Возвращает None, если blob не найден."""
+    if not _SHA256_RE.match(digest or ""):
+        return None
+    path = _blob_path(digest)
+    if not path.exists():
+        return None
+    return path.read_bytes()
+
+
+def get_path(digest: str) -> Optional[Path]:
+    """Путь к файлу blob (для FileResponse) или None"""
+    if not _SHA256_RE.match(digest or ""):
+        return None
+    path = _blob_path(digest)
+    return path if path.exists() else None
+
+
+def blob_url(digest: str) -> str:
+    """Ссылка на blob для подстановки в шаблоны"""
+    return f"{BLOB_URL_PREFIX}{digest}"
+
+
+def store_data_url(value: Optional[str]) -> Optional[str]:
+    """
+    Заменяет base64 data URL на ссылку по хэшу.
+    Значения, не являющиеся data URL изображения (обычные URL, None), возвращаются как есть.
+    """
+    if not value or not isinstance(value, str) or not value.startswith("data:image/"):
+        return value
+
+    match = _DATA_URL_RE.match(value)
+    if not match:
+        return value
+
+    try:
+        data = base64.b64decode("".join(match.group(2).split()), validate=True)
+    except (binascii.Error, ValueError):
+        return value
+
+    if not data or len(data) > MAX_BLOB_SIZE or guess_mime_type(data) not in RASTER_MIME_TYPES:
+        return value
+
+    return blob_url(put_bytes(data))
+
+
+def externalize_data_urls(obj: Any) -> Any:
+    """
+    Рекурсивно заменяет все data URL изображений в данных формы на ссылки по хэшу.
+    Подходит для form_data любого типа документа (УПД, счёт, акт).
+    """
+    if isinstance(obj, dict):
+        return {key: externalize_data_urls(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [externalize_data_urls(value) for value in obj]
+    if isinstance(obj, str):
+        return store_data_url(obj)
+    return obj
+
+
+def externalize_html(html_content: str) -> str:
+    """Заменяет встроенные в HTML data URL изображений на ссылки по хэшу"""
+    if "data:image/" not in html_content:
+        return html_content
+    return _HTML_DATA_URL_RE.sub(lambda m: store_data_url(m.group(0)), html_content)
+
+
+def blob_url_fetcher(url: str, *args, **kwargs):
+    """
+    url_fetcher для WeasyPrint: ссылки на blob читаются с диска,
+    остальные URL обрабатываются стандартным загрузчиком.
+    """
+    path = urlparse(url).path
+    if path.startswith(BLOB_URL_PREFIX):
+        digest = path[len(BLOB_URL_PREFIX):]
+        data = get_bytes(digest)
+        if data is None:
+            raise ValueError(f"Blob не найден: {digest}")
+        return {
+            "string": data,
+            "mime_type": guess_mime_type(data),
+            "redirected_url": url,
+        }
+
+    from weasyprint import default_url_fetcher
+    return default_url_fetcher(url, *args, **kwargs)
@@ -0,0 +1,628 @@
+"""
+Хранилище сохранённых документов
+
+Документ хранится одним файлом-контейнером <id>.dmdoc вместо папки
+с document.html, form_data.json, metadata.json и document.pdf.
+
+Формат контейнера:
+    MAGIC (8 байт) | длина заголовка (4 байта, big-endian) | заголовок (JSON) | секции
+
+Заголовок - индекс секций: смещение, длина, кодек сжатия, исходный размер и SHA-256.
+Запись атомарная (временный файл + rename). Чтение прозрачно поддерживает
+старый формат (папки), поэтому документы можно конвертировать постепенно
+(scripts/convert_documents_to_container.py).
+
+Раскладка на диске шардирована по префиксу хэша ID: documents/ab/cd/<id>.dmdoc,
+чтобы в одном каталоге не оказывалось сотни тысяч записей. Документы плоской
+раскладки (documents/<id>.dmdoc и documents/<id>/) читаются наравне с новыми
+и переносятся онлайн (scripts/migrate_documents_sharded.py).
+
+HTML хранится в gzip (и дополнительно в brotli, если установлен пакет brotli),
+поэтому превью отдаётся клиенту сжатыми байтами секции без распаковки.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Путь к сохранённым документам
+DOCUMENTS_DIR = Path(__file__).parent.parent.parent / "documents"
+DOCUMENTS_DIR.mkdir(exist_ok=True)
+
+CONTAINER_SUFFIX = ".dmdoc"
+CONTAINER_MAGIC = b"DMDOC\x00\x01\n"
+CONTAINER_VERSION = 1
+
+# Секции контейнера
+SECTION_METADATA = "metadata"
+SECTION_FORM_DATA = "form_data"
+SECTION_HTML = "html"
+SECTION_HTML_BR = "html_br"  # тот же HTML, предсжатый brotli для отдачи браузеру
+SECTION_PDF = "pdf"
+
+ALL_SECTIONS = (SECTION_METADATA, SECTION_FORM_DATA, SECTION_HTML, SECTION_HTML_BR, SECTION_PDF)
+
+# Файлы старого формата (папка документа)
+LEGACY_FILES = {
+    SECTION_METADATA: ("metadata.json", "meta.json"),
+    SECTION_FORM_DATA: ("form_data.json", "data.json"),
+    SECTION_HTML: ("document.html",),
+    SECTION_PDF: ("document.pdf",),
+}
+
+# JSON сжимаем zstd (если установлен), HTML - gzip, PDF уже сжат внутри
+JSON_CODEC = "zstd" if ZSTD_AVAILABLE else "gzip"
+SECTION_CODECS = {
+    SECTION_METADATA: JSON_CODEC,
+    SECTION_FORM_DATA: JSON_CODEC,
+    SECTION_HTML: "gzip",
+    SECTION_HTML_BR: "raw",
+    SECTION_PDF: "raw",
+}
+
+# Content-Encoding, в котором секции можно отдавать клиенту как есть (в порядке предпочтения)
+HTML_ENCODINGS = {"br": SECTION_HTML_BR, "gzip": SECTION_HTML}
+
+_HEADER_LEN = struct.Struct(">I")
+
+
+class DocumentStoreError(Exception):
+    """Повреждённый или несовместимый контейнер документа"""
+    pass
+
+
+# ==================== Пути ====================
+
+_HEX_DIGITS = frozenset("0123456789abcdef")
+
+
+def is_valid_document_id(document_id: str) -> bool:
+    """ID документа - имя файла/папки без разделителей пути"""
+    return bool(document_id) and "/" not in document_id and "\\" not in document_id and not document_id.startswith(".")
+
+
+def _is_shard_name(name: str) -> bool:
+    """Каталог шарда - два hex-символа (ab, cd)"""
+    return len(name) == 2 and set(name) <= _HEX_DIGITS
+
+
+def shard_dir(document_id: str) -> Path:
+    """Каталог шарда документа: documents/<ab>/<cd>, по префиксу SHA-256 от ID"""
+    digest = hashlib.sha256(document_id.encode("utf-8")).hexdigest()
+    return DOCUMENTS_DIR / digest[:2] / digest[2:4]
+
+
+def container_path(document_id: str) -> Path:
+    """Путь к файлу-контейнеру документа (шардированная раскладка)"""
+    return shard_dir(document_id) / f"{document_id}{CONTAINER_SUFFIX}"
+
+
+def flat_container_path(document_id: str) -> Path:
+    """Путь к контейнеру в плоской раскладке (до шардирования)"""
+    return DOCUMENTS_DIR / f"{document_id}{CONTAINER_SUFFIX}"
+
+
+def legacy_folder(document_id: str) -> Path:
+    """Путь к папке документа старого формата"""
+    return DOCUMENTS_DIR / document_id
+
+
+def resolve_document_path(document_id: str) -> Optional[Path]:
+    """
+    Где сейчас лежит документ: шардированный контейнер, плоский контейнер
+    или папка старого формата (в этом порядке). None - документа нет.
+
+    Единая точка разрешения путей: остальной код не должен собирать пути
+    к документам сам.
+    """
+    if not is_valid_document_id(document_id):
+        return None
+    for path in (container_path(document_id), flat_container_path(document_id)):
+        if path.exists():
+            return path
+    folder = legacy_folder(document_id)
+    if folder.is_dir():
+        return folder
+    return None
+
+
+# ==================== Сжатие ====================
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=6).compress(data)
+    return data
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "gzip":
+        return gzip.decompress(data)
+    if codec == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise DocumentStoreError("Секция сжата zstd, но пакет zstandard не установлен")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "raw":
+        return data
+    raise DocumentStoreError(f"Неизвестный кодек секции: {codec}")
+
+
+# ==================== Контейнер ====================
+
+def _read_header(f) -> Dict[str, Any]:
+    """Чтение заголовка контейнера; позиция файла остаётся на начале секций"""
+    magic = f.read(len(CONTAINER_MAGIC))
+    if magic != CONTAINER_MAGIC:
+        raise DocumentStoreError("Неверная сигнатура контейнера")
+    (header_len,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+    header = json.loads(f.read(header_len).decode("utf-8"))
+    if header.get("version") != CONTAINER_VERSION:
+        raise DocumentStoreError(f"Неподдерживаемая версия контейнера: {header.get('version')}")
+    header["_data_offset"] = len(CONTAINER_MAGIC) + _HEADER_LEN.size + header_len
+    return header
+
+
+def read_container_header(path: Path) -> Dict[str, Any]:
+    """Индекс секций контейнера (без чтения самих секций)"""
+    with open(path, "rb") as f:
+        return _read_header(f)
+
+
+def _read_raw_section(f, header: Dict[str, Any], name: str) -> Optional[bytes]:
+    """Сжатые байты секции как есть"""
+    entry = header["sections"].get(name)
+    if entry is None:
+        return None
+    f.seek(header["_data_offset"] + entry["offset"])
+    return f.read(entry["length"])
+
+
+def _read_container_sections(path: Path, names) -> Dict[str, bytes]:
+    """Чтение и распаковка нужных секций контейнера за одно открытие файла"""
+    result = {}
+    with open(path, "rb") as f:
+        header = _read_header(f)
+        for name in names:
+            raw = _read_raw_section(f, header, name)
+            if raw is not None:
+                result[name] = _decompress(raw, header["sections"][name]["codec"])
+    return result
+
+
+def _write_container(path: Path, sections: Dict[str, bytes], overwrite: bool = True) -> None:
+    """
+    Атомарная запись контейнера: временный файл + os.replace.
+    overwrite=False - временный файл ставится через os.link, который не
+    заменяет существующий контейнер (FileExistsError).
+    """
+    index = {}
+    payloads = []
+    offset = 0
+    for name, data in sections.items():
+        codec = SECTION_CODECS.get(name, "gzip")
+        payload = _compress(data, codec)
+        index[name] = {
+            "offset": offset,
+            "length": len(payload),
+            "codec": codec,
+            "size": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+        }
+        payloads.append(payload)
+        offset += len(payload)
+
+    header = json.dumps(
+        {"version": CONTAINER_VERSION, "sections": index},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(CONTAINER_MAGIC)
+        f.write(_HEADER_LEN.pack(len(header)))
+        f.write(header)
+        for payload in payloads:
+            f.write(payload)
+    if overwrite:
+        os.replace(tmp_path, path)
+        return
+    try:
+        os.link(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _read_legacy_sections(folder: Path, names) -> Dict[str, bytes]:
+    """Чтение файлов документа старого формата"""
+    result = {}
+    for name in names:
+        for filename in LEGACY_FILES.get(name, ()):
+            file_path = folder / filename
+            if file_path.exists():
+                result[name] = file_path.read_bytes()
+                break
+    return result
+
+
+def _read_sections(document_id: str, names) -> Optional[Dict[str, bytes]]:
+    """Секции документа из контейнера или папки. None - документа нет."""
+    # Во время онлайн-миграции документ может переехать между resolve и open:
+    # в этом случае разрешаем путь повторно
+    for attempt in range(2):
+        path = resolve_document_path(document_id)
+        if path is None:
+            return None
+        try:
+            if path.is_dir():
+                return _read_legacy_sections(path, names)
+            return _read_container_sections(path, names)
+        except FileNotFoundError:
+            if attempt:
+                raise
+    return None
+
+
+# ==================== Публичный API ====================
+
+def document_exists(document_id: str) -> bool:
+    """Есть ли документ (в любом формате и раскладке)"""
+    return resolve_document_path(document_id) is not None
+
+
+def _load_json(data: Optional[bytes]) -> Optional[Dict[str, Any]]:
+    if data is None:
+        return None
+    return json.loads(data.decode("utf-8"))
+
+
+def read_metadata(document_id: str) -> Optional[Dict[str, Any]]:
+    """Метаданные документа или None"""
+    sections = _read_sections(document_id, [SECTION_METADATA])
+    return _load_json(sections.get(SECTION_METADATA)) if sections else None
+
+
+def read_form_data(document_id: str) -> Optional[Dict[str, Any]]:
+    """Исходные данные формы (form_data.json / data.json) или None"""
+    sections = _read_sections(document_id, [SECTION_FORM_DATA])
+    return _load_json(sections.get(SECTION_FORM_DATA)) if sections else None
+
+
+def read_html(document_id: str) -> Optional[str]:
+    """HTML документа или None"""
+    sections = _read_sections(document_id, [SECTION_HTML])
+    if not sections or SECTION_HTML not in sections:
+        return None
+    return sections[SECTION_HTML].decode("utf-8")
+
+
+def _html_br_section(html: bytes) -> Dict[str, bytes]:
+    """Предсжатая brotli-копия HTML (пусто, если brotli не установлен)"""
+    if not BROTLI_AVAILABLE:
+        return {}
+    return {SECTION_HTML_BR: brotli.compress(html, quality=9)}
+
+
+def read_html_info(document_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Сведения о HTML документа без чтения самого HTML (для контейнеров).
+
+    Returns:
+        {"sha256": str, "encodings": [...]} или None, если документа или HTML нет.
+        encodings - Content-Encoding, в которых HTML лежит предсжатым.
+    """
+    for attempt in range(2):
+        path = resolve_document_path(document_id)
+        if path is None:
+            return None
+        try:
+            if path.is_dir():
+                html = _read_legacy_sections(path, [SECTION_HTML]).get(SECTION_HTML)
+                if html is None:
+                    return None
+                return {"sha256": hashlib.sha256(html).hexdigest(), "encodings": []}
+            sections = read_container_header(path)["sections"]
+        except FileNotFoundError:
+            if attempt:
+                raise
+            continue
+        entry = sections.get(SECTION_HTML)
+        if entry is None:
+            return None
+        encodings = [
+            encoding for encoding, name in HTML_ENCODINGS.items()
+            if name in sections and (name != SECTION_HTML or entry["codec"] == encoding)
+        ]
+        return {"sha256": entry["sha256"], "encodings": encodings}
+    return None
+
+
+def read_html_encoded(document_id: str, encoding: Optional[str] = None) -> Optional[bytes]:
+    """
+    HTML документа в заданном Content-Encoding ("gzip", "br") или несжатый (None).
+    Предсжатая секция отдаётся как есть; если её нет - None.
+    """
+    if encoding is None:
+        sections = _read_sections(document_id, [SECTION_HTML])
+        return sections.get(SECTION_HTML) if sections else None
+
+    name = HTML_ENCODINGS.get(encoding)
+    if name is None:
+        return None
+    path = resolve_document_path(document_id)
+    if path is None or path.is_dir():
+        return None
+    with open(path, "rb") as f:
+        header = _read_header(f)
+        entry = header["sections"].get(name)
+        if entry is None or (name == SECTION_HTML and entry["codec"] != encoding):
+            return None
+        return _read_raw_section(f, header, name)
+
+
+def read_pdf(document_id: str) -> Optional[bytes]:
+    """Сохранённый PDF документа или None"""
+    sections = _read_sections(document_id, [SECTION_PDF])
+    return sections.get(SECTION_PDF) if sections else None
+
+
+def read_document(document_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Метаданные, данные формы и HTML за одно чтение.
+
+    Returns:
+        {"metadata": dict|None, "form_data": dict|None, "html": str|None} или None
+    """
+    sections = _read_sections(document_id, [SECTION_METADATA, SECTION_FORM_DATA, SECTION_HTML])
+    if sections is None:
+        return None
+    html = sections.get(SECTION_HTML)
+    return {
+        "metadata": _load_json(sections.get(SECTION_METADATA)),
+        "form_data": _load_json(sections.get(SECTION_FORM_DATA)),
+        "html": html.decode("utf-8") if html is not None else None,
+    }
+
+
+def save_document(
+    document_id: str,
+    metadata: Optional[Dict[str, Any]] = None,
+    form_data: Optional[Dict[str, Any]] = None,
+    html: Optional[str] = None,
+    pdf: Optional[bytes] = None,
+) -> None:
+    """
+    Сохранение документа в контейнер.
+
+    Не переданные секции берутся из текущей версии документа (контейнера или папки).
+    Новый HTML без нового PDF сбрасывает сохранённый PDF - он бы устарел.
+    Контейнер всегда пишется в шардированную раскладку; копии в плоской
+    раскладке после записи удаляются.
+    """
+    if not is_valid_document_id(document_id):
+        raise ValueError(f"Некорректный ID документа: {document_id}")
+
+    updates = {}
+    if metadata is not None:
+        updates[SECTION_METADATA] = json.dumps(metadata, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    if form_data is not None:
+        updates[SECTION_FORM_DATA] = json.dumps(form_data, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    if html is not None:
+        updates[SECTION_HTML] = html.encode("utf-8")
+        updates.update(_html_br_section(updates[SECTION_HTML]))
+    if pdf is not None:
+        updates[SECTION_PDF] = pdf
+
+    keep = [name for name in ALL_SECTIONS if name not in updates]
+    if html is not None:
+        # brotli-копия и PDF от старого HTML устарели
+        keep = [name for name in keep if name != SECTION_HTML_BR]
+        if pdf is None:
+            keep.remove(SECTION_PDF)
+
+    sections = _read_sections(document_id, keep) or {}
+    sections.update(updates)
+
+    path = container_path(document_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _write_container(path, sections)
+
+    _remove_flat_copies(document_id)
+
+
+def _remove_flat_copies(document_id: str) -> None:
+    """Удаление копий документа в плоской раскладке"""
+    flat_path = flat_container_path(document_id)
+    if flat_path.exists():
+        flat_path.unlink(missing_ok=True)
+    folder = legacy_folder(document_id)
+    if folder.is_dir():
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def delete_document(document_id: str) -> bool:
+    """Удаление документа в любом формате. Возвращает False, если документа не было."""
+    if not is_valid_document_id(document_id):
+        return False
+    deleted = False
+    for path in (container_path(document_id), flat_container_path(document_id)):
+        if path.exists():
+            path.unlink()
+            deleted = True
+    folder = legacy_folder(document_id)
+    if folder.is_dir():
+        shutil.rmtree(folder)
+        deleted = True
+    return deleted
+
+
+def _scan_containers(directory: str) -> Iterator[str]:
+    """ID контейнеров в одном каталоге"""
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.endswith(CONTAINER_SUFFIX) and not entry.name.startswith("."):
+            yield entry.name[:-len(CONTAINER_SUFFIX)]
+
+
+def iter_document_ids() -> Iterator[str]:
+    """
+    ID всех сохранённых документов: шардированные и плоские контейнеры,
+    папки старого формата. Каждый ID возвращается один раз, даже если
+    документ прямо сейчас переносится между раскладками.
+    """
+    if not DOCUMENTS_DIR.exists():
+        return
+    seen = set()
+    for entry in os.scandir(DOCUMENTS_DIR):
+        if entry.name.startswith("."):
+            continue
+        if entry.is_dir() and _is_shard_name(entry.name):
+            for sub in os.scandir(entry.path):
+                if sub.is_dir() and _is_shard_name(sub.name):
+                    for document_id in _scan_containers(sub.path):
+                        if document_id not in seen:
+                            seen.add(document_id)
+                            yield document_id
+            continue
+        if entry.is_file() and entry.name.endswith(CONTAINER_SUFFIX):
+            document_id = entry.name[:-len(CONTAINER_SUFFIX)]
+        elif entry.is_dir() and (Path(entry.path) / "metadata.json").exists():
+            document_id = entry.name
+        else:
+            continue
+        if document_id not in seen:
+            seen.add(document_id)
+            yield document_id
+
+
+def store_size() -> Tuple[int, int]:
+    """(число документов, байт на диске) - для метрик; обходит весь каталог"""
+    documents = sum(1 for _ in iter_document_ids())
+    size = 0
+    for dirpath, _dirnames, filenames in os.walk(DOCUMENTS_DIR):
+        for name in filenames:
+            try:
+                size += os.stat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                continue
+    return documents, size
+
+
+def iter_metadata() -> Iterator[Dict[str, Any]]:
+    """Метаданные всех документов; повреждённые документы пропускаются"""
+    for document_id in iter_document_ids():
+        try:
+            metadata = read_metadata(document_id)
+        except (DocumentStoreError, json.JSONDecodeError, OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Skip broken document {document_id}: {e}")
+            continue
+        if metadata is not None:
+            yield metadata
+
+
+def convert_legacy_folder(document_id: str) -> bool:
+    """
+    Конвертация папки старого формата в контейнер с проверкой содержимого.
+    Возвращает True, если документ сконвертирован.
+    """
+    folder = legacy_folder(document_id)
+    # Каталоги шардов (ab) - тоже "папки" в DOCUMENTS_DIR, но с документами внутри
+    if not is_valid_document_id(document_id) or _is_shard_name(document_id) or not folder.is_dir():
+        return False
+
+    sections = _read_legacy_sections(folder, list(LEGACY_FILES))
+    if SECTION_METADATA not in sections:
+        # Без metadata.json это не папка документа - не трогаем
+        return False
+    # JSON переупаковываем компактно (в папках он записан с indent=2)
+    for name in (SECTION_METADATA, SECTION_FORM_DATA):
+        if name in sections:
+            sections[name] = json.dumps(
+                json.loads(sections[name].decode("utf-8")),
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode("utf-8")
+    if SECTION_HTML in sections:
+        sections.update(_html_br_section(sections[SECTION_HTML]))
+
+    path = container_path(document_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        _write_container(path, sections, overwrite=False)
+    except FileExistsError:
+        # Контейнер уже есть: save_document записал новую версию (все записи
+        # идут туда) или прошлый запуск не довёл rmtree - папка устарела
+        shutil.rmtree(folder)
+        return True
+
+    # Проверяем, что контейнер читается и совпадает с исходными данными
+    written = _read_container_sections(path, list(sections))
+    if written != sections:
+        path.unlink()
+        raise DocumentStoreError(f"Проверка контейнера {document_id} не прошла")
+
+    shutil.rmtree(folder)
+    return True
+
+
+def iter_flat_document_ids() -> Iterator[str]:
+    """ID документов, ещё лежащих в плоской раскладке (контейнеры и папки)"""
+    if not DOCUMENTS_DIR.exists():
+        return
+    for entry in os.scandir(DOCUMENTS_DIR):
+        if entry.name.startswith(".") or _is_shard_name(entry.name):
+            continue
+        if entry.is_file() and entry.name.endswith(CONTAINER_SUFFIX):
+            yield entry.name[:-len(CONTAINER_SUFFIX)]
+        elif entry.is_dir():
+            yield entry.name
+
+
+def migrate_to_sharded(document_id: str) -> bool:
+    """
+    Перенос одного документа из плоской раскладки в шардированную.
+    Плоский контейнер переносится жёсткой ссылкой (атомарно, без перепаковки),
+    папка старого формата конвертируется в контейнер.
+    Возвращает True, если документ перенесён.
+    """
+    if not is_valid_document_id(document_id):
+        return False
+
+    flat_path = flat_container_path(document_id)
+    if flat_path.exists():
+        target = container_path(document_id)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # link не перезаписывает: save_document мог записать шардированный
+            # контейнер между проверкой и переносом
+            os.link(flat_path, target)
+        except FileExistsError:
+            # Шардированная копия новее (все записи идут туда) - плоская устарела
+            pass
+        except FileNotFoundError:
+            # Плоский контейнер уже перенёс параллельный процесс миграции
+            return True
+        flat_path.unlink(missing_ok=True)
+        return True
+
+    return convert_legacy_folder(document_id)
@@ -2,20 +2,15 @@
 Сервис конвертации черновика гостя в готовый документ
 """
 
-import json
 import uuid
-from pathlib import Path
 from datetime import datetime
 from typing import Optional
 
 from sqlalchemy.orm import Session
 
 from app.models import GuestDraft, User
-
-
-# Путь к сохранённым документам
-DOCUMENTS_DIR = Path(__file__).parent.parent.parent / "documents"
-DOCUMENTS_DIR.mkdir(exist_ok=True)
+from app.services.blob_store import externalize_data_urls
+from app.services import document_store
 
 
 def convert_draft_to_document(
@@ -30,16 +25,12 @@ def convert_draft_to_document(
     Документ сохраняется в файловую систему (как и другие документы).
     """
     try:
-        # Парсим данные из черновика
-        document_data = json.loads(draft.document_data)
+        # Данные черновика (JSONB)
+        document_data = draft.document_data or {}
         
         # Генерируем ID документа
         doc_id = str(uuid.uuid4())
         
-        # Создаём папку для документа
-        doc_folder = DOCUMENTS_DIR / doc_id
-        doc_folder.mkdir(exist_ok=True)
-        
         # Определяем тип документа
         doc_type = draft.document_type  # upd, akt, invoice
         
@@ -81,14 +72,7 @@ def convert_draft_to_document(
             except:
                 total_amount = 0
         
-        # Сохраняем исходные данные формы
-        form_data_path = doc_folder / "form_data.json"
-        form_data_path.write_text(
-            json.dumps(document_data, ensure_ascii=False, indent=2, default=str),
-            encoding='utf-8'
-        )
-        
-        # Сохраняем метаданные
+        # Метаданные
         metadata = {
             "id": doc_id,
             "type": doc_type,
@@ -104,10 +88,11 @@ def convert_draft_to_document(
             "draft_token": draft.draft_token[:8] + "..."
         }
         
-        metadata_path = doc_folder / "metadata.json"
-        metadata_path.write_text(
-            json.dumps(metadata, ensure_ascii=False, indent=2),
-            encoding='utf-8'
+        # Сохраняем исходные данные формы и метаданные
+        document_store.save_document(
+            doc_id,
+            metadata=metadata,
+            form_data=externalize_data_urls(document_data),
         )
         
         # Помечаем черновик как сконвертированный
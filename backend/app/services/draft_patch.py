@@ -0,0 +1,213 @@
+"""
+Частичное обновление черновика гостя операциями JSON Patch (RFC 6902)
+
+Автосохранение конструктора меняет одно-два поля документа; вместо
+отправки всего document_data клиент присылает список операций и номер
+версии черновика, который он видел последним.
+
+Операции применяются в PostgreSQL одним UPDATE: для каждой операции
+строится шаг CTE над jsonb (jsonb_set / jsonb_insert / #-), поэтому
+документ не загружается в Python, не сериализуется заново и не передаётся
+по сети. Версия проверяется в том же UPDATE (оптимистическая блокировка):
+при расхождении ни одна операция не применяется.
+
+Шаг, который по RFC 6902 должен завершиться ошибкой (нет пути, test не
+совпал, индекс за пределами массива), превращает документ в NULL - такой
+UPDATE не изменяет строку. PostgreSQL понимает в пути и отрицательные
+индексы ("-1" - последний элемент), и "01"; по RFC 6901 индекс массива -
+только неотрицательное число без ведущих нулей, поэтому такой токен
+допустим лишь как ключ объекта.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+MAX_OPERATIONS = 200
+
+OPERATIONS = {"add", "remove", "replace", "move", "copy", "test"}
+
+
+class PatchError(ValueError):
+    """Некорректный патч (ошибка формата, а не конфликт версий)"""
+
+
+def parse_pointer(pointer: Any) -> List[str]:
+    """JSON Pointer (RFC 6901) -> список токенов пути"""
+    if not isinstance(pointer, str):
+        raise PatchError("Путь должен быть строкой")
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise PatchError(f"Некорректный путь: {pointer}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def is_array_index(token: str) -> bool:
+    """Индекс массива по RFC 6901: 0 или число без ведущих нулей"""
+    return token.isdigit() and token.isascii() and (token == "0" or not token.startswith("0"))
+
+
+class _StatementBuilder:
+    """Цепочка шагов CTE: каждый шаг - (d, c), d - документ, c - перенесённое значение"""
+
+    def __init__(self):
+        self.steps: List[str] = []
+        self.params: Dict[str, Any] = {}
+
+    def param(self, value: Any, cast: str) -> str:
+        name = f"p{len(self.params)}"
+        self.params[name] = value
+        return f"CAST(:{name} AS {cast})"
+
+    def path(self, tokens: List[str]) -> str:
+        return self.param(tokens, "text[]")
+
+    def value(self, value: Any) -> str:
+        return self.param(json.dumps(value, ensure_ascii=False), "jsonb")
+
+    def step(self, document_sql: str, carry_sql: str = "c") -> None:
+        self.steps.append(f"SELECT {document_sql} AS d, {carry_sql} AS c")
+
+    def _set_at(self, parent: List[str], new_parent_sql: str) -> str:
+        """Документ с заменённым значением по пути parent"""
+        if not parent:
+            return new_parent_sql
+        return f"jsonb_set(d, {self.path(parent)}, {new_parent_sql}, false)"
+
+    def valid_path(self, tokens: List[str]) -> str:
+        """Условие: токены, не являющиеся индексом массива, не ведут в массив"""
+        checks = [
+            f"jsonb_typeof(d #> {self.path(tokens[:i])}) IS DISTINCT FROM 'array'"
+            for i, token in enumerate(tokens)
+            if not is_array_index(token)
+        ]
+        return " AND ".join(checks) or "TRUE"
+
+    def exists(self, tokens: List[str]) -> str:
+        return f"{self.valid_path(tokens)} AND (d #> {self.path(tokens)}) IS NOT NULL"
+
+    def add(self, tokens: List[str], value_sql: str) -> None:
+        if not tokens:
+            self.step(f"CASE WHEN d IS NULL THEN NULL ELSE {value_sql} END")
+            return
+        parent, key = tokens[:-1], tokens[-1]
+        parent_sql = f"(d #> {self.path(parent)})"
+        path_sql = self.path(tokens)
+        append_sql = self._set_at(parent, f"{parent_sql} || jsonb_build_array({value_sql})")
+
+        if key == "-":
+            array_sql = append_sql
+        elif is_array_index(key):
+            index = self.param(int(key), "integer")
+            array_sql = (
+                f"CASE WHEN {index} = jsonb_array_length({parent_sql}) THEN {append_sql} "
+                f"WHEN {index} < jsonb_array_length({parent_sql}) THEN jsonb_insert(d, {path_sql}, {value_sql}) "
+                f"ELSE NULL END"
+            )
+        else:
+            array_sql = "NULL"
+
+        self.step(
+            f"CASE WHEN NOT ({self.valid_path(parent)}) THEN NULL "
+            f"ELSE CASE jsonb_typeof({parent_sql}) "
+            f"WHEN 'object' THEN jsonb_set(d, {path_sql}, {value_sql}, true) "
+            f"WHEN 'array' THEN {array_sql} "
+            f"ELSE NULL END END"
+        )
+
+    def remove(self, tokens: List[str]) -> None:
+        if not tokens:
+            raise PatchError("Нельзя удалить корень документа")
+        self.step(f"CASE WHEN {self.exists(tokens)} THEN d #- {self.path(tokens)} ELSE NULL END")
+
+    def replace(self, tokens: List[str], value_sql: str) -> None:
+        if not tokens:
+            self.step(f"CASE WHEN d IS NULL THEN NULL ELSE {value_sql} END")
+            return
+        self.step(
+            f"CASE WHEN {self.exists(tokens)} "
+            f"THEN jsonb_set(d, {self.path(tokens)}, {value_sql}, false) ELSE NULL END"
+        )
+
+    def carry(self, tokens: List[str]) -> None:
+        """Запомнить значение по пути (для move/copy)"""
+        self.step(f"CASE WHEN {self.exists(tokens)} THEN d ELSE NULL END", f"d #> {self.path(tokens)}")
+
+    def test(self, tokens: List[str], value_sql: str) -> None:
+        self.step(
+            f"CASE WHEN {self.valid_path(tokens)} AND (d #> {self.path(tokens)}) = {value_sql} "
+            f"THEN d ELSE NULL END"
+        )
+
+
+def build_patch_sql(operations: List[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+    """
+    SQL для применения операций к черновику.
+    Параметры :draft_id, :version, :now добавляет вызывающий код.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise PatchError("Список операций пуст")
+    if len(operations) > MAX_OPERATIONS:
+        raise PatchError(f"Слишком много операций (максимум {MAX_OPERATIONS})")
+
+    builder = _StatementBuilder()
+    for operation in operations:
+        if not isinstance(operation, dict):
+            raise PatchError("Операция должна быть объектом")
+        op = operation.get("op")
+        if op not in OPERATIONS:
+            raise PatchError(f"Неизвестная операция: {op}")
+        tokens = parse_pointer(operation.get("path"))
+
+        if op in ("add", "replace", "test"):
+            if "value" not in operation:
+                raise PatchError(f"Операция {op} требует value")
+            value_sql = builder.value(operation["value"])
+            getattr(builder, op)(tokens, value_sql)
+        elif op == "remove":
+            builder.remove(tokens)
+        else:
+            source = parse_pointer(operation.get("from"))
+            if op == "move":
+                if tokens[:len(source)] == source and tokens != source:
+                    raise PatchError("Нельзя переместить значение внутрь самого себя")
+                if tokens == source:
+                    continue
+            builder.carry(source)
+            if op == "move":
+                builder.remove(source)
+            builder.add(tokens, "c")
+
+    ctes = ["s0 AS (SELECT document_data AS d, NULL::jsonb AS c FROM guest_drafts "
+            "WHERE id = :draft_id AND version = :version FOR UPDATE)"]
+    for i, step in enumerate(builder.steps, start=1):
+        ctes.append(f"s{i} AS ({step} FROM s{i - 1})")
+    last = f"s{len(builder.steps)}"
+
+    sql = (
+        f"WITH {', '.join(ctes)} "
+        f"UPDATE guest_drafts SET document_data = {last}.d, version = guest_drafts.version + 1, updated_at = :now "
+        f"FROM {last} "
+        f"WHERE guest_drafts.id = :draft_id AND guest_drafts.version = :version AND {last}.d IS NOT NULL "
+        f"RETURNING guest_drafts.version"
+    )
+    return sql, builder.params
+
+
+def apply_patch(db: Session, draft_id: int, version: int, operations: List[Dict[str, Any]]) -> Optional[int]:
+    """
+    Применить операции к черновику, если его версия равна version.
+    Возвращает новую версию или None (версия изменилась или патч неприменим).
+    """
+    sql, params = build_patch_sql(operations)
+    params.update(draft_id=draft_id, version=version, now=datetime.utcnow())
+    row = db.execute(text(sql), params).first()
+    if row is None:
+        db.rollback()
+        return None
+    db.commit()
+    return row[0]
@@ -0,0 +1,106 @@
+"""
+Удаление просроченных черновиков гостей
+
+Черновик гостя (guest_drafts) живёт 7 дней; непривязанные к пользователю
+черновики после expires_at никому не нужны. Воркер в отдельном потоке
+раз в DRAFT_REAPER_INTERVAL удаляет их пачками по DRAFT_REAPER_BATCH_SIZE
+строк: каждая пачка - отдельная короткая транзакция, поэтому удаление
+не держит долгих блокировок. Выборку обслуживает частичный индекс
+ix_guest_drafts_expires_at_unclaimed.
+
+Воркер запускается в каждом процессе приложения; строки берутся через
+FOR UPDATE SKIP LOCKED, поэтому процессы не ждут друг друга.
+"""
+
+import logging
+import threading
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models import GuestDraft
+
+logger = logging.getLogger(__name__)
+
+
+def delete_expired_batch(db, batch_size: int, now: Optional[datetime] = None) -> int:
+    """Удалить одну пачку просроченных непривязанных черновиков. Возвращает число удалённых."""
+    now = now or datetime.utcnow()
+    expired_ids = (
+        select(GuestDraft.id)
+        .where(GuestDraft.is_claimed == False, GuestDraft.expires_at < now)  # noqa: E712
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        delete(GuestDraft)
+        .where(GuestDraft.id.in_(expired_ids))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount or 0
+
+
+def reap_expired_drafts(batch_size: int, stop: Optional[threading.Event] = None) -> int:
+    """Удалить все просроченные черновики пачками. Возвращает общее число удалённых."""
+    total = 0
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        while stop is None or not stop.is_set():
+            deleted = delete_expired_batch(db, batch_size, now)
+            total += deleted
+            if deleted < batch_size:
+                break
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return total
+
+
+class DraftReaper:
+    """Фоновый поток удаления просроченных черновиков"""
+
+    def __init__(self, batch_size: int, interval: float):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="draft-reaper", daemon=True)
+        self._thread.start()
+        logger.info("Draft reaper started")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Остановка: текущая пачка дописывается, новые не берутся"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                deleted = reap_expired_drafts(self.batch_size, self._stop)
+                if deleted:
+                    logger.info(f"Draft reaper: deleted {deleted} expired drafts")
+            except Exception as e:
+                logger.error(f"Draft reaper error: {e}")
+            self._stop.wait(self.interval)
+
+
+draft_reaper = DraftReaper(
+    batch_size=settings.DRAFT_REAPER_BATCH_SIZE,
+    interval=settings.DRAFT_REAPER_INTERVAL,
+)
@@ -4,6 +4,7 @@
 
 import os
 import smtplib
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.header import Header
@@ -21,42 +22,89 @@ SMTP_FROM_NAME = os.getenv("SMTP_FROM_NAME", "Documatica")
 BASE_URL = os.getenv("BASE_URL", "https://oplatanalogov.ru")
 
 
-def send_email(to_email: str, subject: str, html_content: str) -> bool:
-    """Отправка email"""
-    if not SMTP_HOST:
-        print(f"[EMAIL] SMTP не настроен. Письмо для {to_email}: {subject}")
-        print(f"[EMAIL] Содержимое: {html_content[:200]}...")
-        return True  # Возвращаем True чтобы не блокировать регистрацию
+def _build_message(to_email: str, subject: str, html_content: str) -> str:
+    """Сборка MIME-письма"""
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = Header(subject, "utf-8")
+    msg["From"] = formataddr((str(Header(SMTP_FROM_NAME, "utf-8")), SMTP_FROM))
+    msg["To"] = to_email
     
-    try:
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = Header(subject, "utf-8")
-        msg["From"] = formataddr((str(Header(SMTP_FROM_NAME, "utf-8")), SMTP_FROM))
-        msg["To"] = to_email
-        
-        html_part = MIMEText(html_content, "html", "utf-8")
-        msg.attach(html_part)
-        
+    html_part = MIMEText(html_content, "html", "utf-8")
+    msg.attach(html_part)
+    return msg.as_string()
+
+
+class SMTPConnection:
+    """
+    Переиспользуемое соединение с SMTP-сервером.
+    Открывается при первой отправке и живёт, пока не простаивает дольше idle_timeout:
+    воркер очереди отправляет пачку писем через одно соединение.
+    """
+    
+    def __init__(self, timeout: int = 30, idle_timeout: float = 60.0):
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self._server = None
+        self._last_used = 0.0
+    
+    def _connect(self):
         print(f"[EMAIL] Подключаемся к SMTP: {SMTP_HOST}:{SMTP_PORT}")
-        
         # Порт 465 = SSL, порт 587 = STARTTLS
         if SMTP_PORT == 465:
             # SSL соединение (Mail.ru, Gmail и др.)
-            with smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, timeout=30) as server:
-                if SMTP_USER and SMTP_PASSWORD:
-                    server.login(SMTP_USER, SMTP_PASSWORD)
-                server.sendmail(SMTP_FROM, to_email, msg.as_string())
+            server = smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, timeout=self.timeout)
+            if SMTP_USER and SMTP_PASSWORD:
+                server.login(SMTP_USER, SMTP_PASSWORD)
         else:
             # STARTTLS соединение (Yandex и др.)
-            with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30) as server:
-                if SMTP_USER and SMTP_PASSWORD:
-                    try:
-                        server.starttls()
-                    except smtplib.SMTPNotSupportedError:
-                        print("[EMAIL] TLS не поддерживается, продолжаем без шифрования")
-                    server.login(SMTP_USER, SMTP_PASSWORD)
-                server.sendmail(SMTP_FROM, to_email, msg.as_string())
-        
+            server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=self.timeout)
+            if SMTP_USER and SMTP_PASSWORD:
+                try:
+                    server.starttls()
+                except smtplib.SMTPNotSupportedError:
+                    print("[EMAIL] TLS не поддерживается, продолжаем без шифрования")
+                server.login(SMTP_USER, SMTP_PASSWORD)
+        return server
+    
+    def send(self, to_email: str, subject: str, html_content: str) -> None:
+        """Отправка письма; при ошибке выбрасывает исключение smtplib/OSError"""
+        message = _build_message(to_email, subject, html_content)
+        self.close_if_idle()
+        if self._server is None:
+            self._server = self._connect()
+        try:
+            self._server.sendmail(SMTP_FROM, to_email, message)
+        except smtplib.SMTPServerDisconnected:
+            # Сервер закрыл простаивающее соединение - переподключаемся один раз
+            self._server = self._connect()
+            self._server.sendmail(SMTP_FROM, to_email, message)
+        self._last_used = time.monotonic()
+    
+    def close_if_idle(self) -> None:
+        """Закрытие соединения, простаивающего дольше idle_timeout"""
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self.close()
+    
+    def close(self) -> None:
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._server = None
+
+
+def send_email(to_email: str, subject: str, html_content: str) -> bool:
+    """Синхронная отправка email (новое соединение на каждое письмо)"""
+    if not SMTP_HOST:
+        print(f"[EMAIL] SMTP не настроен. Письмо для {to_email}: {subject}")
+        print(f"[EMAIL] Содержимое: {html_content[:200]}...")
+        return True  # Возвращаем True чтобы не блокировать регистрацию
+    
+    connection = SMTPConnection()
+    try:
+        connection.send(to_email, subject, html_content)
         print(f"[EMAIL] Письмо отправлено: {to_email}")
         return True
     except Exception as e:
@@ -64,10 +112,28 @@ def send_email(to_email: str, subject: str, html_content: str) -> bool:
         import traceback
         traceback.print_exc()
         return False
+    finally:
+        connection.close()
+
+
+def enqueue_email(to_email: str, subject: str, html_content: str) -> bool:
+    """
+    Постановка письма в очередь (таблица email_outbox).
+    Отправляет фоновый воркер (app/services/email_outbox.py), обработчик запроса
+    не ждёт SMTP-сервер.
+    """
+    from app.services.email_outbox import enqueue
+    
+    try:
+        enqueue(to_email, subject, html_content)
+        return True
+    except Exception as e:
+        print(f"[EMAIL] Ошибка постановки письма в очередь: {e}")
+        return False
 
 
 def send_verification_email(to_email: str, token: str, name: Optional[str] = None) -> bool:
-    """Отправка письма для подтверждения email"""
+    """Отправка письма для подтверждения email (через очередь)"""
     verify_url = f"{BASE_URL}/verify-email?token={token}"
     user_name = name if name else "пользователь"
     
@@ -175,11 +241,11 @@ def send_verification_email(to_email: str, token: str, name: Optional[str] = Non
     </html>
     """
     
-    return send_email(to_email, "Подтвердите ваш email - Documatica", html)
+    return enqueue_email(to_email, "Подтвердите ваш email - Documatica", html)
 
 
 def send_password_reset_email(to_email: str, token: str) -> bool:
-    """Отправка письма для сброса пароля"""
+    """Отправка письма для сброса пароля (через очередь)"""
     reset_url = f"{BASE_URL}/reset-password?token={token}"
     
     html = f"""
@@ -296,11 +362,11 @@ def send_password_reset_email(to_email: str, token: str) -> bool:
     </html>
     """
     
-    return send_email(to_email, "Сброс пароля - Documatica", html)
+    return enqueue_email(to_email, "Сброс пароля - Documatica", html)
 
 
 def send_welcome_email(to_email: str, name: Optional[str] = None) -> bool:
-    """Отправка приветственного письма после регистрации"""
+    """Отправка приветственного письма после регистрации (через очередь)"""
     user_name = name if name else "пользователь"
     dashboard_url = f"{BASE_URL}/dashboard/"
     
@@ -427,4 +493,4 @@ def send_welcome_email(to_email: str, name: Optional[str] = None) -> bool:
     </html>
     """
     
-    return send_email(to_email, "Добро пожаловать в Documatica!", html)
+    return enqueue_email(to_email, "Добро пожаловать в Documatica!", html)
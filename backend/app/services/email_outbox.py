@@ -0,0 +1,207 @@
+"""
+Очередь исходящих писем и фоновый воркер доставки
+
+Обработчики запросов только добавляют письмо в таблицу email_outbox
+(app/services/email.py: enqueue_email). Воркер в отдельном потоке забирает
+пачки писем, отправляет их через одно переиспользуемое SMTP-соединение
+и при ошибке откладывает повтор с экспоненциальной задержкой.
+
+Воркер запускается в каждом процессе приложения; пачки забираются через
+SELECT ... FOR UPDATE SKIP LOCKED, поэтому одно письмо не уйдёт дважды.
+Письмо, взятое упавшим процессом, возвращается в очередь по истечении аренды.
+"""
+
+import logging
+import smtplib
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_SENDING = "sending"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+
+MAX_ATTEMPTS = 8
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+LEASE = timedelta(minutes=5)  # сколько письмо числится за воркером
+
+# Будит воркер сразу после постановки письма (в пределах процесса)
+_wakeup = threading.Event()
+
+
+def enqueue(to_email: str, subject: str, html_content: str) -> int:
+    """Добавление письма в очередь. Возвращает ID записи."""
+    db = SessionLocal()
+    try:
+        item = EmailOutbox(to_email=to_email, subject=subject, html_content=html_content)
+        db.add(item)
+        db.commit()
+        item_id = item.id
+    finally:
+        db.close()
+    _wakeup.set()
+    return item_id
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS))
+
+
+def claim_batch(db, limit: int) -> List[Dict[str, Any]]:
+    """
+    Забирает до limit писем, готовых к отправке, и помечает их sending.
+    Письма в статусе sending с истёкшей арендой забираются повторно.
+    """
+    now = datetime.utcnow()
+    rows = (
+        db.query(EmailOutbox)
+        .filter(
+            EmailOutbox.status.in_((STATUS_PENDING, STATUS_SENDING)),
+            EmailOutbox.next_attempt_at <= now,
+        )
+        .order_by(EmailOutbox.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    batch = []
+    for row in rows:
+        row.status = STATUS_SENDING
+        row.attempts = (row.attempts or 0) + 1
+        row.next_attempt_at = now + LEASE
+        batch.append({
+            "id": row.id,
+            "to_email": row.to_email,
+            "subject": row.subject,
+            "html_content": row.html_content,
+            "attempts": row.attempts,
+        })
+    db.commit()
+    return batch
+
+
+def process_batch(connection, limit: int) -> int:
+    """
+    Отправка одной пачки писем через connection (SMTPConnection).
+    Возвращает число взятых из очереди писем.
+    """
+    from app.services.email import SMTP_HOST
+
+    db = SessionLocal()
+    try:
+        batch = claim_batch(db, limit)
+        if not batch:
+            return 0
+
+        sent_ids = []
+        for item in batch:
+            error: Optional[str] = None
+            permanent = False
+            try:
+                if SMTP_HOST:
+                    connection.send(item["to_email"], item["subject"], item["html_content"])
+                else:
+                    logger.info(f"SMTP не настроен. Письмо для {item['to_email']}: {item['subject']}")
+            except smtplib.SMTPRecipientsRefused as e:
+                # Адрес отклонён сервером - повтор не поможет
+                error, permanent = str(e), True
+            except (smtplib.SMTPException, OSError) as e:
+                error = str(e)
+                connection.close()
+
+            if error is None:
+                sent_ids.append(item["id"])
+                continue
+
+            failed = permanent or item["attempts"] >= MAX_ATTEMPTS
+            logger.warning(
+                f"Email {item['id']} to {item['to_email']}: attempt {item['attempts']} failed: {error}"
+                + (" (giving up)" if failed else "")
+            )
+            db.query(EmailOutbox).filter(EmailOutbox.id == item["id"]).update({
+                EmailOutbox.status: STATUS_FAILED if failed else STATUS_PENDING,
+                EmailOutbox.next_attempt_at: datetime.utcnow() + _backoff(item["attempts"]),
+                EmailOutbox.last_error: error[:2000],
+            }, synchronize_session=False)
+
+        if sent_ids:
+            db.query(EmailOutbox).filter(EmailOutbox.id.in_(sent_ids)).update({
+                EmailOutbox.status: STATUS_SENT,
+                EmailOutbox.sent_at: datetime.utcnow(),
+                EmailOutbox.last_error: None,
+            }, synchronize_session=False)
+        db.commit()
+        return len(batch)
+    finally:
+        db.close()
+
+
+def queue_depth() -> int:
+    """Число писем, ожидающих отправки"""
+    db = SessionLocal()
+    try:
+        return db.query(EmailOutbox).filter(
+            EmailOutbox.status.in_((STATUS_PENDING, STATUS_SENDING))
+        ).count()
+    finally:
+        db.close()
+
+
+class EmailOutboxWorker:
+    """Фоновый поток доставки писем из очереди"""
+
+    def __init__(self, batch_size: int, poll_interval: float):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+        self._thread.start()
+        logger.info("Email outbox worker started")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Остановка: текущая пачка дописывается, новые не берутся"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        _wakeup.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        from app.services.email import SMTPConnection
+
+        connection = SMTPConnection()
+        try:
+            while not self._stop.is_set():
+                _wakeup.clear()
+                try:
+                    taken = process_batch(connection, self.batch_size)
+                except Exception as e:
+                    logger.error(f"Email outbox worker error: {e}")
+                    taken = 0
+                if taken >= self.batch_size:
+                    continue  # в очереди есть ещё письма
+                connection.close_if_idle()
+                _wakeup.wait(self.poll_interval)
+        finally:
+            connection.close()
+
+
+email_outbox_worker = EmailOutboxWorker(
+    batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+    poll_interval=settings.EMAIL_OUTBOX_POLL_INTERVAL,
+)
@@ -7,7 +7,6 @@
 """
 
 import io
-import json
 import logging
 import html
 from pathlib import Path
@@ -22,12 +21,14 @@ from openpyxl.styles import Font, Border, Side, Alignment, PatternFill
 from openpyxl.utils import get_column_letter
 from jinja2 import Environment, FileSystemLoader
 
+from app.core.metrics import track_render
+from app.services import document_store
+
 # Настройка логирования
 logger = logging.getLogger(__name__)
 
 # Пути к файлам
 TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
-DOCUMENTS_DIR = Path(__file__).parent.parent.parent / "documents"
 
 # Настройка Jinja2 для генерации HTML
 jinja_env = Environment(
@@ -43,9 +44,10 @@ class ExcelExportService:
     
     def __init__(self):
         """Инициализация сервиса"""
-        self.documents_dir = DOCUMENTS_DIR
+        self.documents_dir = document_store.DOCUMENTS_DIR
         self.templates_dir = TEMPLATES_DIR
     
+    @track_render("xls")
     def export_to_xls(self, document_id: str, user_id: int) -> StreamingResponse:
         """
         Экспорт документа в XLS через XML-шаблон (Excel 2003 SpreadsheetML)
@@ -113,6 +115,7 @@ class ExcelExportService:
                 detail=f"Ошибка экспорта в XLS: {str(e)}"
             )
     
+    @track_render("xlsx")
     def export_to_xlsx(self, document_id: str, user_id: int) -> StreamingResponse:
         """
         Экспорт документа в XLSX через openpyxl
@@ -197,19 +200,18 @@ class ExcelExportService:
         Raises:
             HTTPException: 403, 404
         """
-        doc_folder = self.documents_dir / document_id
+        # Метаданные, данные формы и HTML - одним чтением (контейнер или папка)
+        document = document_store.read_document(document_id)
         
         # Проверка существования документа
-        if not doc_folder.exists():
+        if document is None:
             raise HTTPException(status_code=404, detail="Документ не найден")
         
         # Загрузка метаданных
-        metadata_path = doc_folder / "metadata.json"
-        if not metadata_path.exists():
+        metadata = document["metadata"]
+        if metadata is None:
             raise HTTPException(status_code=404, detail="Метаданные документа не найдены")
         
-        metadata = json.loads(metadata_path.read_text(encoding='utf-8'))
-        
         # Проверка владельца
         if metadata.get('user_id') != user_id:
             logger.warning(
@@ -218,22 +220,11 @@ class ExcelExportService:
             )
             raise HTTPException(status_code=403, detail="Доступ запрещен")
         
-        # Загрузка form_data
-        form_data_path = doc_folder / "form_data.json"
-        if not form_data_path.exists():
-            # Для старых документов может не быть form_data, пробуем data.json
-            form_data_path = doc_folder / "data.json"
-        
-        if form_data_path.exists():
-            form_data = json.loads(form_data_path.read_text(encoding='utf-8'))
-        else:
-            form_data = {}
-        
-        # Загрузка HTML (опционально)
-        html_path = doc_folder / "document.html"
-        html_content = None
-        if html_path.exists():
-            html_content = html_path.read_text(encoding='utf-8')
+        # form_data (для старых документов - data.json, см. document_store)
+        form_data = document["form_data"] or {}
+        
+        # HTML (опционально)
+        html_content = document["html"]
         
         return metadata, form_data, html_content
     
@@ -0,0 +1,184 @@
+"""
+Граф внутренних ссылок сайта (internal_links)
+
+Ссылки извлекаются при сохранении: статьи - из Article.content, страницы
+CMS - из текста всех её блоков (content["text"]). Для каждого источника
+хранится набор целевых путей без крайних "/" ("news/slug", "upd/ooo";
+"" - главная).
+
+Отчёты SEO-инструментов - битые ссылки, страницы-сироты, число входящих
+ссылок - считаются одним SQL-запросом каждый, без чтения текстов статей
+и деревьев блоков.
+
+Если граф пуст или расходится с контентом (например, после правок в БД
+напрямую), он перестраивается rebuild() или scripts/rebuild_link_graph.py.
+"""
+
+import re
+from typing import Dict, Iterable, List
+
+from sqlalchemy import and_, exists, func, insert, literal, or_, select
+from sqlalchemy.orm import Session
+
+from app.models import Article, ContentBlock, InternalLink, Page, PageSection
+
+SITE_URL = "https://oplatanalogov.ru"
+
+# Разделы сайта, которые существуют без записей Article/Page
+STATIC_PATHS = ("upd", "schet", "akt", "news", "about", "contact", "privacy", "agreement")
+
+SOURCE_ARTICLE = "article"
+SOURCE_PAGE = "page"
+
+_HREF_RE = re.compile(r'href\s*=\s*["\']([^"\']+)["\']', re.I)
+
+
+def extract_internal_links(content: str) -> List[str]:
+    """Внутренние ссылки из HTML: пути с ведущим "/" без query и fragment"""
+    if not content:
+        return []
+    result = []
+    for m in _HREF_RE.findall(content):
+        m = m.split("?")[0].split("#")[0]
+        if m.startswith("/") and not m.startswith("//") and not m.startswith("/static"):
+            result.append(m.rstrip("/") or "/")
+        elif m.startswith(SITE_URL + "/"):
+            result.append(m[len(SITE_URL):].rstrip("/") or "/")
+    return result
+
+
+def _target_paths(contents: Iterable[str]) -> set:
+    paths = set()
+    for content in contents:
+        for link in extract_internal_links(content):
+            paths.add(link.strip("/")[:500])
+    return paths
+
+
+def _replace_links(db: Session, source_type: str, source_id: int, paths: set) -> None:
+    db.query(InternalLink).filter(
+        InternalLink.source_type == source_type,
+        InternalLink.source_id == source_id,
+    ).delete(synchronize_session=False)
+    if paths:
+        db.execute(insert(InternalLink), [
+            {"source_type": source_type, "source_id": source_id, "target_path": path}
+            for path in sorted(paths)
+        ])
+
+
+def _block_text(content) -> str:
+    if isinstance(content, dict):
+        return content.get("text", "") or ""
+    return str(content or "")
+
+
+def index_article(db: Session, article: Article) -> None:
+    """Обновить ссылки статьи (вызывается до commit; у новой статьи нужен flush)"""
+    _replace_links(db, SOURCE_ARTICLE, article.id, _target_paths([article.content or ""]))
+
+
+def index_page(db: Session, page_id: int) -> None:
+    """Обновить ссылки страницы по текущим блокам (вызывается до commit)"""
+    db.flush()
+    contents = db.execute(
+        select(ContentBlock.content)
+        .join(PageSection, PageSection.id == ContentBlock.section_id)
+        .where(PageSection.page_id == page_id)
+    ).scalars()
+    _replace_links(db, SOURCE_PAGE, page_id, _target_paths(_block_text(c) for c in contents))
+
+
+def remove_source(db: Session, source_type: str, source_id: int) -> None:
+    """Удалить ссылки удалённой статьи/страницы"""
+    _replace_links(db, source_type, source_id, set())
+
+
+def rebuild(db: Session) -> Dict[str, int]:
+    """Перестроить граф целиком. Возвращает число проиндексированных статей/страниц и ссылок."""
+    db.query(InternalLink).delete(synchronize_session=False)
+    articles = 0
+    for article_id, content in db.execute(
+        select(Article.id, Article.content).where(Article.content.isnot(None))
+        .execution_options(yield_per=500)
+    ):
+        _replace_links(db, SOURCE_ARTICLE, article_id, _target_paths([content]))
+        articles += 1
+
+    page_contents: Dict[int, list] = {}
+    for page_id, content in db.execute(
+        select(PageSection.page_id, ContentBlock.content)
+        .join(ContentBlock, ContentBlock.section_id == PageSection.id)
+    ):
+        page_contents.setdefault(page_id, []).append(_block_text(content))
+    for page_id, contents in page_contents.items():
+        _replace_links(db, SOURCE_PAGE, page_id, _target_paths(contents))
+
+    db.commit()
+    links = db.query(func.count(InternalLink.id)).scalar() or 0
+    return {"articles": articles, "pages": len(page_contents), "links": links}
+
+
+def _counted_source():
+    """Источники, которые учитываются: любые статьи и опубликованные страницы"""
+    return or_(
+        InternalLink.source_type == SOURCE_ARTICLE,
+        and_(
+            InternalLink.source_type == SOURCE_PAGE,
+            exists().where(Page.id == InternalLink.source_id, Page.status == "published"),
+        ),
+    )
+
+
+def broken_links(db: Session) -> List[dict]:
+    """Ссылки из статей на несуществующие пути"""
+    target = InternalLink.target_path
+    is_news = target.like("news/%")
+    article_exists = exists().where(is_news, Article.slug == func.substr(target, 6))
+    page_exists = exists().where(Page.slug == target, Page.status == "published")
+    rows = db.execute(
+        select(Article.id, Article.title, Article.slug, target)
+        .join(Article, Article.id == InternalLink.source_id)
+        .where(
+            InternalLink.source_type == SOURCE_ARTICLE,
+            target != "",
+            target.notin_(STATIC_PATHS),
+            ~article_exists,
+            or_(is_news, ~page_exists),
+        )
+        .order_by(Article.id, target)
+    )
+    return [
+        {"article_id": article_id, "article_title": title, "article_slug": slug, "broken_url": "/" + path}
+        for article_id, title, slug, path in rows
+    ]
+
+
+def orphan_articles(db: Session) -> List[Article]:
+    """Опубликованные статьи без входящих ссылок"""
+    inbound = exists().where(
+        InternalLink.target_path.in_([literal("news/") + Article.slug, Article.slug]),
+        _counted_source(),
+    )
+    return db.query(Article).filter(Article.is_published.is_(True), ~inbound).order_by(Article.id).all()
+
+
+def orphan_pages(db: Session) -> List[Page]:
+    """Опубликованные страницы CMS (кроме главной) без входящих ссылок"""
+    inbound = exists().where(InternalLink.target_path == Page.slug, _counted_source())
+    return (
+        db.query(Page)
+        .filter(Page.status == "published", Page.slug.notin_(["home", ""]), ~inbound)
+        .order_by(Page.id)
+        .all()
+    )
+
+
+def inbound_counts(db: Session) -> Dict[str, int]:
+    """Число источников, ссылающихся на каждый путь"""
+    rows = db.execute(
+        select(InternalLink.target_path, func.count(InternalLink.id))
+        .where(_counted_source())
+        .group_by(InternalLink.target_path)
+    )
+    return {path: count for path, count in rows}
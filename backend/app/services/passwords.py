@@ -0,0 +1,71 @@
+"""
+Хеширование паролей
+
+bcrypt занимает 100-300 мс CPU на вызов, поэтому хеширование и проверка
+выполняются в отдельном пуле потоков (bcrypt отпускает GIL), а не в event loop.
+Семафор ограничивает число одновременно ожидающих хешей: при всплеске
+подбора паролей лишние запросы получают 503, а не выстраиваются в очередь
+на минуты вперёд.
+
+Стоимость bcrypt задаётся PASSWORD_BCRYPT_ROUNDS. Если она изменилась,
+хеш пользователя пересчитывается при следующем успешном входе.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+BCRYPT_ROUNDS = settings.PASSWORD_BCRYPT_ROUNDS
+
+# min/max = текущей стоимости: хеш с любой другой стоимостью считается устаревшим
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+# Хеши в работе и в очереди пула; больше - отказ
+_semaphore = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_PENDING)
+
+
+async def _run(func, *args):
+    try:
+        await asyncio.wait_for(_semaphore.acquire(), timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=503,
+            detail="Сервер перегружен, попробуйте через несколько секунд",
+            headers={"Retry-After": "5"},
+        )
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+    finally:
+        _semaphore.release()
+
+
+async def hash_password(password: str) -> str:
+    """Хеш нового пароля"""
+    return await _run(pwd_context.hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Проверка пароля.
+
+    Returns:
+        (верен ли пароль, новый хеш или None). Новый хеш возвращается,
+        если пароль верен, а сохранённый хеш сделан с другой стоимостью -
+        его нужно записать пользователю.
+    """
+    return await _run(pwd_context.verify_and_update, plain_password, hashed_password)
@@ -0,0 +1,143 @@
+"""
+Кэш предпросмотра документов
+
+Конструкторы УПД, счёта и акта запрашивают предпросмотр при каждом изменении
+формы, и каждый запрос заново рендерит полный шаблон. Готовый HTML кэшируется
+по хэшу канонизированного запроса: короткий TTL, ограничение по числу записей
+и по памяти (LRU). Одинаковые параллельные запросы рендерятся один раз
+(single-flight), остальные ждут результат первого.
+
+Кэш живёт в памяти процесса: у каждого воркера свой.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PreviewEntry:
+    """Отрендеренный предпросмотр"""
+
+    __slots__ = ("body", "etag", "expires_at")
+
+    def __init__(self, body: bytes, expires_at: float):
+        self.body = body
+        # ETag по содержимому, а не по запросу: после смены шаблона
+        # старый ETag браузера не совпадёт
+        self.etag = hashlib.sha256(body).hexdigest()
+        self.expires_at = expires_at
+
+
+class PreviewCache:
+    """LRU-кэш с TTL, ограничением памяти и склейкой одинаковых запросов"""
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, PreviewEntry]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(kind: str, payload: Any) -> str:
+        """Ключ кэша: SHA-256 от типа документа и канонического JSON запроса"""
+        canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+        return hashlib.sha256(f"{kind}\n{canonical}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[PreviewEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, body: bytes) -> PreviewEntry:
+        entry = PreviewEntry(body, time.monotonic() + self.ttl)
+        if key in self._entries:
+            self._remove(key)
+        # Слишком большой предпросмотр не кэшируем, чтобы не вытеснить всё остальное
+        if len(body) > self.max_bytes:
+            return entry
+        self._entries[key] = entry
+        self._bytes += len(body)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+        return entry
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.body)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    async def get_or_render(self, key: str, render: Callable[[], str]) -> PreviewEntry:
+        """
+        Предпросмотр из кэша или рендер в пуле потоков.
+        Пока идёт рендер, одинаковые запросы ждут его результат.
+        """
+        entry = self.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # shield: отмена ожидающего запроса не должна отменять общий рендер
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            html = await run_in_threadpool(render)
+            entry = self.put(key, html.encode("utf-8"))
+            future.set_result(entry)
+            return entry
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Помечаем исключение полученным, если ожидающих не было
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+
+preview_cache = PreviewCache(
+    ttl=settings.PREVIEW_CACHE_TTL,
+    max_entries=settings.PREVIEW_CACHE_MAX_ENTRIES,
+    max_bytes=settings.PREVIEW_CACHE_MAX_MB * 1024 * 1024,
+)
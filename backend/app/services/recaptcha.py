@@ -5,8 +5,6 @@ Google reCAPTCHA v2 Invisible - проверка капчи на сервере
 import json
 import os
 
-import httpx
-
 
 RECAPTCHA_SECRET_KEY = os.getenv("RECAPTCHA_SECRET_KEY", "")
 VERIFY_URL = "https://www.google.com/recaptcha/api/siteverify"
@@ -17,6 +15,8 @@ def verify_recaptcha(token: str, ip: str | None = None) -> bool:
     Проверяет токен Google reCAPTCHA (v2 invisible или v3).
     Возвращает True, если капча пройдена или если reCAPTCHA не настроена (ключ не задан).
     """
+    import httpx
+
     if not RECAPTCHA_SECRET_KEY:
         return True  # Капча отключена
 
@@ -0,0 +1,173 @@
+"""
+Поиск дублирующихся meta title, meta description и H1
+
+Значения собираются по статьям, страницам CMS и разделам хабов (H1 -
+заголовок title). Точные дубликаты (без учёта регистра и крайних
+пробелов) ищутся одним запросом на поле: GROUP BY значения, участники
+группы собираются json_agg - без отдельного запроса на каждое значение.
+
+Похожие значения (near-дубликаты) ищутся по триграммному сходству
+pg_trgm: значения поля копируются во временную таблицу с GiST-индексом,
+пары с similarity не ниже порога находит self-join по оператору %,
+пары объединяются в группы.
+"""
+
+from typing import Dict, List
+
+from sqlalchemy import Column, Float, Index, Integer, MetaData, String, Table, Text, func, literal, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+
+from app.models import Article, ContentHub, ContentHubSection, Page
+
+FIELDS = {
+    "meta_title": "Meta title",
+    "meta_description": "Meta description",
+    "h1": "H1",
+}
+
+NEAR_THRESHOLD = 0.8
+NEAR_MIN_LENGTH = 10
+
+
+def _column(model, field: str):
+    return model.title if field == "h1" else getattr(model, field)
+
+
+def _items(field: str):
+    """Все непустые значения поля: (kind, id, title, url, admin_url, value)"""
+    articles = select(
+        literal("article").label("kind"),
+        Article.id.label("id"),
+        Article.title.label("title"),
+        func.concat("/news/", Article.slug, "/").label("url"),
+        func.concat("/admin/articles/", Article.id, "/").label("admin_url"),
+        func.btrim(_column(Article, field)).label("value"),
+    )
+    pages = select(
+        literal("page"),
+        Page.id,
+        Page.title,
+        func.concat("/", Page.slug, "/"),
+        func.concat("/admin/pages/", Page.id, "/edit/"),
+        func.btrim(_column(Page, field)),
+    )
+    sections = select(
+        literal("hub_section"),
+        ContentHubSection.id,
+        ContentHubSection.title,
+        func.concat("/hub/", ContentHub.slug, "/", ContentHubSection.slug, "/"),
+        func.concat("/admin/hubs/", ContentHubSection.hub_id, "/sections/", ContentHubSection.id, "/"),
+        func.btrim(_column(ContentHubSection, field)),
+    ).join(ContentHub, ContentHub.id == ContentHubSection.hub_id)
+
+    parts = [
+        query.where(_column(model, field).isnot(None), func.btrim(_column(model, field)) != "")
+        for query, model in ((articles, Article), (pages, Page), (sections, ContentHubSection))
+    ]
+    return parts[0].union_all(*parts[1:])
+
+
+def exact_duplicates(db: Session, field: str) -> List[dict]:
+    """Группы одинаковых значений поля: [{value, count, items: [...]}]"""
+    items = _items(field).subquery()
+    key = func.lower(items.c.value)
+    members = func.json_agg(aggregate_order_by(
+        func.json_build_object(
+            "kind", items.c.kind, "id", items.c.id, "title", items.c.title,
+            "url", items.c.url, "admin_url", items.c.admin_url,
+        ),
+        items.c.kind, items.c.id,
+    ))
+    rows = db.execute(
+        select(func.min(items.c.value), func.count(), members)
+        .group_by(key)
+        .having(func.count() > 1)
+        .order_by(func.count().desc(), func.min(items.c.value))
+    )
+    return [{"value": value, "count": count, "items": group} for value, count, group in rows]
+
+
+def near_duplicates(
+    db: Session,
+    field: str,
+    threshold: float = NEAR_THRESHOLD,
+    min_length: int = NEAR_MIN_LENGTH,
+) -> List[dict]:
+    """Группы похожих значений (similarity >= threshold): [{value, count, similarity, items}]"""
+    tmp = Table(
+        "seo_meta_items",
+        MetaData(),
+        Column("n", Integer, primary_key=True, autoincrement=True),
+        Column("kind", String(20)),
+        Column("id", Integer),
+        Column("title", Text),
+        Column("url", Text),
+        Column("admin_url", Text),
+        Column("value", Text),
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP",
+    )
+    items = _items(field).subquery()
+    conn = db.connection()
+    try:
+        tmp.create(conn)
+        conn.execute(tmp.insert().from_select(
+            ["kind", "id", "title", "url", "admin_url", "value"],
+            select(items).where(func.length(items.c.value) >= min_length),
+        ))
+        Index("ix_seo_meta_items_value", tmp.c.value, postgresql_using="gist",
+              postgresql_ops={"value": "gist_trgm_ops"}).create(conn)
+        conn.exec_driver_sql("ANALYZE seo_meta_items")
+        conn.execute(select(func.set_config("pg_trgm.similarity_threshold", str(threshold), True)))
+
+        a, b = tmp.alias("a"), tmp.alias("b")
+        pairs = conn.execute(
+            select(a.c.n, b.c.n, func.similarity(a.c.value, b.c.value).cast(Float))
+            .join(b, a.c.value.op("%")(b.c.value) & (a.c.n < b.c.n))
+        ).all()
+        if not pairs:
+            return []
+        numbers = {n for pair in pairs for n in pair[:2]}
+        rows = {row.n: row for row in conn.execute(select(tmp).where(tmp.c.n.in_(numbers)))}
+    finally:
+        # Временная таблица удаляется вместе с транзакцией
+        db.rollback()
+
+    parent: Dict[int, int] = {}
+
+    def find(n: int) -> int:
+        parent.setdefault(n, n)
+        while parent[n] != n:
+            parent[n] = parent[parent[n]]
+            n = parent[n]
+        return n
+
+    lowest: Dict[int, float] = {}
+    for left, right, similarity in pairs:
+        root_left, root_right = find(left), find(right)
+        if root_left != root_right:
+            parent[root_right] = root_left
+            lowest[root_left] = min(lowest.get(root_left, 1.0), lowest.pop(root_right, 1.0))
+        root = find(left)
+        lowest[root] = min(lowest.get(root, 1.0), similarity)
+
+    groups: Dict[int, list] = {}
+    for n in numbers:
+        groups.setdefault(find(n), []).append(rows[n])
+
+    result = []
+    for root, members in groups.items():
+        members.sort(key=lambda row: (row.kind, row.id))
+        result.append({
+            "value": members[0].value,
+            "count": len(members),
+            "similarity": round(lowest.get(root, 1.0), 2),
+            "items": [
+                {"kind": row.kind, "id": row.id, "title": row.title, "url": row.url,
+                 "admin_url": row.admin_url, "value": row.value}
+                for row in members
+            ],
+        })
+    result.sort(key=lambda group: (-group["count"], group["value"]))
+    return result
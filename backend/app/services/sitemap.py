@@ -0,0 +1,215 @@
+"""
+Генерация sitemap из БД
+
+/sitemap.xml - индекс (sitemapindex), ссылающийся на части по источникам:
+/sitemap-{source}-{n}.xml, где source - pages, categories, articles, hubs,
+static; в каждой части не больше URLS_PER_SITEMAP адресов. Части отдаются
+сжатыми заранее: gzip хранится в кэше, клиенту без gzip отдаётся
+распакованный XML (также доступна ссылка .xml.gz).
+
+Пересборка инкрементальная: строки источника упорядочены по id и разбиты
+на части по номеру строки, для каждой части одним агрегатным запросом
+считается отпечаток (count, max id, max lastmod). Пересобираются только
+части с изменившимся отпечатком - новая статья затрагивает последнюю часть
+своего источника.
+
+Отпечатки перепроверяются не чаще раза в SITEMAP_CHECK_INTERVAL секунд;
+invalidate() (публикация/снятие с публикации в админке) сбрасывает этот
+интервал, и следующий запрос к sitemap видит изменения сразу. Сброс
+действует в процессе, обработавшем публикацию; остальные воркеры gunicorn
+увидят изменения после своей проверки, не позже SITEMAP_CHECK_INTERVAL.
+"""
+
+import gzip
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from sqlalchemy import Select, String, cast, func, null, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Article, ArticleCategory, ContentHub, ContentHubSection, Page
+
+URLS_PER_SITEMAP = 50000
+YIELD_PER = 1000
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+URLSET_CLOSE = "</urlset>\n"
+
+# Разделы сайта без записей в БД
+STATIC_PATHS = ["/news/", "/hub/", "/about/", "/contact", "/privacy/", "/agreement/"]
+
+
+class Source(NamedTuple):
+    """Источник URL: запрос строк (id, path-данные..., lastmod) и построение пути"""
+    name: str
+    query: Callable[[], Select]
+    to_path: Callable[[tuple], str]
+
+
+def _page_path(slug: str) -> str:
+    slug = (slug or "").strip("/")
+    return "/" if slug in ("", "home") else f"/{slug}/"
+
+
+def _pages_query():
+    lastmod = func.coalesce(Page.updated_at, Page.published_at, Page.created_at)
+    return select(Page.id, Page.slug, lastmod.label("lastmod")).where(Page.status == "published")
+
+
+def _categories_query():
+    lastmod = func.coalesce(ArticleCategory.updated_at, ArticleCategory.created_at)
+    return select(ArticleCategory.id, ArticleCategory.full_slug, lastmod.label("lastmod"))
+
+
+def _articles_query():
+    lastmod = func.coalesce(Article.updated_at, Article.created_at)
+    return select(Article.id, Article.slug, lastmod.label("lastmod")).where(Article.is_published.is_(True))
+
+
+def _hubs_query():
+    # Хабы и их разделы одним списком: раздел - строка с section_slug
+    hubs = select(
+        ContentHub.id.label("id"),
+        ContentHub.slug.label("hub_slug"),
+        cast(null(), String(255)).label("section_slug"),
+        func.coalesce(ContentHub.updated_at, ContentHub.created_at).label("lastmod"),
+    ).where(ContentHub.is_published.is_(True))
+    sections = select(
+        # id раздела сдвинут, чтобы не пересекаться с id хабов в сортировке
+        (ContentHubSection.id + 1000000000).label("id"),
+        ContentHub.slug.label("hub_slug"),
+        ContentHubSection.slug.label("section_slug"),
+        func.coalesce(ContentHubSection.updated_at, ContentHubSection.created_at).label("lastmod"),
+    ).join(ContentHub, ContentHub.id == ContentHubSection.hub_id).where(ContentHub.is_published.is_(True))
+    union = hubs.union_all(sections).subquery()
+    return select(union.c.id, union.c.hub_slug, union.c.section_slug, union.c.lastmod)
+
+
+def _hub_path(row) -> str:
+    if row.section_slug:
+        return f"/hub/{row.hub_slug}/{row.section_slug}/"
+    return f"/hub/{row.hub_slug}/"
+
+
+SOURCES: List[Source] = [
+    Source("pages", _pages_query, lambda row: _page_path(row.slug)),
+    Source("categories", _categories_query, lambda row: f"/news/category/{row.full_slug}/"),
+    Source("articles", _articles_query, lambda row: f"/news/{row.slug}/"),
+    Source("hubs", _hubs_query, _hub_path),
+]
+
+
+def _fingerprints(db: Session, source: Source) -> Dict[int, tuple]:
+    """Отпечатки частей источника: {номер части: (count, max id, max lastmod)}"""
+    rows = source.query().subquery()
+    numbered = select(
+        ((func.row_number().over(order_by=rows.c.id) - 1) // URLS_PER_SITEMAP).label("chunk"),
+        rows.c.id,
+        rows.c.lastmod,
+    ).subquery()
+    result = db.execute(
+        select(numbered.c.chunk, func.count(), func.max(numbered.c.id), func.max(numbered.c.lastmod))
+        .group_by(numbered.c.chunk)
+    )
+    return {int(chunk): (count, max_id, lastmod) for chunk, count, max_id, lastmod in result}
+
+
+def _format_lastmod(value: Optional[datetime]) -> str:
+    return f"<lastmod>{value.strftime('%Y-%m-%d')}</lastmod>" if value else ""
+
+
+def _url_entry(base_url: str, path: str, lastmod: Optional[datetime]) -> str:
+    return f"<url><loc>{escape(base_url + path)}</loc>{_format_lastmod(lastmod)}</url>\n"
+
+
+def _render_chunk(db: Session, source: Source, chunk: int, base_url: str) -> bytes:
+    """XML части источника; строки читаются потоком по YIELD_PER"""
+    query = source.query().order_by("id").offset(chunk * URLS_PER_SITEMAP).limit(URLS_PER_SITEMAP)
+    parts = [XML_HEADER, URLSET_OPEN]
+    for row in db.execute(query.execution_options(yield_per=YIELD_PER)):
+        parts.append(_url_entry(base_url, source.to_path(row), row.lastmod))
+    parts.append(URLSET_CLOSE)
+    return "".join(parts).encode("utf-8")
+
+
+def _render_static(base_url: str) -> bytes:
+    entries = "".join(_url_entry(base_url, path, None) for path in STATIC_PATHS)
+    return (XML_HEADER + URLSET_OPEN + entries + URLSET_CLOSE).encode("utf-8")
+
+
+class _Chunk(NamedTuple):
+    fingerprint: tuple
+    gzipped: bytes
+    lastmod: Optional[datetime]
+
+
+class SitemapCache:
+    """Части sitemap в памяти процесса, пересборка по отпечаткам"""
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._chunks: Dict[Tuple[str, int], _Chunk] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+
+    def invalidate(self) -> None:
+        """Перепроверить отпечатки при следующем запросе"""
+        self._checked_at = 0.0
+
+    def _refresh(self, db: Session) -> None:
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if time.monotonic() - self._checked_at < self.check_interval:
+                return
+            base_url = settings.BASE_URL.rstrip("/")
+            chunks: Dict[Tuple[str, int], _Chunk] = {}
+
+            static_key = ("static", 0)
+            chunks[static_key] = self._chunks.get(static_key) or _Chunk(
+                (len(STATIC_PATHS),), gzip.compress(_render_static(base_url), 9), None
+            )
+
+            for source in SOURCES:
+                for chunk, fingerprint in sorted(_fingerprints(db, source).items()):
+                    key = (source.name, chunk)
+                    cached = self._chunks.get(key)
+                    if cached is None or cached.fingerprint != fingerprint:
+                        body = _render_chunk(db, source, chunk, base_url)
+                        cached = _Chunk(fingerprint, gzip.compress(body, 9), fingerprint[2])
+                        self.rebuilds += 1
+                    chunks[key] = cached
+
+            self._chunks = chunks
+            self._checked_at = time.monotonic()
+
+    def index(self, db: Session) -> bytes:
+        """sitemapindex со ссылками на все части"""
+        self._refresh(db)
+        base_url = settings.BASE_URL.rstrip("/")
+        parts = [XML_HEADER, '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+        for (name, chunk), cached in sorted(self._chunks.items()):
+            loc = f"{base_url}/sitemap-{name}-{chunk + 1}.xml"
+            parts.append(f"<sitemap><loc>{escape(loc)}</loc>{_format_lastmod(cached.lastmod)}</sitemap>\n")
+        parts.append("</sitemapindex>\n")
+        return "".join(parts).encode("utf-8")
+
+    def chunk_gzipped(self, db: Session, name: str, number: int) -> Optional[bytes]:
+        """Сжатая часть sitemap-{name}-{number}.xml или None"""
+        self._refresh(db)
+        cached = self._chunks.get((name, number - 1))
+        return cached.gzipped if cached else None
+
+
+sitemap_cache = SitemapCache(check_interval=settings.SITEMAP_CHECK_INTERVAL)
+
+
+def invalidate() -> None:
+    """Вызывается после публикации/снятия с публикации контента"""
+    sitemap_cache.invalidate()
@@ -5,8 +5,6 @@ Yandex SmartCaptcha - проверка капчи на сервере
 import json
 import os
 
-import httpx
-
 
 SMARTCAPTCHA_SERVER_KEY = os.getenv("SMARTCAPTCHA_SERVER_KEY", "")
 VALIDATE_URL = "https://smartcaptcha.yandexcloud.net/validate"
@@ -17,6 +15,8 @@ def check_captcha(token: str, ip: str) -> bool:
     Проверяет токен SmartCaptcha.
     Возвращает True если капча пройдена или если сервер капчи недоступен (fail-open при ошибках).
     """
+    import httpx
+
     if not SMARTCAPTCHA_SERVER_KEY:
         return True  # Капча отключена, если ключ не задан
 
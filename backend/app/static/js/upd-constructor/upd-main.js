@@ -1195,6 +1195,7 @@ $(document).ready(function() {
     // Update preview - теперь загружает реальную форму через API
     let previewDebounceTimer = null;
     let isPreviewUpdating = false;
+    let sidebarPreviewEtag = null; // ETag последнего отрисованного предпросмотра
     function updatePreview() {
         // Debounce - обновляем не чаще чем раз в 1.5 секунды для снижения нагрузки
         clearTimeout(previewDebounceTimer);
@@ -2265,13 +2266,19 @@ $(document).ready(function() {
         
         try {
             const API_URL = '';
+            const headers = { 'Content-Type': 'application/json' };
+            if (sidebarPreviewEtag) {
+                headers['If-None-Match'] = sidebarPreviewEtag;
+            }
             const response = await fetch(`${API_URL}/api/v1/documents/upd/preview`, {
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
+                headers: headers,
                 body: JSON.stringify(requestData)
             });
             
+            // 304 - документ не изменился, перерисовывать canvas не нужно
             if (response.ok) {
+                sidebarPreviewEtag = response.headers.get('ETag');
                 const html = await response.text();
                 
                 // Создаём временный контейнер для рендеринга
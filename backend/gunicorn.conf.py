@@ -0,0 +1,63 @@
+"""
+Продакшен-запуск: gunicorn с воркерами uvicorn
+
+    gunicorn app.main:app            # конфиг gunicorn.conf.py подхватывается из текущего каталога
+
+Приложение загружается в мастер-процессе до fork (preload_app), там же
+прогреваются шаблоны, контент и спрайт (app/core/warmup.py) - воркеры
+получают их готовыми. Воркер перезапускается после SERVER_MAX_REQUESTS
+запросов (с разбросом, чтобы не все сразу) или при RSS больше
+SERVER_MAX_RSS_MB (app/core/worker.py). При остановке и перезапуске
+воркер дорабатывает текущие запросы - до SERVER_GRACEFUL_TIMEOUT секунд.
+Настройки - SERVER_* в app/core/config.py.
+"""
+
+import multiprocessing
+import os
+import shutil
+
+# Метрики всех воркеров пишутся в файлы общего каталога (app/core/metrics.py).
+# Каталог задаётся и очищается до preload приложения (prometheus_client создаёт
+# файлы уже при импорте); при перечитывании конфига по HUP - не очищается.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/documatica-metrics")
+if not os.environ.get("DOCUMATICA_METRICS_DIR_READY"):
+    shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+    os.environ["DOCUMATICA_METRICS_DIR_READY"] = "1"
+
+from app.core.config import settings
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = settings.SERVER_WORKERS or multiprocessing.cpu_count()
+worker_class = "app.core.worker.RecyclingUvicornWorker"
+
+preload_app = True
+max_requests = settings.SERVER_MAX_REQUESTS
+max_requests_jitter = settings.SERVER_MAX_REQUESTS_JITTER if settings.SERVER_MAX_REQUESTS else 0
+timeout = settings.SERVER_TIMEOUT
+graceful_timeout = settings.SERVER_GRACEFUL_TIMEOUT
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    """Мастер загрузил приложение и ещё не запустил воркеры"""
+    from app.core.warmup import warm_up
+
+    server.log.info("Warm-up before fork: %s", warm_up())
+
+
+def post_fork(server, worker):
+    """Соединения пула, открытые в мастере, не переходят в воркер"""
+    from app.database import engine
+
+    engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    """Gauge завершённого воркера больше не учитываются"""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк записи событий аналитики: INSERT + COMMIT на каждое событие
+против буфера с пакетным сбросом (app/services/analytics.py).
+
+Печатается пропускная способность (событий/с), латентность вызова
+на стороне обработчика запроса и число отброшенных событий при
+переполнении буфера.
+
+Запуск из корня backend:
+    python3 scripts/benchmark_analytics.py --events 20000 --threads 8
+    python3 scripts/benchmark_analytics.py --events 50000 --buffer-size 1000   # проверка отбрасывания
+
+События бенчмарка (event_type bench_*) и их счётчики удаляются после замера.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.models import AnalyticsDailyCount, AnalyticsEvent
+from app.services.analytics import AnalyticsBuffer, ensure_partitions
+
+
+def event_fields(i: int) -> dict:
+    return {
+        "event_data": {"path": f"/bench/{i % 100}"},
+        "ip_address": "127.0.0.1",
+        "user_agent": "benchmark",
+        "referrer": None,
+    }
+
+
+def run_single(events: int, threads: int) -> tuple:
+    """Каждое событие - отдельная транзакция (как при записи из обработчика)"""
+    def worker(count: int) -> list:
+        latencies = []
+        db = SessionLocal()
+        try:
+            for i in range(count):
+                started = time.perf_counter()
+                db.add(AnalyticsEvent(event_type="bench_single", created_at=datetime.utcnow(), **event_fields(i)))
+                db.commit()
+                latencies.append(time.perf_counter() - started)
+        finally:
+            db.close()
+        return latencies
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(worker, [events // threads] * threads))
+    elapsed = time.perf_counter() - started
+    return [value for result in results for value in result], elapsed, 0
+
+
+def run_buffered(events: int, threads: int, buffer_size: int, batch_size: int, interval_ms: int) -> tuple:
+    """track() в буфер, запись фоновым потоком"""
+    buffer = AnalyticsBuffer(capacity=buffer_size, batch_size=batch_size, flush_interval=interval_ms / 1000)
+    buffer.start()
+
+    def worker(count: int) -> list:
+        latencies = []
+        for i in range(count):
+            started = time.perf_counter()
+            buffer.track("bench_buffered", **event_fields(i))
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(worker, [events // threads] * threads))
+    buffer.stop(timeout=300)  # дожидаемся записи остатка
+    elapsed = time.perf_counter() - started
+    stats = buffer.stats()
+    print(f"  буфер: {stats}")
+    return [value for result in results for value in result], elapsed, stats["dropped"]
+
+
+def cleanup():
+    db = SessionLocal()
+    try:
+        db.query(AnalyticsEvent).filter(AnalyticsEvent.event_type.like("bench_%")).delete(synchronize_session=False)
+        db.query(AnalyticsDailyCount).filter(AnalyticsDailyCount.event_type.like("bench_%")).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def report(name: str, latencies: list, elapsed: float, dropped: int):
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(0.99 * (len(ordered) - 1)))]
+    written = len(ordered) - dropped
+    print(
+        f"{name}: {written / elapsed:.0f} событий/с записано, отброшено {dropped}; "
+        f"вызов p50={statistics.median(ordered) * 1e6:.0f} мкс p99={p99 * 1e6:.0f} мкс"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк записи событий аналитики")
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--buffer-size", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--interval-ms", type=int, default=1000)
+    parser.add_argument("--skip-single", action="store_true", help="Не замерять запись по одному событию")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        ensure_partitions(db)
+    finally:
+        db.close()
+
+    try:
+        if not args.skip_single:
+            report("INSERT+COMMIT на событие", *run_single(args.events, args.threads))
+        report(
+            "Буфер + пакетная запись",
+            *run_buffered(args.events, args.threads, args.buffer_size, args.batch_size, args.interval_ms),
+        )
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
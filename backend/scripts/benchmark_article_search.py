@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк поиска по статьям: прежний ILIKE '%q%' по title, slug, excerpt
+и content против полнотекстового поиска (app/services/article_search.py,
+GIN-индекс по articles.search_vector).
+
+Скрипт добавляет --articles статей со slug bench-search-*, замеряет
+несколько запросов обоими способами (подсчёт и первая страница, для FTS -
+с фрагментами ts_headline) и удаляет добавленное.
+
+Запуск из корня backend, на тестовой БД:
+    python3 scripts/benchmark_article_search.py --articles 20000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.database import SessionLocal
+from app.models import Article
+from app.services import article_search
+
+SLUG_PREFIX = "bench-search-"
+QUERIES = ["счёт-фактура", "универсальный передаточный документ", "акт сверки", "НДС 2026"]
+TOPICS = [
+    "Универсальный передаточный документ оформляется продавцом при отгрузке товаров.",
+    "Счёт-фактура нужен плательщикам НДС для вычета налога.",
+    "Акт сверки взаиморасчётов подписывают обе стороны сделки.",
+    "Ставка НДС в 2026 году изменилась для упрощённой системы налогообложения.",
+    "Товарная накладная подтверждает передачу товара покупателю.",
+]
+
+
+def timed(label: str, func):
+    started = time.perf_counter()
+    result = func()
+    print(f"{label}: {(time.perf_counter() - started) * 1000:.1f} мс")
+    return result
+
+
+def seed(db, count: int, paragraphs: int):
+    rng = random.Random(42)
+    rows = []
+    for i in range(count):
+        body = "".join(f"<p>{rng.choice(TOPICS)}</p>" for _ in range(paragraphs))
+        rows.append({
+            "slug": f"{SLUG_PREFIX}{i}",
+            "title": f"{rng.choice(TOPICS)[:60]} ({i})",
+            "excerpt": rng.choice(TOPICS),
+            "content": body,
+            "is_published": True,
+        })
+        if len(rows) >= 1000:
+            db.bulk_insert_mappings(Article, rows)
+            db.commit()
+            rows = []
+    if rows:
+        db.bulk_insert_mappings(Article, rows)
+        db.commit()
+    db.execute(text("ANALYZE articles"))
+    db.commit()
+
+
+def cleanup(db):
+    db.query(Article).filter(Article.slug.like(f"{SLUG_PREFIX}%")).delete(synchronize_session=False)
+    db.commit()
+
+
+def ilike_search(db, query: str):
+    pattern = f"%{query.lower()}%"
+    qry = db.query(Article).filter(
+        Article.title.ilike(pattern)
+        | Article.slug.ilike(pattern)
+        | (Article.excerpt.isnot(None) & Article.excerpt.ilike(pattern))
+        | (Article.content.isnot(None) & Article.content.ilike(pattern))
+    ).order_by(Article.updated_at.desc(), Article.id.desc())
+    total = qry.count()
+    return qry.limit(20).all(), total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=20000)
+    parser.add_argument("--paragraphs", type=int, default=40)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        cleanup(db)
+        timed(f"Добавление {args.articles} статей", lambda: seed(db, args.articles, args.paragraphs))
+        for query in QUERIES:
+            print(f"\n«{query}»")
+            _, old_total = timed("  ILIKE", lambda: ilike_search(db, query))
+            db.expunge_all()
+            _, new_total = timed("  FTS + ts_headline", lambda: article_search.search_articles(db, query))
+            db.expunge_all()
+            print(f"  найдено: {old_total} / {new_total}")
+    finally:
+        cleanup(db)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк BillingService.consume_generation: латентность одного списания
+(условные UPDATE ... RETURNING и upsert счётчиков ИНН в одной транзакции).
+
+Запуск из корня backend:
+    python3 scripts/benchmark_billing.py --iterations 1000
+    python3 scripts/benchmark_billing.py --threads 8 --iterations 2000
+
+Тестовый пользователь с пакетом купленных документов (--source purchased)
+или с подпиской создаётся перед замером и удаляется после.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.models import GlobalINNLimit, INNUsage, User
+from app.services.billing import BillingService
+
+BENCH_EMAIL = "bench-billing@bench.documatica.test"
+BENCH_INN = "9900000000"
+
+
+def create_user(source: str, iterations: int) -> int:
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.email == BENCH_EMAIL).delete(synchronize_session=False)
+        user = User(email=BENCH_EMAIL, password_hash="-", is_verified=True, purchased_docs_remaining=iterations)
+        if source == "subscription":
+            user.purchased_docs_remaining = 0
+            user.subscription_plan = "subscription"
+            user.subscription_expires = datetime.utcnow() + timedelta(days=1)
+        db.add(user)
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def delete_user(user_id: int):
+    db = SessionLocal()
+    try:
+        db.query(INNUsage).filter(INNUsage.user_id == user_id).delete(synchronize_session=False)
+        db.query(GlobalINNLimit).filter(GlobalINNLimit.inn == BENCH_INN).delete(synchronize_session=False)
+        db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def consume(user_id: int, count: int) -> list:
+    latencies = []
+    db = SessionLocal()
+    try:
+        billing = BillingService(db)
+        user = db.query(User).filter(User.id == user_id).first()
+        for _ in range(count):
+            started = time.perf_counter()
+            billing.consume_generation(user, BENCH_INN)
+            latencies.append(time.perf_counter() - started)
+    finally:
+        db.close()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк списания генераций")
+    parser.add_argument("--iterations", type=int, default=1000, help="Списаний на поток")
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--source", choices=["purchased", "subscription"], default="purchased")
+    args = parser.parse_args()
+
+    user_id = create_user(args.source, args.iterations * args.threads)
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            results = list(executor.map(lambda _: consume(user_id, args.iterations), range(args.threads)))
+        elapsed = time.perf_counter() - started
+    finally:
+        delete_user(user_id)
+
+    latencies = sorted(value for result in results for value in result)
+    p95 = latencies[min(len(latencies) - 1, int(0.95 * (len(latencies) - 1)))]
+    print(f"Списаний: {len(latencies)}, потоков: {args.threads}, источник: {args.source}")
+    print(
+        f"Латентность, мс: p50={statistics.median(latencies) * 1000:.2f} "
+        f"p95={p95 * 1000:.2f} max={latencies[-1] * 1000:.2f}"
+    )
+    print(f"Пропускная способность: {len(latencies) / elapsed:.0f} списаний/с")
+
+
+if __name__ == "__main__":
+    main()
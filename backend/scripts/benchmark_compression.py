@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк сжатия ответов (app/core/compression.py): размер и стоимость
+CPU для gzip/brotli разных уровней на реальных страницах - превью УПД
+(upd_template.html) и статье блога.
+
+Тела страниц запрашиваются у запущенного приложения без сжатия, затем
+каждая настройка сжимает их в цикле: выводится степень сжатия,
+пропускная способность (МБ/с исходного HTML) и время на ответ. Последний
+столбец - время передачи сжатого тела по каналу --mbit для сравнения
+с сэкономленным временем CPU.
+
+Запуск из корня backend (приложение уже запущено):
+    python3 scripts/benchmark_compression.py
+    python3 scripts/benchmark_compression.py --base-url http://127.0.0.1:8000 --article /news/kratko-ob-usn/
+"""
+
+import argparse
+import gzip
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.compression import BROTLI_AVAILABLE, _Compressor
+
+REPEATS = 50
+
+SETTINGS = [("gzip", level) for level in (1, 6, 9)]
+if BROTLI_AVAILABLE:
+    SETTINGS += [("br", quality) for quality in (1, 4, 6, 11)]
+
+
+def fetch(client: httpx.Client, path: str) -> bytes:
+    response = client.get(path, headers={"Accept-Encoding": "identity"})
+    response.raise_for_status()
+    return response.content
+
+
+def first_article(client: httpx.Client) -> str:
+    """Ссылка на первую статью со страницы /news/"""
+    html = fetch(client, "/news/").decode("utf-8", errors="ignore")
+    marker = 'href="/news/'
+    for part in html.split(marker)[1:]:
+        slug = part.split('"', 1)[0]
+        if slug and not slug.startswith(("category/", "search", "?")):
+            return f"/news/{slug}"
+    return "/news/"
+
+
+def measure(label: str, body: bytes, mbit: float) -> None:
+    print(f"\n{label}: {len(body):,} байт")
+    print(f"{'кодировка':12} {'байт':>10} {'доля':>7} {'МБ/с':>8} {'мс/ответ':>9} {'передача, мс':>13}")
+    transfer = len(body) * 8 / (mbit * 1e6) * 1000
+    print(f"{'identity':12} {len(body):>10,} {'100%':>7} {'-':>8} {'-':>9} {transfer:>13.1f}")
+    for encoding, level in SETTINGS:
+        started = time.perf_counter()
+        for _ in range(REPEATS):
+            compressed = _Compressor(encoding, level, level).finish(body)
+        elapsed = (time.perf_counter() - started) / REPEATS
+        if encoding == "gzip":
+            assert gzip.decompress(compressed) == body
+        transfer = len(compressed) * 8 / (mbit * 1e6) * 1000
+        print(
+            f"{encoding + '-' + str(level):12} {len(compressed):>10,} {len(compressed) / len(body) * 100:>6.1f}% "
+            f"{len(body) / elapsed / 1e6:>8.1f} {elapsed * 1000:>9.2f} {transfer:>13.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--article", default=None, help="путь статьи (по умолчанию первая из /news/)")
+    parser.add_argument("--mbit", type=float, default=20.0, help="скорость канала клиента, Мбит/с")
+    args = parser.parse_args()
+
+    with httpx.Client(base_url=args.base_url, timeout=30) as client:
+        pages = {
+            "Превью УПД (/api/v1/documents/upd/demo)": fetch(client, "/api/v1/documents/upd/demo"),
+            f"Статья ({args.article or 'первая из /news/'})": fetch(client, args.article or first_article(client)),
+            "Главная (/)": fetch(client, "/"),
+        }
+
+    for label, body in pages.items():
+        measure(label, body, args.mbit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк загрузки YAML-контента (app/core/content.py): холодный старт
+без снимка и со снимком, и стоимость поиска контента на запрос по
+сравнению с прежним lru_cache (который не видел изменений файлов).
+
+Запуск из корня backend (снимок пишется во временный каталог):
+    python3 scripts/benchmark_content.py
+"""
+
+import sys
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import yaml
+
+from app.core.content import CONTENT_DIR, ContentStore
+
+LOOKUPS = 100000
+
+
+def timed(label: str, func, per: int = 0):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    if per:
+        print(f"{label}: {elapsed / per * 1e6:.2f} мкс на вызов")
+    else:
+        print(f"{label}: {elapsed * 1000:.1f} мс")
+    return result
+
+
+@lru_cache(maxsize=256)
+def old_load_content(path: str):
+    file_path = CONTENT_DIR / f"{path}.yaml"
+    if not file_path.exists():
+        file_path = CONTENT_DIR / f"{path}.yml"
+    with open(file_path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = Path(tmp) / "content_snapshot.pickle"
+
+        cold = ContentStore(CONTENT_DIR, snapshot, check_interval=2)
+        timed("Холодный старт без снимка (разбор всех YAML)", lambda: cold.refresh(force=True))
+        print(f"  {cold.stats()}")
+
+        warm = ContentStore(CONTENT_DIR, snapshot, check_interval=2)
+        timed("Холодный старт со снимком", lambda: warm.refresh(force=True))
+        print(f"  {warm.stats()}")
+
+        paths = warm.paths()
+        timed("Прежний lru_cache: первый вызов для всех файлов", lambda: [old_load_content(p) for p in paths])
+
+        def old_lookups():
+            for i in range(LOOKUPS):
+                old_load_content(paths[i % len(paths)])
+
+        def new_lookups():
+            for i in range(LOOKUPS):
+                warm.get(paths[i % len(paths)])
+
+        timed("Прежний lru_cache: поиск", old_lookups, per=LOOKUPS)
+        timed("ContentStore: поиск", new_lookups, per=LOOKUPS)
+
+        timed("Проверка изменений (обход дерева со stat)", lambda: warm.refresh(force=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк автосохранения черновика: PUT всего документа против PATCH (JSON Patch).
+
+Для черновика УПД с --items позициями выполняется --saves автосохранений,
+каждое меняет одно поле. Печатается размер тела запроса, латентность и
+объём WAL, записанный PostgreSQL (pg_current_wal_lsn до и после серии) -
+мера write amplification: сколько байт пишет база на одно изменённое поле.
+
+Запуск из корня backend (приложение уже запущено, БД та же):
+    python3 scripts/benchmark_draft_patch.py --items 200 --saves 200
+
+Черновики бенчмарка удаляются после замера. На WAL влияет и остальная
+нагрузка на базу - замер стоит делать на тестовом стенде.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.database import SessionLocal, engine
+from app.models import GuestDraft
+
+
+def make_document(items: int) -> dict:
+    return {
+        "document_number": "BENCH-1",
+        "document_date": "2026-10-19",
+        "seller": {"name": "ООО Продавец", "inn": "7707083893", "address": "г. Москва, ул. Тверская, д. 1"},
+        "buyer": {"name": "ООО Покупатель", "inn": "7728168971", "address": "г. Москва, ул. Арбат, д. 2"},
+        "items": [
+            {
+                "row_number": i + 1,
+                "name": f"Товар номер {i + 1} с достаточно длинным наименованием",
+                "unit_name": "шт",
+                "quantity": 1,
+                "price": 1000,
+                "vat_rate": "20%",
+                "amount_without_vat": 1000,
+                "vat_amount": 200,
+                "amount_with_vat": 1200,
+            }
+            for i in range(items)
+        ],
+    }
+
+
+def wal_lsn() -> str:
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT pg_current_wal_lsn()")).scalar()
+
+
+def wal_bytes_since(start_lsn: str) -> int:
+    with engine.connect() as conn:
+        return int(conn.execute(
+            text("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), CAST(:lsn AS pg_lsn))"),
+            {"lsn": start_lsn},
+        ).scalar())
+
+
+def run_series(client: httpx.Client, mode: str, items: int, saves: int) -> dict:
+    document = make_document(items)
+    response = client.post("/api/v1/drafts", json={"document_type": "upd", "document_data": document})
+    response.raise_for_status()
+    created = response.json()
+    token, version = created["draft_token"], created["version"]
+
+    latencies = []
+    body_bytes = 0
+    start_lsn = wal_lsn()
+    for i in range(saves):
+        row = i % items
+        new_name = f"Изменённое наименование {i}"
+        if mode == "put":
+            document["items"][row]["name"] = new_name
+            body = json.dumps({"document_type": "upd", "document_data": document}, ensure_ascii=False).encode()
+            method = "PUT"
+        else:
+            operations = [{"op": "replace", "path": f"/items/{row}/name", "value": new_name}]
+            body = json.dumps({"version": version, "operations": operations}, ensure_ascii=False).encode()
+            method = "PATCH"
+
+        started = time.perf_counter()
+        response = client.request(
+            method, f"/api/v1/drafts/{token}", content=body, headers={"Content-Type": "application/json"}
+        )
+        latencies.append(time.perf_counter() - started)
+        response.raise_for_status()
+        version = response.json()["version"]
+        body_bytes += len(body)
+
+    wal = wal_bytes_since(start_lsn)
+    return {"token": token, "latencies": latencies, "body_bytes": body_bytes, "wal_bytes": wal}
+
+
+def cleanup(tokens: list):
+    db = SessionLocal()
+    try:
+        db.query(GuestDraft).filter(GuestDraft.draft_token.in_(tokens)).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк автосохранения черновика: PUT против PATCH")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--saves", type=int, default=200)
+    args = parser.parse_args()
+
+    document_size = len(json.dumps(make_document(args.items), ensure_ascii=False).encode())
+    print(f"Документ: {args.items} позиций, {document_size / 1024:.1f} КБ JSON; автосохранений: {args.saves}")
+
+    tokens = []
+    try:
+        with httpx.Client(base_url=args.base_url, timeout=60) as client:
+            for mode in ("put", "patch"):
+                result = run_series(client, mode, args.items, args.saves)
+                tokens.append(result["token"])
+                latencies = sorted(result["latencies"])
+                p95 = latencies[min(len(latencies) - 1, int(0.95 * (len(latencies) - 1)))]
+                print(
+                    f"{mode.upper():5} тело запроса: {result['body_bytes'] / args.saves:.0f} Б/сохранение, "
+                    f"WAL: {result['wal_bytes'] / args.saves:.0f} Б/сохранение, "
+                    f"латентность p50={statistics.median(latencies) * 1000:.1f} мс p95={p95 * 1000:.1f} мс"
+                )
+    finally:
+        cleanup(tokens)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Размер таблицы guest_drafts до и после удаления просроченных черновиков.
+
+Скрипт добавляет --drafts черновиков (доля --expired просрочена, у каждого
+document_data около --payload-kb КБ), печатает число строк и размер таблицы
+с индексами и TOAST, запускает reap_expired_drafts, затем VACUUM, и снова
+печатает размеры. DELETE сам по себе место не освобождает: оно становится
+доступно для новых строк после VACUUM (autovacuum в продакшене).
+
+Запуск из корня backend, на тестовой БД (удаляются и ранее
+просроченные непривязанные черновики - как это делает воркер):
+    python3 scripts/benchmark_draft_reaper.py --drafts 50000 --expired 0.8
+"""
+
+import argparse
+import secrets
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.database import SessionLocal, engine
+from app.models import GuestDraft
+from app.services.draft_reaper import reap_expired_drafts
+
+SEED_SESSION = "bench-draft-reaper"
+
+
+def seed(count: int, expired_share: float, payload_kb: int):
+    payload = {"items": [{"name": "x" * 100, "price": 100}] * max(1, payload_kb * 8)}
+    now = datetime.utcnow()
+    expired_count = int(count * expired_share)
+    db = SessionLocal()
+    try:
+        rows = []
+        for i in range(count):
+            expires_at = now - timedelta(days=1) if i < expired_count else now + timedelta(days=7)
+            rows.append({
+                "draft_token": secrets.token_urlsafe(32),
+                "document_type": "upd",
+                "document_data": payload,
+                "session_id": SEED_SESSION,
+                "is_claimed": False,
+                "is_converted": False,
+                "created_at": now,
+                "updated_at": now,
+                "expires_at": expires_at,
+            })
+            if len(rows) >= 1000:
+                db.bulk_insert_mappings(GuestDraft, rows)
+                db.commit()
+                rows = []
+        if rows:
+            db.bulk_insert_mappings(GuestDraft, rows)
+            db.commit()
+    finally:
+        db.close()
+
+
+def table_stats() -> str:
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT count(*) FROM guest_drafts")).scalar()
+        size = conn.execute(text("SELECT pg_size_pretty(pg_total_relation_size('guest_drafts'))")).scalar()
+    return f"строк={rows}, размер={size}"
+
+
+def vacuum():
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM guest_drafts"))
+
+
+def cleanup():
+    db = SessionLocal()
+    try:
+        db.query(GuestDraft).filter(GuestDraft.session_id == SEED_SESSION).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Удаление просроченных черновиков гостей")
+    parser.add_argument("--drafts", type=int, default=50000)
+    parser.add_argument("--expired", type=float, default=0.8, help="Доля просроченных")
+    parser.add_argument("--payload-kb", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"До заполнения: {table_stats()}")
+    seed(args.drafts, args.expired, args.payload_kb)
+    vacuum()
+    print(f"После заполнения: {table_stats()}")
+
+    try:
+        started = time.perf_counter()
+        deleted = reap_expired_drafts(args.batch_size)
+        elapsed = time.perf_counter() - started
+        print(f"Удалено: {deleted} за {elapsed:.2f} с (пачки по {args.batch_size})")
+        print(f"После удаления: {table_stats()}")
+        vacuum()
+        print(f"После VACUUM: {table_stats()}")
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
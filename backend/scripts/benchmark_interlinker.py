@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк отбора статей перелинковщиком (admin/seo_tools.py): прежний
+способ (загрузить все статьи и искать фразу в Python) против ILIKE
+по триграммному индексу ix_articles_content_trgm.
+
+Скрипт добавляет --articles статей со slug bench-interlink-* (фраза
+есть в доле --share из них), замеряет отбор кандидатов обоими способами,
+прогон перелинковки пачками без сохранения и удаляет добавленное.
+
+Запуск из корня backend, на тестовой БД:
+    python3 scripts/benchmark_interlinker.py --articles 10000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.admin.seo_tools import INTERLINKER_BATCH_SIZE, _add_internal_links, _interlinker_candidates
+from app.database import SessionLocal
+from app.models import Article
+
+SLUG_PREFIX = "bench-interlink-"
+PHRASE = "Универсальный передаточный документ"
+FILLER = "<p>Счёт на оплату выставляется покупателю до отгрузки товара или оказания услуги.</p>"
+
+
+def timed(label: str, func):
+    started = time.perf_counter()
+    result = func()
+    print(f"{label}: {(time.perf_counter() - started) * 1000:.1f} мс")
+    return result
+
+
+def seed(db, count: int, share: float, paragraphs: int):
+    rng = random.Random(42)
+    rows = []
+    for i in range(count):
+        body = [FILLER] * paragraphs
+        if rng.random() < share:
+            body[rng.randrange(paragraphs)] = f"<p>{PHRASE.lower()} оформляется при отгрузке.</p>"
+        rows.append({
+            "slug": f"{SLUG_PREFIX}{i}",
+            "title": f"Бенчмарк перелинковки {i}",
+            "content": "".join(body),
+            "is_published": True,
+        })
+        if len(rows) >= 1000:
+            db.bulk_insert_mappings(Article, rows)
+            db.commit()
+            rows = []
+    if rows:
+        db.bulk_insert_mappings(Article, rows)
+        db.commit()
+
+
+def cleanup(db):
+    db.query(Article).filter(Article.slug.like(f"{SLUG_PREFIX}%")).delete(synchronize_session=False)
+    db.commit()
+
+
+def candidates_in_python(db):
+    articles = db.query(Article).filter(Article.content.isnot(None), Article.content != "").all()
+    return [a.id for a in articles if PHRASE.lower() in a.content.lower()]
+
+
+def dry_run(db, ids):
+    added_total = 0
+    for i in range(0, len(ids), INTERLINKER_BATCH_SIZE):
+        batch = db.query(Article).filter(Article.id.in_(ids[i:i + INTERLINKER_BATCH_SIZE])).all()
+        for article in batch:
+            _, added = _add_internal_links(article.content, PHRASE, "/upd/", 1)
+            added_total += added
+        db.expunge_all()
+    return added_total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=10000)
+    parser.add_argument("--share", type=float, default=0.05)
+    parser.add_argument("--paragraphs", type=int, default=60)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        cleanup(db)
+        timed(f"Добавление {args.articles} статей", lambda: seed(db, args.articles, args.share, args.paragraphs))
+        db.execute(text("ANALYZE articles"))
+        db.commit()
+
+        old_ids = timed("Кандидаты: все статьи в Python", lambda: candidates_in_python(db))
+        db.expunge_all()
+        new_ids = timed("Кандидаты: ILIKE по триграммному индексу", lambda: _interlinker_candidates(db, PHRASE))
+        print(f"  найдено: {len(old_ids)} / {len(new_ids)}")
+
+        added = timed(f"Предпросмотр пачками по {INTERLINKER_BATCH_SIZE}", lambda: dry_run(db, new_ids))
+        print(f"  ссылок было бы добавлено: {added}")
+    finally:
+        cleanup(db)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
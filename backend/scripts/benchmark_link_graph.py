@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк SEO-отчётов по ссылкам: прежний способ (разбор текста каждой
+статьи и по запросу к БД на каждую ссылку) против графа internal_links
+(app/services/link_graph.py, один SQL-запрос на отчёт).
+
+Скрипт добавляет --articles статей со slug bench-links-*, в каждой
+--links внутренних ссылок на соседние статьи (доля --broken ведёт на
+несуществующие), индексирует их, замеряет проверку битых ссылок и
+поиск статей-сирот обоими способами и удаляет добавленное.
+
+Запуск из корня backend, на тестовой БД:
+    python3 scripts/benchmark_link_graph.py --articles 5000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.models import Article, InternalLink, Page
+from app.services import link_graph
+
+SLUG_PREFIX = "bench-links-"
+
+
+def timed(label: str, func):
+    started = time.perf_counter()
+    result = func()
+    print(f"{label}: {(time.perf_counter() - started) * 1000:.1f} мс")
+    return result
+
+
+def seed(db, count: int, links: int, broken_share: float):
+    rng = random.Random(42)
+    rows = []
+    for i in range(count):
+        hrefs = []
+        for _ in range(links):
+            if rng.random() < broken_share:
+                hrefs.append(f"/news/{SLUG_PREFIX}missing-{rng.randrange(count)}/")
+            else:
+                # Статьи с номерами кратными 10 никто не ссылается - это сироты
+                target = rng.randrange(count // 10) * 10 + rng.randrange(1, 10)
+                hrefs.append(f"/news/{SLUG_PREFIX}{min(target, count - 1)}/")
+        content = "".join(f'<p>Текст <a href="{href}">ссылка</a></p>' for href in hrefs)
+        rows.append({
+            "slug": f"{SLUG_PREFIX}{i}",
+            "title": f"Бенчмарк ссылок {i}",
+            "content": content,
+            "is_published": True,
+        })
+    db.bulk_insert_mappings(Article, rows)
+    db.commit()
+    for article in db.query(Article).filter(Article.slug.like(f"{SLUG_PREFIX}%")):
+        link_graph.index_article(db, article)
+    db.commit()
+
+
+def cleanup(db):
+    ids = [row[0] for row in db.query(Article.id).filter(Article.slug.like(f"{SLUG_PREFIX}%"))]
+    if ids:
+        db.query(InternalLink).filter(
+            InternalLink.source_type == link_graph.SOURCE_ARTICLE,
+            InternalLink.source_id.in_(ids),
+        ).delete(synchronize_session=False)
+        db.query(Article).filter(Article.id.in_(ids)).delete(synchronize_session=False)
+    db.commit()
+
+
+def _resolve_per_link(db, path: str) -> bool:
+    """Прежняя проверка: запрос к БД на каждую ссылку"""
+    path = path.strip("/")
+    if not path:
+        return True
+    parts = path.split("/")
+    if parts[0] == "news":
+        slug = "/".join(parts[1:])
+        return not slug or db.query(Article).filter(Article.slug == slug).first() is not None
+    if db.query(Page).filter(Page.slug == path, Page.status == "published").first():
+        return True
+    return path in link_graph.STATIC_PATHS
+
+
+def broken_per_link(db):
+    broken = []
+    for article in db.query(Article).filter(Article.content.isnot(None)).all():
+        for link in set(link_graph.extract_internal_links(article.content)):
+            if not _resolve_per_link(db, link):
+                broken.append((article.id, link))
+    return broken
+
+
+def orphans_in_memory(db):
+    inbound = set()
+    for article in db.query(Article).filter(Article.content.isnot(None)).all():
+        for link in link_graph.extract_internal_links(article.content):
+            path = link.strip("/")
+            inbound.add(path)
+            inbound.add(path if path.startswith("news/") else f"news/{path}")
+    return [
+        a for a in db.query(Article).filter(Article.is_published.is_(True)).all()
+        if f"news/{a.slug}" not in inbound and a.slug not in inbound
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=5000)
+    parser.add_argument("--links", type=int, default=8)
+    parser.add_argument("--broken", type=float, default=0.05)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        cleanup(db)
+        timed(f"Добавление и индексация {args.articles} статей", lambda: seed(db, args.articles, args.links, args.broken))
+
+        old_broken = timed("Битые ссылки: запрос на ссылку", lambda: broken_per_link(db))
+        db.expunge_all()
+        new_broken = timed("Битые ссылки: internal_links", lambda: link_graph.broken_links(db))
+        print(f"  найдено: {len(old_broken)} / {len(new_broken)}")
+
+        db.expunge_all()
+        old_orphans = timed("Сироты: разбор всех статей", lambda: orphans_in_memory(db))
+        db.expunge_all()
+        new_orphans = timed("Сироты: internal_links", lambda: link_graph.orphan_articles(db))
+        print(f"  найдено: {len(old_orphans)} / {len(new_orphans)}")
+
+        counts = timed("Входящие ссылки по путям", lambda: link_graph.inbound_counts(db))
+        print(f"  путей: {len(counts)}")
+    finally:
+        cleanup(db)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
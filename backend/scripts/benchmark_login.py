@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк входа: пропускная способность POST /api/v1/auth/login
+и латентность /api/health во время 100 параллельных входов.
+
+Пока bcrypt считался прямо в event loop, /api/health во время всплеска
+входов ждал в очереди вместе со всеми; с пулом потоков
+(app/services/passwords.py) он должен отвечать за миллисекунды.
+
+Запуск из корня backend (приложение уже запущено, reCAPTCHA отключена):
+    python3 scripts/benchmark_login.py --logins 100
+    python3 scripts/benchmark_login.py --base-url http://127.0.0.1:8000 --logins 200
+
+Тестовый пользователь создаётся в БД перед замером и удаляется после.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.models import User
+from app.services.passwords import pwd_context
+
+BENCH_EMAIL = "bench-login@bench.documatica.test"
+BENCH_PASSWORD = "benchmark-password"
+
+
+def create_user():
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.email == BENCH_EMAIL).delete(synchronize_session=False)
+        db.add(User(email=BENCH_EMAIL, password_hash=pwd_context.hash(BENCH_PASSWORD), is_verified=True))
+        db.commit()
+    finally:
+        db.close()
+
+
+def delete_user():
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.email == BENCH_EMAIL).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def summary(name: str, values: list) -> str:
+    if not values:
+        return f"{name}: нет данных"
+    ordered = sorted(values)
+    p95 = ordered[min(len(ordered) - 1, int(0.95 * (len(ordered) - 1)))]
+    return (
+        f"{name}, мс: p50={statistics.median(ordered) * 1000:.0f} "
+        f"p95={p95 * 1000:.0f} max={ordered[-1] * 1000:.0f} (n={len(ordered)})"
+    )
+
+
+async def run(base_url: str, logins: int):
+    login_latencies = []
+    health_latencies = []
+    statuses = {}
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        async def login():
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/v1/auth/login",
+                json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD},
+            )
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code == 200:
+                login_latencies.append(time.perf_counter() - started)
+
+        async def probe_health():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/api/health")
+                health_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.05)
+
+        probe = asyncio.create_task(probe_health())
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe
+
+    return login_latencies, health_latencies, statuses, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк входа и отзывчивости сервиса")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--logins", type=int, default=100, help="Параллельных входов")
+    args = parser.parse_args()
+
+    create_user()
+    try:
+        login_latencies, health_latencies, statuses, elapsed = asyncio.run(run(args.base_url, args.logins))
+    finally:
+        delete_user()
+
+    print(f"Входов: {args.logins}, ответы: {statuses}")
+    print(f"Пропускная способность: {len(login_latencies) / elapsed:.1f} вход/с")
+    print(summary("Латентность входа", login_latencies))
+    print(summary("Латентность /api/health", health_latencies))
+
+
+if __name__ == "__main__":
+    main()
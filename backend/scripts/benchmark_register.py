@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк POST /api/v1/auth/register при медленном SMTP-сервере.
+
+Регистрация только ставит письмо в очередь email_outbox, поэтому задержка
+SMTP не должна попадать во время ответа. Порядок замера:
+
+    # 1. SMTP-приёмник с задержкой 2 с на каждый ответ
+    python3 scripts/smtp_sink.py --port 1025 --latency 2 --quiet
+
+    # 2. Приложение, направленное на приёмник
+    SMTP_HOST=127.0.0.1 SMTP_PORT=1025 SMTP_USER= SMTP_PASSWORD= \\
+        uvicorn app.main:app --port 8000
+
+    # 3. Замер (созданные пользователи удаляются в конце)
+    python3 scripts/benchmark_register.py --requests 50 --concurrency 10
+
+Для сравнения с прямой отправкой тот же замер запускается на коммите
+до появления очереди.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+EMAIL_DOMAIN = "bench.documatica.test"
+
+
+async def register_one(client: httpx.AsyncClient, url: str, latencies: list, errors: list):
+    email = f"bench-{uuid.uuid4().hex[:12]}@{EMAIL_DOMAIN}"
+    started = time.perf_counter()
+    try:
+        response = await client.post(url, json={"email": email, "password": "benchmark-password", "name": "Bench"})
+        if response.status_code != 200:
+            errors.append(f"{response.status_code}: {response.text[:100]}")
+            return
+    except httpx.HTTPError as e:
+        errors.append(str(e))
+        return
+    latencies.append(time.perf_counter() - started)
+
+
+async def run(base_url: str, total: int, concurrency: int):
+    url = f"{base_url.rstrip('/')}/api/v1/auth/register"
+    latencies = []
+    errors = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(timeout=120) as client:
+        async def task():
+            async with semaphore:
+                await register_one(client, url, latencies, errors)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(task() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+    return latencies, errors, elapsed
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def cleanup():
+    """Удаление пользователей и писем, созданных бенчмарком"""
+    from app.database import SessionLocal
+    from app.models import EmailOutbox, User
+
+    db = SessionLocal()
+    try:
+        pattern = f"bench-%@{EMAIL_DOMAIN}"
+        outbox = db.query(EmailOutbox).filter(EmailOutbox.to_email.like(pattern)).delete(synchronize_session=False)
+        users = db.query(User).filter(User.email.like(pattern)).delete(synchronize_session=False)
+        db.commit()
+        print(f"Удалено пользователей: {users}, писем в очереди: {outbox}")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк регистрации при медленном SMTP")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--no-cleanup", action="store_true", help="Не удалять созданных пользователей")
+    args = parser.parse_args()
+
+    latencies, errors, elapsed = asyncio.run(run(args.base_url, args.requests, args.concurrency))
+
+    print(f"Запросов: {args.requests}, параллельно: {args.concurrency}, ошибок: {len(errors)}")
+    for error in errors[:5]:
+        print(f"  {error}")
+    if latencies:
+        print(
+            f"Латентность, мс: p50={percentile(latencies, 50) * 1000:.0f} "
+            f"p95={percentile(latencies, 95) * 1000:.0f} "
+            f"max={max(latencies) * 1000:.0f} "
+            f"mean={statistics.mean(latencies) * 1000:.0f}"
+        )
+        print(f"Пропускная способность: {len(latencies) / elapsed:.1f} запр/с")
+
+    if not args.no_cleanup:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк отчёта о дубликатах meta (app/services/seo_duplicates.py):
+прежний способ (GROUP BY и отдельный запрос статей на каждое значение)
+против одного запроса на поле, плюс поиск похожих значений по pg_trgm.
+
+Скрипт добавляет --rows статей со slug bench-dup-*; meta description
+выбирается из пула в --distinct вариантов, часть с небольшими
+правками (near-дубликаты). После замеров добавленное удаляется.
+
+Запуск из корня backend, на тестовой БД:
+    python3 scripts/benchmark_seo_duplicates.py --rows 10000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app.models import Article
+from app.services import seo_duplicates
+
+SLUG_PREFIX = "bench-dup-"
+
+
+def timed(label: str, func_):
+    started = time.perf_counter()
+    result = func_()
+    print(f"{label}: {(time.perf_counter() - started) * 1000:.1f} мс")
+    return result
+
+
+def seed(db, count: int, distinct: int):
+    rng = random.Random(42)
+    rows = []
+    for i in range(count):
+        base = rng.randrange(distinct)
+        description = f"Как оформить документ номер {base} для ООО и ИП: образец заполнения, сроки и типичные ошибки"
+        if rng.random() < 0.2:
+            description += " в 2026 году"
+        rows.append({
+            "slug": f"{SLUG_PREFIX}{i}",
+            "title": f"Документ {base}" if rng.random() < 0.5 else f"Бенчмарк дубликатов {i}",
+            "meta_title": f"Документ {rng.randrange(distinct * 2)} — образец",
+            "meta_description": description,
+            "is_published": True,
+        })
+        if len(rows) >= 1000:
+            db.bulk_insert_mappings(Article, rows)
+            db.commit()
+            rows = []
+    if rows:
+        db.bulk_insert_mappings(Article, rows)
+        db.commit()
+
+
+def cleanup(db):
+    db.query(Article).filter(Article.slug.like(f"{SLUG_PREFIX}%")).delete(synchronize_session=False)
+    db.commit()
+
+
+def per_value_queries(db):
+    """Прежний отчёт: только статьи, только meta description, запрос на значение"""
+    rows = (
+        db.query(Article.meta_description, func.count(Article.id))
+        .filter(Article.meta_description.isnot(None), Article.meta_description != "")
+        .group_by(Article.meta_description)
+        .having(func.count(Article.id) > 1)
+        .all()
+    )
+    return [db.query(Article).filter(Article.meta_description == value).all() for value, _ in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--distinct", type=int, default=1000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        cleanup(db)
+        timed(f"Добавление {args.rows} статей", lambda: seed(db, args.rows, args.distinct))
+
+        old = timed("meta_description: запрос на каждое значение", lambda: per_value_queries(db))
+        print(f"  групп: {len(old)}")
+        db.expunge_all()
+        for field in seo_duplicates.FIELDS:
+            groups = timed(f"{field}: точные, один запрос", lambda: seo_duplicates.exact_duplicates(db, field))
+            print(f"  групп: {len(groups)}")
+        near = timed("meta_description: похожие (pg_trgm)", lambda: seo_duplicates.near_duplicates(db, "meta_description"))
+        print(f"  групп: {len(near)}")
+    finally:
+        cleanup(db)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк генерации sitemap (app/services/sitemap.py): полная сборка
+с пустого кэша, повторный запрос индекса и пересборка после
+изменения одной статьи (должна затронуть одну часть).
+
+Запуск из корня backend:
+    python3 scripts/benchmark_sitemap.py
+"""
+
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.models import Article
+from app.services.sitemap import SitemapCache
+
+
+def timed(label: str, func):
+    started = time.perf_counter()
+    result = func()
+    print(f"{label}: {(time.perf_counter() - started) * 1000:.1f} мс")
+    return result
+
+
+def main():
+    db = SessionLocal()
+    try:
+        cache = SitemapCache(check_interval=3600)
+        index = timed("Полная сборка", lambda: cache.index(db))
+        print(f"  частей пересобрано: {cache.rebuilds}, индекс {len(index)} байт")
+
+        timed("Повторный запрос индекса (кэш)", lambda: cache.index(db))
+
+        article = db.query(Article).filter(Article.is_published.is_(True)).order_by(Article.id.desc()).first()
+        if article is None:
+            print("Нет опубликованных статей - замер пересборки пропущен")
+            return
+        original = article.updated_at
+        article.updated_at = datetime.utcnow()
+        db.commit()
+        try:
+            rebuilds = cache.rebuilds
+            cache.invalidate()
+            timed("Пересборка после изменения статьи", lambda: cache.index(db))
+            print(f"  частей пересобрано: {cache.rebuilds - rebuilds}")
+        finally:
+            article.updated_at = original
+            db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
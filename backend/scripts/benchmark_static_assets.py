@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк трафика статики при загрузке страницы кабинета (app/core/assets.py,
+app/core/static_files.py): сколько байт JS/CSS передаётся при первом
+заходе и сколько запросов уходит при повторном заходе через час.
+
+Список файлов собирается из шаблона страницы (extends/include и asset()),
+CSS дополняется файлами из @import. Размеры берутся с диска: исходный
+файл - прежняя раздача без сжатия, .br/.gz - то, что выберет
+PrecompressedStaticFiles для браузера с "Accept-Encoding: gzip, deflate, br".
+
+Перед запуском соберите статику:
+    python3 scripts/build_assets.py
+    python3 scripts/benchmark_static_assets.py [шаблон]
+"""
+
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.assets import STATIC_DIR, load_manifest
+from app.core.http_cache import choose_encoding
+from app.core.static_files import PRECOMPRESSED
+
+TEMPLATES_DIR = Path(__file__).parent.parent / "app" / "templates"
+DEFAULT_TEMPLATE = "dashboard/index_v12.html"
+ACCEPT_ENCODING = "gzip, deflate, br"
+
+_TEMPLATE_REF_RE = re.compile(r"""{%-?\s*(?:extends|include)\s+["']([^"']+)["']""")
+_ASSET_RE = re.compile(r"""asset\(\s*["']([^"']+)["']\s*\)""")
+_IMPORT_RE = re.compile(r"""@import\s+url\(\s*["']?/static/([^"')?]+)""")
+
+
+def template_assets(name: str, seen=None) -> list:
+    """asset() из шаблона и всех шаблонов, которые он расширяет/включает"""
+    seen = seen if seen is not None else set()
+    if name in seen:
+        return []
+    seen.add(name)
+    source = (TEMPLATES_DIR / name).read_text(encoding="utf-8")
+    result = []
+    for ref in _TEMPLATE_REF_RE.findall(source):
+        result.extend(template_assets(ref, seen))
+    result.extend(_ASSET_RE.findall(source))
+    return result
+
+
+def css_imports(paths: list) -> list:
+    """Файлы из @import url('/static/...') - запрашиваются по исходному URL"""
+    result = []
+    queue = [path for path in paths if path.endswith(".css")]
+    while queue:
+        path = queue.pop(0)
+        full = STATIC_DIR / path
+        if not full.exists():
+            continue
+        for imported in _IMPORT_RE.findall(full.read_text(encoding="utf-8", errors="ignore")):
+            if imported not in result and imported not in paths:
+                result.append(imported)
+                queue.append(imported)
+    return result
+
+
+def served_size(path: str) -> tuple:
+    """(кодировка, байт) - что отдаст PrecompressedStaticFiles"""
+    full = STATIC_DIR / path
+    available = [enc for enc, suffix in PRECOMPRESSED if Path(f"{full}{suffix}").exists()]
+    encoding = choose_encoding(ACCEPT_ENCODING, available)
+    if encoding is None:
+        return "identity", full.stat().st_size
+    suffix = dict(PRECOMPRESSED)[encoding]
+    return encoding, Path(f"{full}{suffix}").stat().st_size
+
+
+def main():
+    template = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TEMPLATE
+    manifest = load_manifest()
+    if not manifest:
+        print("Манифест не найден - сначала выполните scripts/build_assets.py")
+        return
+
+    paths = [path for path in dict.fromkeys(template_assets(template)) if (STATIC_DIR / path).exists()]
+    imports = css_imports(paths)
+    print(f"Страница: {template}, файлов JS/CSS: {len(paths)} + {len(imports)} через @import\n")
+    print(f"{'файл':48} {'было':>10} {'стало':>10}  кодировка")
+
+    before_total = after_total = 0
+    for path in paths + imports:
+        raw = (STATIC_DIR / path).stat().st_size
+        encoding, size = served_size(manifest.get(path, path) if path in paths else path)
+        before_total += raw
+        after_total += size
+        print(f"{path:48} {raw:>10,} {size:>10,}  {encoding}")
+
+    immutable = sum(1 for path in paths if path in manifest)
+    print(f"\nПервый заход: {before_total:,} -> {after_total:,} байт "
+          f"({after_total / before_total * 100:.1f}%)")
+    print(f"Повторный заход через час: {immutable} файлов из кэша без запроса (URL с хэшем, immutable), "
+          f"{len(paths) + len(imports) - immutable} - проверка If-None-Match (max-age=3600)")
+
+
+if __name__ == "__main__":
+    main()
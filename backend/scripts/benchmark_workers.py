@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Нагрузочное сравнение запуска: один процесс uvicorn (прежний CMD) против
+gunicorn с воркерами uvicorn (gunicorn.conf.py).
+
+Каждый вариант запускается на свободном порту. --heavy клиентов без
+пауз запрашивают тяжёлый путь (рендер документа), параллельно --light
+клиентов - лёгкий (/api/health). Выводятся пропускная способность и
+латентность обоих: в одном процессе лёгкие запросы ждут в очереди за
+рендером, с воркерами - нет.
+
+Запуск из корня backend (нужны БД и gunicorn):
+    python3 scripts/benchmark_workers.py
+    python3 scripts/benchmark_workers.py --duration 30 --workers 4 --heavy-path /api/v1/documents/upd/demo
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def summary(name: str, values: list) -> str:
+    if not values:
+        return f"{name}: нет данных"
+    ordered = sorted(values)
+    p95 = ordered[min(len(ordered) - 1, int(0.95 * (len(ordered) - 1)))]
+    return (
+        f"{name}, мс: p50={statistics.median(ordered) * 1000:.0f} "
+        f"p95={p95 * 1000:.0f} max={ordered[-1] * 1000:.0f} (n={len(ordered)})"
+    )
+
+
+def start_server(mode: str, port: int, workers: int) -> subprocess.Popen:
+    if mode == "uvicorn":
+        command = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)]
+    else:
+        command = [sys.executable, "-m", "gunicorn", "app.main:app", "--bind", f"127.0.0.1:{port}"]
+    env = dict(os.environ, SERVER_WORKERS=str(workers))
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_ready(base_url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(base_url + "/api/health", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Сервер {base_url} не запустился за {timeout:.0f} с")
+
+
+async def load(base_url: str, args) -> dict:
+    heavy, light = [], []
+    errors = 0
+    deadline = time.monotonic() + args.duration
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        async def worker(path: str, latencies: list):
+            nonlocal errors
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                response = await client.get(path)
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(worker(args.heavy_path, heavy) for _ in range(args.heavy)),
+            *(worker("/api/health", light) for _ in range(args.light)),
+        )
+        elapsed = time.perf_counter() - started
+    return {"heavy": heavy, "light": light, "errors": errors, "elapsed": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="uvicorn в одном процессе против gunicorn с воркерами")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="воркеров gunicorn")
+    parser.add_argument("--duration", type=float, default=20, help="секунд нагрузки на вариант")
+    parser.add_argument("--heavy", type=int, default=16, help="клиентов тяжёлого пути")
+    parser.add_argument("--light", type=int, default=4, help="клиентов /api/health")
+    parser.add_argument("--heavy-path", default="/api/v1/documents/upd/demo")
+    args = parser.parse_args()
+
+    for mode in ("uvicorn", "gunicorn"):
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(mode, port, args.workers)
+        try:
+            wait_ready(base_url)
+            result = asyncio.run(load(base_url, args))
+        finally:
+            server.terminate()
+            server.wait(timeout=90)
+
+        label = "uvicorn, 1 процесс" if mode == "uvicorn" else f"gunicorn, {args.workers} воркеров"
+        print(f"\n{label}:")
+        print(f"  {args.heavy_path}: {len(result['heavy']) / result['elapsed']:.1f} запр/с, "
+              f"/api/health: {len(result['light']) / result['elapsed']:.1f} запр/с, ошибок: {result['errors']}")
+        print("  " + summary(args.heavy_path, result["heavy"]))
+        print("  " + summary("/api/health", result["light"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Собрать статику (app/core/assets.py): копии JS/CSS с хэшем содержимого
+в имени, манифест static/manifest.json и заранее сжатые .gz/.br для
+текстовых файлов. Запускается при сборке образа и при старте контейнера
+(docker-compose.yml: код смонтирован с хоста поверх образа); повторный
+запуск пересоздаёт только изменившиеся файлы. Копии предыдущей сборки
+остаются до следующей: воркеры со старым манифестом в памяти и страницы в
+кэше браузеров ещё ссылаются на них; удаляются копии позапрошлой сборки
+(список - в PREVIOUS_PATH).
+
+Запуск из корня backend:
+    python3 scripts/build_assets.py
+"""
+
+import gzip
+import json
+import os
+import re
+import shutil
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.assets import (
+    COMPRESS_MIN_SIZE,
+    COMPRESS_SUFFIXES,
+    FINGERPRINT_SKIP_DIRS,
+    FINGERPRINT_SUFFIXES,
+    HASH_LENGTH,
+    MANIFEST_PATH,
+    STATIC_DIR,
+    file_hash,
+    fingerprinted_name,
+)
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Загрузки пользователей раздаются отдельным mount (data/uploads)
+SKIP_DIRS = ("uploads",)
+
+# Копии с хэшем предыдущей сборки, ещё не удалённые
+PREVIOUS_PATH = STATIC_DIR / "manifest.previous.json"
+
+# Копии с хэшем (в том числе от сборок без манифеста) исходниками не считаются
+_HASHED_RE = re.compile(r"\.[0-9a-f]{%d}\.(js|css)$" % HASH_LENGTH)
+
+
+def _static_files():
+    """Пути относительно STATIC_DIR (через "/"), без .gz/.br"""
+    for dirpath, dirnames, filenames in os.walk(STATIC_DIR):
+        if dirpath == str(STATIC_DIR):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for name in filenames:
+            if name.endswith((".gz", ".br")):
+                continue
+            yield os.path.relpath(os.path.join(dirpath, name), STATIC_DIR).replace(os.sep, "/")
+
+
+def _is_fresh(target: Path, source: Path) -> bool:
+    return target.exists() and target.stat().st_mtime >= source.stat().st_mtime
+
+
+def _remove_with_variants(path: Path) -> None:
+    for candidate in (path, Path(f"{path}.gz"), Path(f"{path}.br")):
+        if candidate.exists():
+            candidate.unlink()
+
+
+def _compress(path: Path) -> int:
+    """Создать .gz (и .br) рядом с файлом. Возвращает число записанных файлов."""
+    written = 0
+    data = None
+    targets = [(Path(f"{path}.gz"), lambda d: gzip.compress(d, compresslevel=9, mtime=0))]
+    if BROTLI_AVAILABLE:
+        targets.append((Path(f"{path}.br"), lambda d: brotli.compress(d, quality=11)))
+    for target, compress in targets:
+        if _is_fresh(target, path):
+            continue
+        if data is None:
+            data = path.read_bytes()
+        compressed = compress(data)
+        if len(compressed) >= len(data):
+            # Сжатие не помогает - сервер отдаст исходный файл
+            if target.exists():
+                target.unlink()
+            continue
+        target.write_bytes(compressed)
+        written += 1
+    return written
+
+
+def _write_json(path: Path, data) -> None:
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(json.dumps(data, indent=1, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def main():
+    old_manifest = {}
+    if MANIFEST_PATH.exists():
+        old_manifest = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+    old_hashed = set(old_manifest.values())
+    previous_hashed = set()
+    if PREVIOUS_PATH.exists():
+        previous_hashed = set(json.loads(PREVIOUS_PATH.read_text(encoding="utf-8")))
+
+    sources = [
+        path for path in _static_files()
+        if not _HASHED_RE.search(path) and path not in (MANIFEST_PATH.name, PREVIOUS_PATH.name)
+    ]
+
+    manifest = {}
+    for path in sources:
+        if not path.endswith(FINGERPRINT_SUFFIXES) or path.startswith(FINGERPRINT_SKIP_DIRS):
+            continue
+        source = STATIC_DIR / path
+        hashed = fingerprinted_name(path, file_hash(source))
+        target = STATIC_DIR / hashed
+        if not target.exists():
+            shutil.copy2(source, target)
+        manifest[path] = hashed
+
+    # Сборка без изменений не вытесняет предыдущую
+    current_hashed = set(manifest.values())
+    rotate = old_hashed != current_hashed
+    removed = 0
+    if rotate:
+        for hashed in previous_hashed - old_hashed - current_hashed:
+            _remove_with_variants(STATIC_DIR / hashed)
+            removed += 1
+
+    compressed = 0
+    for path in sources + sorted(manifest.values()):
+        full = STATIC_DIR / path
+        if full.suffix in COMPRESS_SUFFIXES and full.stat().st_size >= COMPRESS_MIN_SIZE:
+            compressed += _compress(full)
+
+    if rotate:
+        _write_json(PREVIOUS_PATH, sorted(old_hashed - current_hashed))
+    _write_json(MANIFEST_PATH, manifest)
+
+    print(
+        f"Файлов с хэшем: {len(manifest)}, удалено позапрошлых: {removed}, "
+        f"сжатых копий записано: {compressed} (brotli: {'да' if BROTLI_AVAILABLE else 'нет'}) -> {MANIFEST_PATH}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Собрать снимок YAML-контента (app/core/content.py) - разобранные
+content/**/*.yaml в одном pickle-файле. Процесс, стартующий со свежим
+снимком, не разбирает YAML вовсе. Приложение записывает снимок само;
+скрипт нужен, чтобы собрать его заранее (например, после выкладки
+контента, до перезапуска).
+
+Запуск из корня backend:
+    python3 scripts/build_content_snapshot.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.content import content_store
+
+
+def main():
+    content_store.refresh(force=True)
+    content_store.save_snapshot()
+    stats = content_store.stats()
+    print(f"Файлов: {stats['files']}, разобрано: {stats['parsed']} -> {content_store.snapshot_path}")
+
+
+if __name__ == "__main__":
+    main()
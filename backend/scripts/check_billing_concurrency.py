@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Проверка атомарности списания лимита: 200 параллельных POST /api/v1/documents/upd/save
+от пользователя с 5 бесплатными генерациями.
+
+Ожидается ровно 5 успешных сохранений, остальные - 402, а в БД
+free_generations_used == 5 и счётчик ИНН == 5. При схеме
+"проверили лимит - списали" параллельные запросы проходили проверку
+одновременно и сохраняли больше документов, чем позволяет тариф.
+
+Запуск из корня backend (приложение уже запущено):
+    python3 scripts/check_billing_concurrency.py
+    python3 scripts/check_billing_concurrency.py --base-url http://127.0.0.1:8000 --requests 200
+
+Тестовый пользователь, его документы и счётчики ИНН удаляются после проверки.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+import jwt
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.auth import ALGORITHM, SECRET_KEY
+from app.database import SessionLocal
+from app.models import GlobalINNLimit, INNUsage, User
+from app.services import document_store
+from app.services.billing import FREE_GENERATIONS_LIMIT
+
+CHECK_EMAIL = "check-billing@bench.documatica.test"
+
+
+def create_user() -> int:
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.email == CHECK_EMAIL).delete(synchronize_session=False)
+        user = User(email=CHECK_EMAIL, password_hash="-", is_verified=True, subscription_plan="free")
+        db.add(user)
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def cleanup(user_id: int, inn: str, document_ids: list):
+    for document_id in document_ids:
+        document_store.delete_document(document_id)
+    db = SessionLocal()
+    try:
+        db.query(INNUsage).filter(INNUsage.user_id == user_id).delete(synchronize_session=False)
+        db.query(GlobalINNLimit).filter(GlobalINNLimit.inn == inn).delete(synchronize_session=False)
+        db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def read_counters(user_id: int, inn: str):
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        inn_limit = db.query(GlobalINNLimit).filter(GlobalINNLimit.inn == inn).first()
+        usages = db.query(INNUsage).filter(INNUsage.user_id == user_id, INNUsage.inn == inn).all()
+        return (
+            user.free_generations_used or 0,
+            inn_limit.free_generations_used if inn_limit else 0,
+            [usage.free_generations_count for usage in usages],
+        )
+    finally:
+        db.close()
+
+
+def make_payload(inn: str, number: int) -> dict:
+    return {
+        "document_number": f"CHK-{number}",
+        "document_date": datetime.now().date().isoformat(),
+        "seller": {"name": "ООО Проверка", "inn": inn, "address": "г. Москва"},
+        "buyer": {"name": "ООО Покупатель", "inn": "7707083893", "address": "г. Москва"},
+        "items": [{
+            "row_number": 1,
+            "name": "Услуга",
+            "quantity": "1",
+            "price": "100",
+            "amount_without_vat": "100",
+            "vat_amount": "20",
+            "amount_with_vat": "120",
+        }],
+        "total_amount_without_vat": "100",
+        "total_vat_amount": "20",
+        "total_amount_with_vat": "120",
+    }
+
+
+async def run(base_url: str, total: int, token: str, inn: str):
+    statuses = {}
+    document_ids = []
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=total)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        async def save(number: int):
+            response = await client.post("/api/v1/documents/upd/save", json=make_payload(inn, number), headers=headers)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code == 200:
+                document_ids.append(response.json()["document_id"])
+
+        await asyncio.gather(*(save(number) for number in range(total)))
+
+    return statuses, document_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка атомарного списания лимита генераций")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    # Случайный ИНН, чтобы глобальный лимит ИНН не пересекался с реальными данными
+    inn = "99" + "".join(random.choice("0123456789") for _ in range(8))
+    user_id = create_user()
+    token = jwt.encode(
+        {"sub": str(user_id), "exp": datetime.utcnow() + timedelta(hours=1)},
+        SECRET_KEY,
+        algorithm=ALGORITHM,
+    )
+
+    document_ids = []
+    try:
+        statuses, document_ids = asyncio.run(run(args.base_url, args.requests, token, inn))
+        free_used, inn_used, inn_usage_rows = read_counters(user_id, inn)
+    finally:
+        cleanup(user_id, inn, document_ids)
+
+    print(f"Запросов: {args.requests}, ответы: {statuses}")
+    print(f"free_generations_used={free_used}, счётчик ИНН={inn_used}, inn_usage={inn_usage_rows}")
+
+    expected = FREE_GENERATIONS_LIMIT
+    ok = (
+        len(document_ids) == expected
+        and free_used == expected
+        and inn_used == expected
+        and inn_usage_rows == [expected]
+    )
+    print("OK" if ok else f"ОШИБКА: ожидалось ровно {expected} списаний")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
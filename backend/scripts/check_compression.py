@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Проверка порога сжатия (COMPRESSION_MIN_SIZE) на настоящей цепочке
+middleware из app/main.py.
+
+BaseHTTPMiddleware (CacheControl, Redirect) пересылают любой ответ
+частями с more_body=True, поэтому CompressionMiddleware решает по
+накопленному началу тела. Ожидается: ответы меньше порога уходят без
+Content-Encoding и с Content-Length, от порога - сжатыми.
+
+Вместо роутов приложения - заглушка, отдающая тело нужного размера;
+RedirectMiddleware пропускается (ходит в БД), остальные middleware -
+как в продакшене: CacheControlMiddleware воспроизводит ту же пересылку.
+
+Запуск из корня backend (БД не нужна):
+    python3 scripts/check_compression.py
+"""
+
+import sys
+from pathlib import Path
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.core.redirects import RedirectMiddleware
+from app.main import app as main_app
+
+
+def text(request):
+    return PlainTextResponse("x" * int(request.path_params["size"]))
+
+
+def status(request):
+    return JSONResponse({"status": "ok"})
+
+
+def build_stack():
+    """Заглушка, обёрнутая middleware приложения в том же порядке"""
+    stub = Starlette(routes=[Route("/api/text/{size:int}", text), Route("/api/status", status)])
+    wrapped = stub
+    for middleware in reversed(main_app.user_middleware):
+        cls, args, kwargs = middleware
+        if cls is RedirectMiddleware:
+            continue
+        wrapped = cls(wrapped, *args, **kwargs)
+    return wrapped
+
+
+def main():
+    minimum = settings.COMPRESSION_MIN_SIZE
+    client = TestClient(build_stack())
+    cases = [
+        ("/api/status", False),
+        (f"/api/text/{minimum - 1}", False),
+        (f"/api/text/{minimum}", True),
+        ("/api/text/50000", True),
+    ]
+    failed = 0
+    for path, expect_compressed in cases:
+        response = client.get(path, headers={"Accept-Encoding": "gzip"})
+        encoding = response.headers.get("content-encoding")
+        compressed = encoding is not None
+        ok = compressed == expect_compressed and (compressed or "content-length" in response.headers)
+        failed += not ok
+        print(
+            f"{'OK  ' if ok else 'FAIL'} {path}: Content-Encoding={encoding or '-'}, "
+            f"Content-Length={response.headers.get('content-length', '-')}, "
+            f"ожидалось {'сжатие' if expect_compressed else 'без сжатия'}"
+        )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Проверка профилировщика запросов (app/core/profiling.py) на настоящей
+цепочке middleware из app/main.py.
+
+BaseHTTPMiddleware (CacheControl, Redirect) выполняют call_next в
+отдельной задаче anyio, поэтому обработчик запроса работает не в стеке
+ProfilingMiddleware. Ожидается: в профиле запроса с X-Profile-Token
+основное собственное время приходится на обработчик-заглушку burn, а не
+на кадр ожидания.
+
+Вместо роутов приложения - заглушка, нагружающая CPU в event loop;
+RedirectMiddleware пропускается (ходит в БД), профили пишутся во
+временный каталог.
+
+Запуск из корня backend (БД не нужна):
+    python3 scripts/check_profiling.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ["PROFILING_ENABLED"] = "true"
+
+from app.core import profiling
+from app.core.redirects import RedirectMiddleware
+from app.main import app as main_app
+
+BURN_SECONDS = 0.5
+
+
+async def burn(request):
+    deadline = time.perf_counter() + BURN_SECONDS
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(1000))
+    return PlainTextResponse(str(total))
+
+
+def build_stack():
+    """Заглушка, обёрнутая middleware приложения в том же порядке"""
+    stub = Starlette(routes=[Route("/api/burn", burn)])
+    wrapped = stub
+    for middleware in reversed(main_app.user_middleware):
+        cls, args, kwargs = middleware
+        if cls is RedirectMiddleware:
+            continue
+        wrapped = cls(wrapped, *args, **kwargs)
+    return wrapped
+
+
+def main():
+    if not any(m.cls is profiling.ProfilingMiddleware for m in main_app.user_middleware):
+        print("FAIL ProfilingMiddleware не подключён при PROFILING_ENABLED=true")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as profiles_dir:
+        profiling.PROFILES_DIR = Path(profiles_dir)
+        client = TestClient(build_stack())
+        response = client.get("/api/burn", headers={"X-Profile-Token": profiling.create_token()})
+        profiles = profiling.list_profiles()
+        if response.status_code != 200 or not profiles:
+            print(f"FAIL профиль не сохранён (код ответа {response.status_code})")
+            sys.exit(1)
+
+        meta, profile = profiling.load_profile(profiles[0]["id"])
+        functions, tree = profiling.summarize(profile)
+
+    burn_self = sum(f["self"] for f in functions if f["name"] == "burn")
+    share = burn_self / tree["value"] if tree["value"] else 0.0
+    ok = share >= 0.5
+    print(
+        f"{'OK  ' if ok else 'FAIL'} {meta['samples']} сэмплов за {meta['duration_ms']} мс, "
+        f"burn: {share:.0%} собственного времени, ожидалось не меньше 50%"
+    )
+    for f in functions[:5]:
+        print(f"     {f['self'] * 1000:8.1f} мс  {f['name']}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Конвертация сохранённых документов из папок (document.html, form_data.json,
+metadata.json, document.pdf) в однофайловые контейнеры .dmdoc
+(app/services/document_store.py).
+
+Чтение поддерживает оба формата, поэтому конвертацию можно запускать
+на работающем сервисе и прерывать в любой момент.
+
+Запуск из корня backend:
+    python3 scripts/convert_documents_to_container.py            # конвертация
+    python3 scripts/convert_documents_to_container.py --dry-run  # только отчёт
+    python3 scripts/convert_documents_to_container.py --limit 1000
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services import document_store
+from app.services.document_store import DocumentStoreError
+
+
+def folder_size(folder: Path) -> int:
+    """Суммарный размер файлов в папке документа"""
+    return sum(p.stat().st_size for p in folder.iterdir() if p.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Конвертация документов в однофайловые контейнеры")
+    parser.add_argument("--dry-run", action="store_true", help="Только посчитать документы, ничего не менять")
+    parser.add_argument("--limit", type=int, default=0, help="Сконвертировать не больше N документов")
+    args = parser.parse_args()
+
+    documents_dir = document_store.DOCUMENTS_DIR
+    # Каталоги шардов (ab/cd) с контейнерами iter_flat_document_ids пропускает
+    folders = sorted(
+        documents_dir / document_id
+        for document_id in document_store.iter_flat_document_ids()
+        if (documents_dir / document_id).is_dir()
+    )
+    if args.limit:
+        folders = folders[:args.limit]
+
+    print(f"Папок старого формата: {len(folders)}")
+    if args.dry_run:
+        total = sum(folder_size(f) for f in folders)
+        print(f"Размер: {total / 1024:.1f} КБ")
+        print("Dry-run: файлы не изменены.")
+        return
+
+    converted = 0
+    failed = 0
+    size_before = 0
+    size_after = 0
+
+    for folder in folders:
+        document_id = folder.name
+        before = folder_size(folder)
+        try:
+            if document_store.convert_legacy_folder(document_id):
+                converted += 1
+                size_before += before
+                size_after += document_store.container_path(document_id).stat().st_size
+        except (DocumentStoreError, ValueError, OSError) as e:
+            failed += 1
+            print(f"  Ошибка {document_id}: {e}")
+
+        if converted and converted % 1000 == 0:
+            print(f"  Сконвертировано: {converted}")
+
+    print(f"Сконвертировано: {converted}, ошибок: {failed}")
+    if converted:
+        print(f"Размер: {size_before / 1024:.1f} КБ -> {size_after / 1024:.1f} КБ")
+    print("Готово.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Миграция сохранённых документов на blob-хранилище изображений.
+Переписывает HTML и данные формы в контейнерах документов
+(app/services/document_store.py): встроенные base64 печати и подписи
+заменяются ссылками по SHA-256 (app/services/blob_store.py). Документы
+обходятся через document_store, поэтому учитываются шардированная и плоская
+раскладки и ещё не сконвертированные папки; сохранённый PDF не меняется -
+по ссылкам он рендерится так же.
+
+Запуск из корня backend:
+    python3 scripts/migrate_document_blobs.py            # миграция
+    python3 scripts/migrate_document_blobs.py --dry-run  # только отчёт
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services import blob_store, document_store
+from app.services.blob_store import externalize_data_urls, externalize_html
+
+
+def _json_size(data) -> int:
+    return len(json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def migrate_document(document_id: str, dry_run: bool) -> tuple:
+    """Мигрирует один документ. Возвращает (байт до, байт после)."""
+    document = document_store.read_document(document_id)
+    if document is None:
+        return 0, 0
+
+    html = document["html"]
+    form_data = document["form_data"]
+    new_html = externalize_html(html) if html is not None else None
+    new_form_data = externalize_data_urls(form_data) if form_data is not None else None
+
+    before = 0
+    after = 0
+    if html is not None:
+        before += len(html.encode("utf-8"))
+        after += len(new_html.encode("utf-8"))
+    if form_data is not None:
+        before += _json_size(form_data)
+        after += _json_size(new_form_data)
+
+    html_changed = new_html != html
+    form_changed = new_form_data != form_data
+    if not dry_run and (html_changed or form_changed):
+        document_store.save_document(
+            document_id,
+            form_data=new_form_data if form_changed else None,
+            html=new_html if html_changed else None,
+            # Новый HTML сбросил бы PDF, а рендер по ссылкам тот же
+            pdf=document_store.read_pdf(document_id) if html_changed else None,
+        )
+
+    return before, after
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Вынос печатей и подписей документов в blob-хранилище")
+    parser.add_argument("--dry-run", action="store_true", help="Только посчитать экономию, ничего не менять")
+    args = parser.parse_args()
+
+    if not document_store.DOCUMENTS_DIR.exists():
+        print(f"Папка не найдена: {document_store.DOCUMENTS_DIR}")
+        return
+
+    if args.dry_run:
+        # В dry-run blob'ы не пишем: перенаправляем хранилище во временную папку
+        import tempfile
+        blob_store.BLOBS_DIR = Path(tempfile.mkdtemp(prefix="documatica-blobs-"))
+
+    total_before = 0
+    total_after = 0
+    docs = 0
+    changed = 0
+
+    for document_id in sorted(document_store.iter_document_ids()):
+        before, after = migrate_document(document_id, args.dry_run)
+        docs += 1
+        total_before += before
+        total_after += after
+        if after != before:
+            changed += 1
+
+    blobs = list(blob_store.BLOBS_DIR.rglob("*"))
+    blob_bytes = sum(p.stat().st_size for p in blobs if p.is_file())
+
+    print(f"Документов: {docs}, изменено: {changed}")
+    print(f"Размер документов: {total_before / 1024:.1f} КБ -> {total_after / 1024:.1f} КБ")
+    print(f"Blob-хранилище: {sum(1 for p in blobs if p.is_file())} файлов, {blob_bytes / 1024:.1f} КБ")
+    if docs:
+        print(f"В среднем на документ: {total_before / docs / 1024:.1f} КБ -> {total_after / docs / 1024:.1f} КБ")
+    if args.dry_run:
+        print("Dry-run: файлы не изменены.")
+    else:
+        print("Готово.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Онлайн-миграция документов в шардированную раскладку documents/ab/cd/<id>.dmdoc
+(app/services/document_store.py).
+
+Сервис во время миграции читает обе раскладки, поэтому скрипт можно запускать
+на работающем проде: документы переносятся пачками с паузой между ними,
+плоские контейнеры - атомарным rename, папки старого формата - конвертацией
+в контейнер. Скрипт можно прервать и перезапустить в любой момент.
+
+Запуск из корня backend:
+    python3 scripts/migrate_documents_sharded.py --dry-run
+    python3 scripts/migrate_documents_sharded.py --batch-size 500 --pause 0.5
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services import document_store
+from app.services.document_store import DocumentStoreError
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Перенос документов в шардированную раскладку")
+    parser.add_argument("--dry-run", action="store_true", help="Только посчитать документы плоской раскладки")
+    parser.add_argument("--batch-size", type=int, default=500, help="Документов в пачке (по умолчанию 500)")
+    parser.add_argument("--pause", type=float, default=0.5, help="Пауза между пачками, сек (по умолчанию 0.5)")
+    parser.add_argument("--limit", type=int, default=0, help="Перенести не больше N документов")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        count = sum(1 for _ in document_store.iter_flat_document_ids())
+        print(f"Документов в плоской раскладке: {count}")
+        print("Dry-run: файлы не изменены.")
+        return
+
+    moved = 0
+    failed = 0
+    in_batch = 0
+    started = time.monotonic()
+
+    for document_id in document_store.iter_flat_document_ids():
+        if args.limit and moved >= args.limit:
+            break
+        try:
+            if document_store.migrate_to_sharded(document_id):
+                moved += 1
+        except (DocumentStoreError, ValueError, OSError) as e:
+            failed += 1
+            print(f"  Ошибка {document_id}: {e}")
+
+        in_batch += 1
+        if in_batch >= args.batch_size:
+            print(f"  Перенесено: {moved} ({moved / (time.monotonic() - started):.0f} док/с)")
+            in_batch = 0
+            time.sleep(args.pause)
+
+    print(f"Перенесено: {moved}, ошибок: {failed}")
+    remaining = sum(1 for _ in document_store.iter_flat_document_ids())
+    print(f"Осталось в плоской раскладке: {remaining}")
+    print("Готово.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Перестроить граф внутренних ссылок (internal_links) по текущему контенту
+статей и блоков страниц. Нужен после миграции 20261019_internal_links и
+после правок контента в БД в обход админки.
+
+Запуск из корня backend:
+    python3 scripts/rebuild_link_graph.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.services import link_graph
+
+
+def main():
+    db = SessionLocal()
+    try:
+        result = link_graph.rebuild(db)
+    finally:
+        db.close()
+    print(f"Статей: {result['articles']}, страниц: {result['pages']}, ссылок: {result['links']}")
+
+
+if __name__ == "__main__":
+    main()
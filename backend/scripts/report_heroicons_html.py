@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Размер HTML страниц с иконками из спрайта и с прежними встроенными
+<path> (app/core/heroicons.py).
+
+Страницы запрашиваются у запущенного приложения. Размер "до" получается
+подстановкой вместо каждого <use href="спрайт#hi-id"> разметки путей
+иконки - так, как шаблоны блоков вставляли её раньше. Печатаются байты
+без сжатия и в gzip, плюс одноразовая загрузка самого спрайта.
+
+Запуск из корня backend:
+    python3 scripts/report_heroicons_html.py --base-url http://localhost:8000 / /upd/ /news/
+"""
+
+import argparse
+import gzip
+import re
+import sys
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.heroicons import SYMBOL_PREFIX, get_icon_paths_html, get_sprite
+
+USE_RE = re.compile(r'<use href="[^"#]*#' + re.escape(SYMBOL_PREFIX) + r'([a-z0-9-]+)"></use>')
+
+
+def inline_paths(html: str) -> str:
+    paths = get_icon_paths_html()
+    return USE_RE.sub(lambda m: paths.get(m.group(1), ""), html)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("paths", nargs="*", default=["/", "/upd/", "/schet/", "/akt/", "/news/"])
+    args = parser.parse_args()
+
+    sprite = get_sprite()
+    print(f"Спрайт {sprite.url}: {len(sprite.svg)} байт, gzip {len(sprite.gzipped)} (загружается один раз)\n")
+    print(f"{'страница':<30} {'иконок':>6} {'до':>9} {'после':>9} {'gzip до':>9} {'gzip после':>10}")
+    total_before = total_after = 0
+    for path in args.paths:
+        with urllib.request.urlopen(args.base_url.rstrip("/") + path) as response:
+            after = response.read().decode("utf-8")
+        before = inline_paths(after)
+        icons = len(USE_RE.findall(after))
+        b, a = before.encode("utf-8"), after.encode("utf-8")
+        total_before += len(b)
+        total_after += len(a)
+        print(f"{path:<30} {icons:>6} {len(b):>9} {len(a):>9} {len(gzip.compress(b)):>9} {len(gzip.compress(a)):>10}")
+    print(f"\nИтого HTML: {total_before} -> {total_after} байт")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Локальный SMTP-приёмник для тестов и бенчмарков очереди писем.
+
+Принимает письма без TLS и авторизации, ничего никуда не отправляет.
+--latency добавляет задержку к каждому ответу сервера (имитация медленного
+SMTP), --save-dir сохраняет письма в .eml файлы.
+
+Запуск из корня backend:
+    python3 scripts/smtp_sink.py --port 1025
+    python3 scripts/smtp_sink.py --port 1025 --latency 2 --save-dir /tmp/mails
+
+Приложение направляется на приёмник переменными окружения:
+    SMTP_HOST=127.0.0.1 SMTP_PORT=1025 SMTP_USER= SMTP_PASSWORD=
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+from pathlib import Path
+
+_counter = itertools.count(1)
+
+
+class SMTPSink:
+    def __init__(self, latency: float, save_dir: Path = None, quiet: bool = False):
+        self.latency = latency
+        self.save_dir = save_dir
+        self.quiet = quiet
+        self.received = 0
+        self.connections = 0
+
+    async def reply(self, writer, line: str):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        writer.write((line + "\r\n").encode("ascii"))
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        await self.reply(writer, "220 smtp-sink ready")
+        mail_from = None
+        rcpt_to = []
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                line = raw.decode("utf-8", "replace").rstrip("\r\n")
+                command = line[:4].upper()
+
+                if command == "EHLO":
+                    writer.write(b"250-smtp-sink\r\n")
+                    await self.reply(writer, "250 8BITMIME")
+                elif command == "HELO":
+                    await self.reply(writer, "250 smtp-sink")
+                elif command == "MAIL":
+                    mail_from, rcpt_to = line[10:].strip(), []
+                    await self.reply(writer, "250 OK")
+                elif command == "RCPT":
+                    rcpt_to.append(line[8:].strip())
+                    await self.reply(writer, "250 OK")
+                elif command == "DATA":
+                    await self.reply(writer, "354 End data with <CR><LF>.<CR><LF>")
+                    chunks = []
+                    while True:
+                        data_line = await reader.readline()
+                        if not data_line or data_line in (b".\r\n", b".\n"):
+                            break
+                        chunks.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                    self.save(mail_from, rcpt_to, b"".join(chunks))
+                    await self.reply(writer, "250 OK: queued")
+                elif command == "RSET":
+                    mail_from, rcpt_to = None, []
+                    await self.reply(writer, "250 OK")
+                elif command == "NOOP":
+                    await self.reply(writer, "250 OK")
+                elif command == "QUIT":
+                    await self.reply(writer, "221 Bye")
+                    break
+                else:
+                    await self.reply(writer, "502 Command not implemented")
+        finally:
+            writer.close()
+
+    def save(self, mail_from, rcpt_to, message: bytes):
+        self.received += 1
+        if self.save_dir:
+            path = self.save_dir / f"{int(time.time())}-{next(_counter)}.eml"
+            path.write_bytes(message)
+        if not self.quiet:
+            print(f"[{self.received}] {mail_from} -> {', '.join(rcpt_to)} ({len(message)} байт)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Локальный SMTP-приёмник")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--latency", type=float, default=0.0, help="Задержка каждого ответа, сек")
+    parser.add_argument("--save-dir", type=Path, default=None, help="Сохранять письма в .eml")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    if args.save_dir:
+        args.save_dir.mkdir(parents=True, exist_ok=True)
+
+    sink = SMTPSink(args.latency, args.save_dir, args.quiet)
+    server = await asyncio.start_server(sink.handle, args.host, args.port)
+    print(f"SMTP sink на {args.host}:{args.port}, задержка {args.latency} с")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass